@@ -0,0 +1,107 @@
+"""熔断器：依赖连续失败后短时间内直接拒绝调用，避免每个请求都等待超时。
+
+状态流转：
+- closed：正常放行，连续失败达到阈值后转为 open；
+- open：直接拒绝，冷却期结束后转为 half_open；
+- half_open：仅放行一个探测调用，成功则恢复 closed，失败则重新 open。
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from enum import Enum
+
+from app.config import settings
+from app.metrics import record_circuit_rejected, set_circuit_state
+
+_logger = logging.getLogger(__name__)
+
+
+class CircuitState(str, Enum):
+    closed = "closed"
+    half_open = "half_open"
+    open = "open"
+
+
+class CircuitBreaker:
+    """线程安全的熔断器。
+
+    调用方先 `allow()`，再按结果调用 `record_success` 或 `record_failure`。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int | None = None,
+        reset_seconds: float | None = None,
+    ) -> None:
+        self.name = name
+        self._failure_threshold = max(
+            failure_threshold or settings.circuit_breaker_failure_threshold, 1
+        )
+        self._reset_seconds = (
+            reset_seconds
+            if reset_seconds is not None
+            else settings.circuit_breaker_reset_seconds
+        )
+        self._state = CircuitState.closed
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        set_circuit_state(name, self._state.value)
+
+    @property
+    def state(self) -> CircuitState:
+        return self._state
+
+    def allow(self) -> bool:
+        """当前是否允许发起调用；half_open 状态下只放行一个探测调用。"""
+        with self._lock:
+            if self._state == CircuitState.closed:
+                return True
+            if self._state == CircuitState.open:
+                if time.monotonic() - self._opened_at < self._reset_seconds:
+                    record_circuit_rejected(self.name)
+                    return False
+                self._transition(CircuitState.half_open)
+            if self._probe_in_flight:
+                record_circuit_rejected(self.name)
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._probe_in_flight = False
+            if self._state != CircuitState.closed:
+                self._transition(CircuitState.closed)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if (
+                self._state == CircuitState.half_open
+                or self._failures >= self._failure_threshold
+            ):
+                self._opened_at = time.monotonic()
+                if self._state != CircuitState.open:
+                    self._transition(CircuitState.open)
+
+    def _transition(self, state: CircuitState) -> None:
+        previous = self._state
+        self._state = state
+        set_circuit_state(self.name, state.value)
+        if state == CircuitState.open:
+            _logger.warning(
+                "熔断器打开: %s 连续失败 %s 次，%gs 内直接拒绝",
+                self.name,
+                self._failures,
+                self._reset_seconds,
+            )
+        elif state == CircuitState.closed:
+            _logger.info("熔断器恢复: %s (%s -> closed)", self.name, previous.value)
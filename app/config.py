@@ -4,12 +4,34 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 class Settings(BaseSettings):
     """应用配置"""
 
+    app_env: str = "development"
+    server_host: str = "0.0.0.0"
+    server_port: int = 8000
+    server_workers: int = 0
+    server_loop: str = "auto"
+    server_http: str = "auto"
+    server_keepalive_seconds: int = 15
+    server_backlog: int = 2048
+    server_graceful_timeout_seconds: int = 30
+    threadpool_size: int = 0
     cache_warmup_enabled: bool = True
+    cache_warmup_concurrency: int = 4
+    cache_warmup_budget_seconds: float = 120.0
     db_auto_migrate: bool = True
     scheduler_enabled: bool = True
     scheduler_confirm_hour: int = 9
     scheduler_confirm_minute: int = 0
+    scheduler_valuation_hour: int = 22
+    scheduler_valuation_minute: int = 30
+    valuation_lookback_days: int = 7
+    scheduler_metrics_hours: str = "17-23"
+    scheduler_metrics_minute: int = 40
+    risk_free_rate_percent: float = 1.5
+    scheduler_lease_seconds: float = 30.0
     redis_url: str = "redis://localhost:6379/0"
+    redis_socket_timeout_seconds: float = 0.5
+    local_cache_max_entries: int = 2048
+    snapshot_dir: str = "data/snapshots"
     database_url: str | None = None
     mysql_host: str = "localhost"
     mysql_port: int = 3306
@@ -19,10 +41,25 @@ class Settings(BaseSettings):
     nowapi_appkey: str = ""
     nowapi_sign: str = ""
     nowapi_base_url: str = "https://sapi.k780.com"
+    nowapi_timeout_seconds: float = 8.0
+    circuit_breaker_failure_threshold: int = 5
+    circuit_breaker_reset_seconds: float = 30.0
+    akshare_timeout_seconds: float = 20.0
+    akshare_max_concurrency: int = 8
+    akshare_rate_limit_per_second: float = 10.0
+    akshare_max_retries: int = 2
+    akshare_retry_backoff_seconds: float = 0.5
+    akshare_disk_cache_path: str = ""
     log_level: str = "INFO"
     log_file: str = "logs/app.log"
     log_max_bytes: int = 10 * 1024 * 1024
     log_backup_count: int = 10
+    log_queue_size: int = 10000
+    log_request_sample_rate: float = 1.0
+    log_slow_request_ms: float = 1000.0
+    profile_token: str = ""
+    profile_sample_rate: float = 0.0
+    profile_interval_ms: float = 5.0
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
+import time
 from collections.abc import Generator
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
 
 from app.config import settings
+from app.logging_config import record_timing
 
 
 class Base(DeclarativeBase):
@@ -16,6 +18,17 @@ engine = create_engine(settings.database_url, pool_pre_ping=True)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
 
+@event.listens_for(engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_time = conn.info["query_start_time"].pop()
+    record_timing("db", (time.perf_counter() - start_time) * 1000)
+
+
 def init_db() -> None:
     """初始化数据库（执行迁移）。"""
     from app.db_migration import run_migrations
@@ -3,7 +3,7 @@ from __future__ import annotations
 import logging
 from collections.abc import Callable
 
-from sqlalchemy import Column, DateTime, String, Table, func, select
+from sqlalchemy import Column, DateTime, String, Table, func, inspect, select, text
 from sqlalchemy.engine import Connection
 
 from app.config import settings
@@ -28,8 +28,57 @@ def _migration_0001_initial(connection: Connection) -> None:
     Base.metadata.create_all(bind=connection)
 
 
+def _migration_0002_holding_daily_values(connection: Connection) -> None:
+    """新增持仓每日估值快照表。"""
+    from app.models.db.models import FundHoldingDailyValue
+
+    FundHoldingDailyValue.__table__.create(bind=connection, checkfirst=True)
+
+
+def _migration_0003_scheduler_leader(connection: Connection) -> None:
+    """新增定时任务选主租约与执行记录表。"""
+    from app.models.db.models import SchedulerJobRun, SchedulerLease
+
+    SchedulerLease.__table__.create(bind=connection, checkfirst=True)
+    SchedulerJobRun.__table__.create(bind=connection, checkfirst=True)
+
+
+def _migration_0004_fund_metrics(connection: Connection) -> None:
+    """新增基金业绩指标表。"""
+    from app.models.db.models import FundMetric
+
+    FundMetric.__table__.create(bind=connection, checkfirst=True)
+
+
+def _migration_0005_fund_portfolio(connection: Connection) -> None:
+    """新增基金季度持仓与拉取记录表。"""
+    from app.models.db.models import FundPortfolioFetch, FundPortfolioHolding
+
+    FundPortfolioHolding.__table__.create(bind=connection, checkfirst=True)
+    FundPortfolioFetch.__table__.create(bind=connection, checkfirst=True)
+
+
+def _migration_0006_transaction_updated_at(connection: Connection) -> None:
+    """交易记录新增更新时间，用于识别上次估值快照后变更的交易。"""
+    columns = {
+        column["name"]
+        for column in inspect(connection).get_columns("fund_transactions")
+    }
+    if "updated_at" in columns:
+        return
+    connection.execute(
+        text("ALTER TABLE fund_transactions ADD COLUMN updated_at DATETIME NULL")
+    )
+    connection.execute(text("UPDATE fund_transactions SET updated_at = created_at"))
+
+
 _MIGRATIONS: list[tuple[str, MigrationFn]] = [
     ("0001_initial", _migration_0001_initial),
+    ("0002_holding_daily_values", _migration_0002_holding_daily_values),
+    ("0003_scheduler_leader", _migration_0003_scheduler_leader),
+    ("0004_fund_metrics", _migration_0004_fund_metrics),
+    ("0005_fund_portfolio", _migration_0005_fund_portfolio),
+    ("0006_transaction_updated_at", _migration_0006_transaction_updated_at),
 ]
 
 
@@ -8,3 +8,15 @@ class FundAccountNotFoundError(ValueError):
 
 class FundHoldingNotFoundError(ValueError):
     """基金持仓未找到异常"""
+
+
+class UpstreamError(RuntimeError):
+    """上游数据源调用失败异常"""
+
+
+class UpstreamTimeoutError(UpstreamError):
+    """上游数据源调用超时异常"""
+
+
+class CircuitOpenError(UpstreamError):
+    """熔断器打开，调用被直接拒绝异常"""
@@ -2,22 +2,61 @@
 
 from __future__ import annotations
 
+import atexit
 import contextvars
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+import re
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 from typing import Optional
 
 _trace_id_var: contextvars.ContextVar[str] = contextvars.ContextVar(
     "trace_id", default="-"
 )
+_SPAN_NAME_PATTERN = re.compile(r"[^A-Za-z0-9_.-]")
+_listener: Optional[QueueListener] = None
+
+
+class RequestTimings:
+    """单个请求内的分段耗时（同名片段累加耗时与次数）。
+
+    线程池中的同步调用会复制上下文，但复制的是同一个对象引用，
+    因此在 worker 线程中记录的片段对请求中间件可见。
+    """
+
+    def __init__(self) -> None:
+        self._spans: dict[str, list[float]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, duration_ms: float) -> None:
+        with self._lock:
+            span = self._spans.setdefault(name, [0.0, 0])
+            span[0] += duration_ms
+            span[1] += 1
+
+    def items(self) -> list[tuple[str, float, int]]:
+        with self._lock:
+            return [
+                (name, dur, int(count)) for name, (dur, count) in self._spans.items()
+            ]
+
+
+_timings_var: contextvars.ContextVar[Optional[RequestTimings]] = contextvars.ContextVar(
+    "request_timings", default=None
+)
 
 
 class TraceIdFilter(logging.Filter):
-    """为日志记录注入 trace_id。"""
+    """为日志记录注入 trace_id（已在入队时注入的记录保持不变）。"""
 
     def filter(self, record: logging.LogRecord) -> bool:
-        record.trace_id = _trace_id_var.get() or "-"
+        if not hasattr(record, "trace_id"):
+            record.trace_id = _trace_id_var.get() or "-"
         return True
 
 
@@ -36,14 +75,99 @@ def get_trace_id() -> str:
     return _trace_id_var.get()
 
 
+def bind_timings() -> tuple[RequestTimings, contextvars.Token]:
+    """为当前请求创建耗时收集器。"""
+    timings = RequestTimings()
+    return timings, _timings_var.set(timings)
+
+
+def reset_timings(token: contextvars.Token) -> None:
+    """重置耗时收集器上下文。"""
+    _timings_var.reset(token)
+
+
+def record_timing(name: str, duration_ms: float) -> None:
+    """记录一个耗时片段；不在请求上下文中（如定时任务）时忽略。"""
+    timings = _timings_var.get()
+    if timings is not None:
+        timings.add(name, duration_ms)
+
+
+@contextmanager
+def timing_span(name: str) -> Iterator[None]:
+    """以上下文管理器形式记录耗时片段。"""
+    if _timings_var.get() is None:
+        yield
+        return
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_timing(name, (time.perf_counter() - start_time) * 1000)
+
+
+def format_server_timing(timings: RequestTimings, total_ms: float) -> str:
+    """格式化为 `Server-Timing` 响应头。"""
+    entries = [
+        f'{_SPAN_NAME_PATTERN.sub("_", name)};dur={duration:.2f};desc="x{count}"'
+        for name, duration, count in timings.items()
+    ]
+    entries.append(f"total;dur={total_ms:.2f}")
+    return ", ".join(entries)
+
+
+def format_timing_summary(timings: RequestTimings) -> str:
+    """格式化为日志中的耗时摘要。"""
+    items = timings.items()
+    if not items:
+        return "-"
+    return ",".join(
+        f"{name}:{duration:.2f}ms/{count}" for name, duration, count in items
+    )
+
+
+class DroppingQueueHandler(QueueHandler):
+    """有界队列日志处理器：队列已满时丢弃记录并计数，不阻塞调用线程。"""
+
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            # 延迟导入，避免与指标模块循环依赖
+            from app.metrics import record_log_dropped
+
+            record_log_dropped()
+
+
+def get_dropped_log_count() -> int:
+    """获取因队列已满被丢弃的日志条数。"""
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, DroppingQueueHandler):
+            return handler.dropped
+    return 0
+
+
 def setup_logging(
     log_file: str,
     log_level: str,
     max_bytes: int,
     backup_count: int,
     enable_console: bool = True,
+    queue_size: int = 10000,
 ) -> None:
-    """初始化日志配置，输出到文件（可选控制台）。"""
+    """初始化日志配置，输出到文件（可选控制台）。
+
+    `queue_size` 大于 0 时，业务线程只负责入队，文件与控制台输出由后台
+    `QueueListener` 线程完成；为 0 时各处理器直接挂在 root logger 上同步输出。
+    """
+    global _listener
+    shutdown_logging()
+
     log_path = Path(log_file)
     log_path.parent.mkdir(parents=True, exist_ok=True)
 
@@ -74,8 +198,19 @@ def setup_logging(
     root_logger = logging.getLogger()
     root_logger.setLevel(log_level)
     root_logger.handlers.clear()
-    for handler in handlers:
-        root_logger.addHandler(handler)
+    if queue_size > 0:
+        # trace_id 存在于调用方上下文中，需在入队前注入
+        queue_handler = DroppingQueueHandler(queue.Queue(maxsize=queue_size))
+        queue_handler.addFilter(TraceIdFilter())
+        root_logger.addHandler(queue_handler)
+        _listener = QueueListener(
+            queue_handler.queue, *handlers, respect_handler_level=True
+        )
+        _listener.start()
+        atexit.register(shutdown_logging)
+    else:
+        for handler in handlers:
+            root_logger.addHandler(handler)
 
     for logger_name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
         logger = logging.getLogger(logger_name)
@@ -84,6 +219,21 @@ def setup_logging(
         logger.setLevel(log_level)
 
 
+def shutdown_logging() -> None:
+    """停止后台日志线程并输出队列中剩余的记录，之后的日志改为同步输出。"""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    root_logger = logging.getLogger()
+    for handler in list(root_logger.handlers):
+        if isinstance(handler, DroppingQueueHandler):
+            root_logger.removeHandler(handler)
+    for handler in _listener.handlers:
+        root_logger.addHandler(handler)
+    _listener = None
+
+
 def configure_logger_level(logger_name: str, level: Optional[str]) -> None:
     """按需调整指定 logger 的级别。"""
     if not level:
@@ -1,48 +1,84 @@
 import logging
-import threading
+import random
 import time
 import uuid
 from contextlib import asynccontextmanager
 
+from anyio import to_thread
 from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 
 from app.config import settings
 from app.db import init_db
-from app.exceptions import FundAccountNotFoundError, FundNotFoundError
-from app.logging_config import bind_trace_id, reset_trace_id, setup_logging
+from app.exceptions import (
+    FundAccountNotFoundError,
+    FundNotFoundError,
+    UpstreamError,
+)
+from app.logging_config import (
+    bind_timings,
+    bind_trace_id,
+    format_server_timing,
+    format_timing_summary,
+    reset_timings,
+    reset_trace_id,
+    setup_logging,
+    shutdown_logging,
+)
+from app.metrics import mark_worker_exit, observe_http_request, render_metrics
+from app.profiling import (
+    PROFILE_HEADER,
+    ProfileSession,
+    profile_output_dir,
+    should_profile,
+)
 from app.routers.fund_account_controller import router as fund_account_router
 from app.routers.fund_controller import router as fund_router
 from app.routers.fund_holding_controller import router as fund_holding_router
 from app.routers.stock_controller import router as stock_router
-from app.services.cache import close_redis, warm_up_cache
+from app.services import akshare_adapter, warmup
+from app.services.cache import close_redis
 from app.services.scheduler import start_scheduler, stop_scheduler
 from app.services.stock import stock_service
+from app.worker_lock import (
+    acquire_primary_worker,
+    exclusive,
+    release_primary_worker,
+)
 
 setup_logging(
     log_file=settings.log_file,
     log_level=settings.log_level,
     max_bytes=settings.log_max_bytes,
     backup_count=settings.log_backup_count,
+    queue_size=settings.log_queue_size,
 )
 
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
-    init_db()
-    start_scheduler()
-    if settings.cache_warmup_enabled:
-        thread = threading.Thread(
-            target=warm_up_cache,
-            kwargs={"timeout": 80.0},
-            daemon=True,
+    if settings.threadpool_size > 0:
+        to_thread.current_default_thread_limiter().total_tokens = (
+            settings.threadpool_size
         )
-        thread.start()
+    # 多 worker 同时启动时串行执行迁移
+    with exclusive("migrate"):
+        init_db()
+    if acquire_primary_worker():
+        start_scheduler()
+        warmup.start_warmup()
+    else:
+        logging.getLogger(__name__).info("非主 worker，跳过定时任务与缓存预热")
     yield
     close_redis()
     stock_service.close_nowapi_client()
+    akshare_adapter.close()
     stop_scheduler()
+    release_primary_worker()
+    mark_worker_exit()
+    shutdown_logging()
 
 
 app = FastAPI(
@@ -78,8 +114,13 @@ async def request_logging_middleware(request: Request, call_next):
         or str(uuid.uuid4())
     )
     token = bind_trace_id(trace_id)
+    timings, timings_token = bind_timings()
     request.state.trace_id = trace_id
     logger = logging.getLogger("app.request")
+    profile_session = None
+    if should_profile(request.headers.get(PROFILE_HEADER)):
+        profile_session = ProfileSession(trace_id, settings.profile_interval_ms)
+        profile_session.start()
     start_time = time.perf_counter()
     response = None
     try:
@@ -98,19 +139,72 @@ async def request_logging_middleware(request: Request, call_next):
     finally:
         duration_ms = (time.perf_counter() - start_time) * 1000
         status_code = response.status_code if response else 500
+        if profile_session is not None:
+            profile_session.stop()
+            profile_path = await run_in_threadpool(
+                profile_session.write, profile_output_dir()
+            )
+            logger.info(
+                "请求采样分析完成 path=%s samples=%s file=%s",
+                request.url.path,
+                profile_session.samples,
+                profile_path,
+            )
         if response is not None:
             response.headers["X-Trace-Id"] = trace_id
-        logger.info(
-            "请求完成 method=%s path=%s status=%s duration_ms=%.2f client=%s",
+            response.headers["Server-Timing"] = format_server_timing(
+                timings, duration_ms
+            )
+        observe_http_request(
             request.method,
-            request.url.path,
+            _resolve_route_path(request),
             status_code,
-            duration_ms,
-            request.client.host if request.client else "-",
+            duration_ms / 1000,
         )
+        if _should_log_request(status_code, duration_ms):
+            logger.info(
+                "请求完成 method=%s path=%s status=%s duration_ms=%.2f client=%s "
+                "timings=%s",
+                request.method,
+                request.url.path,
+                status_code,
+                duration_ms,
+                request.client.host if request.client else "-",
+                format_timing_summary(timings),
+            )
+        reset_timings(timings_token)
         reset_trace_id(token)
 
 
+def _should_log_request(status_code: int, duration_ms: float) -> bool:
+    """错误与慢请求始终记录，其余按采样率记录。"""
+    if status_code >= 400 or duration_ms >= settings.log_slow_request_ms:
+        return True
+    rate = settings.log_request_sample_rate
+    return rate >= 1 or random.random() < rate
+
+
+def _resolve_route_path(request: Request) -> str:
+    """使用路由模板作为指标标签，避免路径参数造成高基数。"""
+    route = request.scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics() -> Response:
+    """Prometheus 指标。"""
+    content, content_type = render_metrics()
+    return Response(content=content, media_type=content_type)
+
+
+@app.get("/ready", include_in_schema=False)
+def ready() -> JSONResponse:
+    """就绪检查：缓存预热结束（完成、超时或未启用）后返回 200。"""
+    state = warmup.get_warmup_state()
+    status_code = 200 if warmup.is_ready() else 503
+    return JSONResponse(status_code=status_code, content={"warmup": state})
+
+
 @app.exception_handler(FundNotFoundError)
 async def handle_fund_not_found(_: FastAPI, exc: FundNotFoundError) -> JSONResponse:
     logging.getLogger("app.error").exception("基金未找到: %s", exc)
@@ -125,6 +219,12 @@ async def handle_account_not_found(
     return JSONResponse(status_code=404, content={"detail": str(exc)})
 
 
+@app.exception_handler(UpstreamError)
+async def handle_upstream_error(_: FastAPI, exc: UpstreamError) -> JSONResponse:
+    logging.getLogger("app.error").warning("上游数据源不可用: %s", exc)
+    return JSONResponse(status_code=503, content={"detail": str(exc)})
+
+
 @app.exception_handler(ValueError)
 async def handle_value_error(_: FastAPI, exc: ValueError) -> JSONResponse:
     logging.getLogger("app.error").exception("请求参数错误: %s", exc)
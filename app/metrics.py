@@ -0,0 +1,214 @@
+"""Prometheus 指标定义与采集辅助函数。
+
+多进程部署时设置环境变量 `PROMETHEUS_MULTIPROC_DIR`（生产模式由 `main.py` 自动设置
+并清空），各 worker 将指标写入该目录，`/metrics` 汇总全部 worker 的数据；
+worker 退出时调用 `mark_worker_exit` 清理其 `live*` 仪表盘数据。
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+from app.logging_config import record_timing
+
+_LATENCY_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+HTTP_REQUESTS = Counter(
+    "app_http_requests_total",
+    "HTTP 请求数",
+    ["method", "route", "status"],
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "app_http_request_duration_seconds",
+    "HTTP 请求耗时（秒）",
+    ["method", "route"],
+    buckets=_LATENCY_BUCKETS,
+)
+UPSTREAM_REQUESTS = Counter(
+    "app_upstream_requests_total",
+    "上游调用次数",
+    ["upstream", "endpoint", "outcome"],
+)
+UPSTREAM_REQUEST_DURATION = Histogram(
+    "app_upstream_request_duration_seconds",
+    "上游调用耗时（秒）",
+    ["upstream", "endpoint"],
+    buckets=_LATENCY_BUCKETS,
+)
+CACHE_REQUESTS = Counter(
+    "app_cache_requests_total",
+    "缓存读取次数（按 key 前缀与命中结果）",
+    ["prefix", "result"],
+)
+CACHE_OPERATION_DURATION = Histogram(
+    "app_cache_operation_duration_seconds",
+    "缓存读取/回源/写入耗时（秒）",
+    ["prefix", "operation"],
+    buckets=_LATENCY_BUCKETS,
+)
+
+CIRCUIT_BREAKER_STATE = Gauge(
+    "app_circuit_breaker_state",
+    "熔断器状态（0=closed，1=half_open，2=open）",
+    ["name"],
+    multiprocess_mode="livemax",
+)
+CIRCUIT_BREAKER_REJECTED = Counter(
+    "app_circuit_breaker_rejected_total",
+    "熔断器直接拒绝的调用次数",
+    ["name"],
+)
+_CIRCUIT_STATE_VALUES = {"closed": 0, "half_open": 1, "open": 2}
+
+SCHEDULER_LEADER = Gauge(
+    "app_scheduler_leader",
+    "当前进程是否持有定时任务租约（1=主节点）",
+    ["lease"],
+    multiprocess_mode="livesum",
+)
+SCHEDULER_JOB_DURATION = Histogram(
+    "app_scheduler_job_duration_seconds",
+    "定时任务执行耗时（秒）",
+    ["job", "status"],
+    buckets=(0.1, 0.5, 1.0, 5.0, 15.0, 30.0, 60.0, 180.0, 600.0),
+)
+
+WARMUP_FUNDS = Gauge(
+    "app_cache_warmup_funds",
+    "缓存预热基金数量（total/completed/failed）",
+    ["state"],
+    multiprocess_mode="livemax",
+)
+WARMUP_COMPLETE = Gauge(
+    "app_cache_warmup_complete",
+    "缓存预热是否已结束（1=结束）",
+    multiprocess_mode="livemax",
+)
+
+LOG_RECORDS_DROPPED = Counter(
+    "app_log_records_dropped",
+    "日志队列已满被丢弃的记录数",
+)
+
+
+@contextmanager
+def track_upstream(upstream: str, endpoint: str) -> Iterator[None]:
+    """记录一次上游调用的耗时与结果。"""
+    start_time = time.perf_counter()
+    outcome = "success"
+    try:
+        yield
+    except Exception:
+        outcome = "error"
+        raise
+    finally:
+        duration = time.perf_counter() - start_time
+        UPSTREAM_REQUEST_DURATION.labels(upstream, endpoint).observe(duration)
+        record_timing(f"{upstream}.{endpoint}", duration * 1000)
+        UPSTREAM_REQUESTS.labels(upstream, endpoint, outcome).inc()
+
+
+@contextmanager
+def track_cache(prefix: str, operation: str) -> Iterator[None]:
+    """记录一次缓存操作的耗时。
+
+    回源（load）耗时已由其中的上游调用分别记录，不再计入请求分段耗时。
+    """
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start_time
+        CACHE_OPERATION_DURATION.labels(prefix, operation).observe(duration)
+        if operation != "load":
+            record_timing(f"cache.{operation}", duration * 1000)
+
+
+def record_upstream_outcome(upstream: str, endpoint: str, outcome: str) -> None:
+    """记录未经 `track_upstream` 结束的调用结果（如等待超时）。"""
+    UPSTREAM_REQUESTS.labels(upstream, endpoint, outcome).inc()
+
+
+def set_circuit_state(name: str, state: str) -> None:
+    CIRCUIT_BREAKER_STATE.labels(name).set(_CIRCUIT_STATE_VALUES[state])
+
+
+def record_circuit_rejected(name: str) -> None:
+    CIRCUIT_BREAKER_REJECTED.labels(name).inc()
+
+
+def set_scheduler_leader(lease: str, is_leader: bool) -> None:
+    SCHEDULER_LEADER.labels(lease).set(1 if is_leader else 0)
+
+
+def observe_scheduler_job(job: str, status: str, duration_seconds: float) -> None:
+    SCHEDULER_JOB_DURATION.labels(job, status).observe(duration_seconds)
+
+
+def set_warmup_progress(total: int, completed: int, failed: int, done: bool) -> None:
+    WARMUP_FUNDS.labels("total").set(total)
+    WARMUP_FUNDS.labels("completed").set(completed)
+    WARMUP_FUNDS.labels("failed").set(failed)
+    WARMUP_COMPLETE.set(1 if done else 0)
+
+
+def record_cache_result(prefix: str, hit: bool) -> None:
+    CACHE_REQUESTS.labels(prefix, "hit" if hit else "miss").inc()
+
+
+def observe_http_request(
+    method: str,
+    route: str,
+    status_code: int,
+    duration_seconds: float,
+) -> None:
+    HTTP_REQUEST_DURATION.labels(method, route).observe(duration_seconds)
+    HTTP_REQUESTS.labels(method, route, str(status_code)).inc()
+
+
+def record_log_dropped() -> None:
+    LOG_RECORDS_DROPPED.inc()
+
+
+def mark_worker_exit() -> None:
+    """多进程模式下标记当前 worker 退出，移除其 `live*` 仪表盘数据。"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(os.getpid())
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """输出 Prometheus 文本格式指标；多进程模式下汇总全部 worker。"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -4,7 +4,17 @@ from datetime import date as dt_date
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import Date, DateTime, Enum, Float, Integer, String, UniqueConstraint
+from sqlalchemy import (
+    Date,
+    DateTime,
+    Enum,
+    Float,
+    Index,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+)
 from sqlalchemy.orm import Mapped, foreign, mapped_column, relationship
 
 from app.db import Base
@@ -128,6 +138,9 @@ class FundTransaction(Base):
     trade_time: Mapped[datetime] = mapped_column(DateTime, default=cst_now)
     remark: Mapped[str | None] = mapped_column(String(255))
     created_at: Mapped[datetime] = mapped_column(DateTime, default=cst_now)
+    updated_at: Mapped[datetime | None] = mapped_column(
+        DateTime, nullable=True, default=cst_now, onupdate=cst_now
+    )
 
     account: Mapped["FundAccount"] = relationship(
         "FundAccount",
@@ -144,3 +157,109 @@ class FundTransaction(Base):
         back_populates="transactions",
         primaryjoin="FundConversion.id==foreign(FundTransaction.conversion_id)",
     )
+
+
+class FundHoldingDailyValue(Base):
+    """持仓每日估值快照（按确认净值计算）。"""
+
+    __tablename__ = "fund_holding_daily_values"
+    __table_args__ = (
+        UniqueConstraint(
+            "account_id", "fund_code", "value_date", name="uniq_account_fund_date"
+        ),
+        Index("idx_daily_values_account_date", "account_id", "value_date"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    account_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    fund_code: Mapped[str] = mapped_column(String(32), nullable=False)
+    value_date: Mapped[dt_date] = mapped_column(Date, nullable=False)
+    shares: Mapped[float] = mapped_column(Float, nullable=False)
+    cost_amount: Mapped[float] = mapped_column(Float, nullable=False)
+    nav: Mapped[float] = mapped_column(Float, nullable=False)
+    market_value: Mapped[float] = mapped_column(Float, nullable=False)
+    profit_amount: Mapped[float] = mapped_column(Float, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=cst_now)
+
+
+class SchedulerLease(Base):
+    """定时任务主节点租约（多实例选主）。"""
+
+    __tablename__ = "scheduler_leases"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    owner: Mapped[str] = mapped_column(String(128), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=cst_now, onupdate=cst_now
+    )
+
+
+class SchedulerJobRun(Base):
+    """定时任务执行记录。"""
+
+    __tablename__ = "scheduler_job_runs"
+    __table_args__ = (Index("idx_job_runs_job_started", "job_id", "started_at"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    job_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    owner: Mapped[str] = mapped_column(String(128), nullable=False)
+    status: Mapped[str] = mapped_column(String(16), nullable=False)
+    started_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    duration_ms: Mapped[float | None] = mapped_column(Float, nullable=True)
+    result_count: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+
+class FundMetric(Base):
+    """基金业绩指标（按最新净值日预计算）。"""
+
+    __tablename__ = "fund_metrics"
+
+    fund_code: Mapped[str] = mapped_column(String(32), primary_key=True)
+    nav_date: Mapped[dt_date] = mapped_column(Date, nullable=False)
+    return_1m_percent: Mapped[float | None] = mapped_column(Float, nullable=True)
+    return_3m_percent: Mapped[float | None] = mapped_column(Float, nullable=True)
+    return_1y_percent: Mapped[float | None] = mapped_column(Float, nullable=True)
+    annualized_volatility_percent: Mapped[float | None] = mapped_column(
+        Float, nullable=True
+    )
+    max_drawdown_percent: Mapped[float | None] = mapped_column(Float, nullable=True)
+    sharpe_ratio: Mapped[float | None] = mapped_column(Float, nullable=True)
+    computed_at: Mapped[datetime] = mapped_column(DateTime, default=cst_now)
+    checked_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+
+class FundPortfolioHolding(Base):
+    """基金季度股票持仓（按季度持久化的定期报告持仓明细）。"""
+
+    __tablename__ = "fund_portfolio_holdings"
+    __table_args__ = (
+        UniqueConstraint(
+            "fund_code", "year", "quarter", "stock_code", name="uniq_fund_quarter_stock"
+        ),
+        Index("idx_portfolio_fund_quarter", "fund_code", "year", "quarter"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    fund_code: Mapped[str] = mapped_column(String(32), nullable=False)
+    year: Mapped[int] = mapped_column(Integer, nullable=False)
+    quarter: Mapped[int] = mapped_column(Integer, nullable=False)
+    quarter_label: Mapped[str] = mapped_column(String(64), nullable=False)
+    stock_code: Mapped[str] = mapped_column(String(16), nullable=False)
+    stock_name: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    weight_percent: Mapped[float | None] = mapped_column(Float, nullable=True)
+    shares: Mapped[float | None] = mapped_column(Float, nullable=True)
+    market_value: Mapped[float | None] = mapped_column(Float, nullable=True)
+
+
+class FundPortfolioFetch(Base):
+    """基金年度持仓拉取记录，用于判断是否需要重新下载。"""
+
+    __tablename__ = "fund_portfolio_fetches"
+
+    fund_code: Mapped[str] = mapped_column(String(32), primary_key=True)
+    year: Mapped[int] = mapped_column(Integer, primary_key=True)
+    latest_quarter: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    fetched_at: Mapped[datetime] = mapped_column(DateTime, default=cst_now)
@@ -44,6 +44,47 @@ class FundHolding(BaseModel):
     )
 
 
+class FundHoldingChangeItem(BaseModel):
+    stock_code: str = Field(..., description="股票代码", examples=["600519"])
+    stock_name: str | None = Field(
+        default=None, description="股票名称", examples=["贵州茅台"]
+    )
+    previous_weight_percent: float | None = Field(
+        default=None, description="上期占净值比例（百分比）", examples=[8.12]
+    )
+    current_weight_percent: float | None = Field(
+        default=None, description="本期占净值比例（百分比）", examples=[9.35]
+    )
+    weight_change_percent: float | None = Field(
+        default=None, description="占净值比例变动（百分点）", examples=[1.23]
+    )
+    previous_shares: float | None = Field(
+        default=None, description="上期持股数（万股）", examples=[120.5]
+    )
+    current_shares: float | None = Field(
+        default=None, description="本期持股数（万股）", examples=[131.2]
+    )
+
+
+class FundHoldingsDiffResponse(BaseModel):
+    code: str = Field(..., description="基金代码", examples=["161725"])
+    name: str | None = Field(
+        default=None, description="基金名称", examples=["招商中证白酒"]
+    )
+    type: str | None = Field(default=None, description="基金类型", examples=["指数型"])
+    current_quarter: str | None = Field(
+        default=None, description="本期季度", examples=["2025年2季度"]
+    )
+    previous_quarter: str | None = Field(
+        default=None, description="上期季度", examples=["2025年1季度"]
+    )
+    added: list[FundHoldingChangeItem] = Field(..., description="新进持仓")
+    removed: list[FundHoldingChangeItem] = Field(..., description="退出持仓")
+    changed: list[FundHoldingChangeItem] = Field(
+        ..., description="两期均持有的股票，按占比变动绝对值降序"
+    )
+
+
 class FundNavHistoryPeriod(str, Enum):
     one_week = "one_week"
     one_month = "one_month"
@@ -52,6 +93,11 @@ class FundNavHistoryPeriod(str, Enum):
     since_inception = "since_inception"
 
 
+class FundNavHistoryFormat(str, Enum):
+    rows = "rows"
+    columns = "columns"
+
+
 class FundNavHistoryItem(BaseModel):
     date: dt_date | str = Field(..., description="净值日期", examples=["2025-01-31"])
     nav: float | str = Field(..., description="单位净值", examples=[1.2345])
@@ -77,6 +123,83 @@ class FundNavHistoryResponse(BaseModel):
     data: list[FundNavHistoryItem] = Field(..., description="历史净值列表")
 
 
+class FundNavHistoryColumnsResponse(BaseModel):
+    """历史净值列式格式：各字段为等长数组，适合图表直接使用。"""
+
+    code: str = Field(..., description="基金代码", examples=["161725"])
+    name: str | None = Field(
+        default=None, description="基金名称", examples=["招商中证白酒"]
+    )
+    type: str | None = Field(default=None, description="基金类型", examples=["指数型"])
+    period: str = Field(..., description="查询周期", examples=["one_year"])
+    dates: list[str] = Field(..., description="净值日期", examples=[["2025-01-31"]])
+    nav: list[float | None] = Field(..., description="单位净值", examples=[[1.2345]])
+    daily_growth: list[float | None] | None = Field(
+        default=None, description="日涨幅（百分比）", examples=[[0.58]]
+    )
+    nav_7d: list[float | None] | None = Field(
+        default=None, description="七日年化（货币型基金）", examples=[None]
+    )
+
+
+class FundCompareSeries(BaseModel):
+    code: str = Field(..., description="基金代码", examples=["161725"])
+    name: str | None = Field(
+        default=None, description="基金名称", examples=["招商中证白酒"]
+    )
+    type: str | None = Field(default=None, description="基金类型", examples=["指数型"])
+    values: list[float | None] = Field(
+        ..., description="归一化净值，与 dates 一一对应", examples=[[1.0, 1.012]]
+    )
+    total_return_percent: float | None = Field(
+        default=None, description="区间累计收益率（百分比）", examples=[1.2]
+    )
+
+
+class FundCompareResponse(BaseModel):
+    period: str = Field(..., description="查询周期", examples=["one_year"])
+    base: float = Field(..., description="归一化基准值", examples=[1.0])
+    base_date: dt_date | None = Field(
+        default=None, description="归一化基准日（各基金均有净值的首个交易日）"
+    )
+    dates: list[str] = Field(
+        ..., description="对齐后的交易日", examples=[["2025-01-02"]]
+    )
+    series: list[FundCompareSeries] = Field(..., description="各基金归一化净值")
+    correlation: list[list[float | None]] | None = Field(
+        default=None,
+        description="日收益率相关系数矩阵，行列顺序与 series 一致",
+    )
+
+
+class FundMetricsResponse(BaseModel):
+    code: str = Field(..., description="基金代码", examples=["161725"])
+    name: str | None = Field(
+        default=None, description="基金名称", examples=["招商中证白酒"]
+    )
+    type: str | None = Field(default=None, description="基金类型", examples=["指数型"])
+    nav_date: dt_date = Field(..., description="计算所基于的最新净值日期")
+    return_1m_percent: float | None = Field(
+        default=None, description="近一月收益率（百分比）", examples=[2.35]
+    )
+    return_3m_percent: float | None = Field(
+        default=None, description="近三月收益率（百分比）", examples=[-4.1]
+    )
+    return_1y_percent: float | None = Field(
+        default=None, description="近一年收益率（百分比）", examples=[12.8]
+    )
+    annualized_volatility_percent: float | None = Field(
+        default=None, description="近一年年化波动率（百分比）", examples=[21.5]
+    )
+    max_drawdown_percent: float | None = Field(
+        default=None, description="近一年最大回撤（百分比）", examples=[15.2]
+    )
+    sharpe_ratio: float | None = Field(
+        default=None, description="近一年夏普比率", examples=[0.52]
+    )
+    computed_at: datetime = Field(..., description="计算时间")
+
+
 class FundSnapshotResponse(BaseModel):
     code: str = Field(..., description="基金代码", examples=["161725"])
     name: str | None = Field(
@@ -216,6 +339,71 @@ class FundAccountSummaryResponse(BaseModel):
     total_profit_percent: float | None = Field(default=None, description="总盈亏比例")
 
 
+class FundAccountDailyValueItem(BaseModel):
+    date: dt_date = Field(..., description="估值日期", examples=["2025-01-31"])
+    total_cost: float = Field(..., description="总成本", examples=[10000.0])
+    total_value: float = Field(..., description="总市值", examples=[12000.0])
+    total_profit: float = Field(..., description="总盈亏", examples=[2000.0])
+    total_profit_percent: float | None = Field(default=None, description="总盈亏比例")
+
+
+class FundAccountDailyValueResponse(BaseModel):
+    account_id: int = Field(..., description="账户 ID", examples=[1])
+    fund_code: str | None = Field(
+        default=None, description="基金代码", examples=["161725"]
+    )
+    data: list[FundAccountDailyValueItem] = Field(..., description="每日估值列表")
+
+
+class FundReturnAnalyticsResponse(BaseModel):
+    account_id: int = Field(..., description="账户 ID", examples=[1])
+    holding_id: int | None = Field(default=None, description="持仓 ID")
+    fund_code: str | None = Field(
+        default=None, description="基金代码", examples=["161725"]
+    )
+    start_date: dt_date | None = Field(default=None, description="统计开始日期")
+    end_date: dt_date | None = Field(default=None, description="统计结束日期")
+    total_invested: float = Field(..., description="累计买入金额", examples=[10000.0])
+    total_redeemed: float = Field(..., description="累计卖出金额", examples=[2000.0])
+    ending_value: float | None = Field(
+        default=None, description="期末市值", examples=[9000.0]
+    )
+    money_weighted_return_percent: float | None = Field(
+        default=None, description="资金加权收益率 XIRR（年化，百分比）"
+    )
+    time_weighted_return_percent: float | None = Field(
+        default=None, description="时间加权收益率（累计，百分比）"
+    )
+    annualized_time_weighted_return_percent: float | None = Field(
+        default=None, description="时间加权收益率（年化，百分比）"
+    )
+    max_drawdown_percent: float | None = Field(
+        default=None, description="最大回撤（百分比）"
+    )
+    annualized_volatility_percent: float | None = Field(
+        default=None, description="年化波动率（百分比）"
+    )
+
+
+class StockExposureItem(BaseModel):
+    stock_code: str = Field(..., description="股票代码", examples=["600519"])
+    stock_name: str = Field(..., description="股票名称", examples=["贵州茅台"])
+    exposure_value: float = Field(..., description="穿透持仓市值", examples=[1234.56])
+    exposure_percent: float | None = Field(
+        default=None, description="占账户总市值比例（百分比）", examples=[5.23]
+    )
+    fund_codes: list[str] = Field(..., description="持有该股票的基金代码")
+
+
+class FundAccountStockExposureResponse(BaseModel):
+    account_id: int = Field(..., description="账户 ID", examples=[1])
+    total_value: float = Field(..., description="账户预估总市值", examples=[12000.0])
+    covered_value: float = Field(
+        ..., description="可穿透到股票的市值合计", examples=[6000.0]
+    )
+    data: list[StockExposureItem] = Field(..., description="股票穿透持仓列表")
+
+
 class FundHoldingTransactionCreateRequest(BaseModel):
     account_id: int = Field(..., description="账户 ID", examples=[1])
     fund_code: str = Field(..., description="基金代码", examples=["161725"])
@@ -293,3 +481,44 @@ class FundConversionResponse(BaseModel):
     to_transaction: FundHoldingTransactionResponse = Field(
         ..., description="转入交易记录"
     )
+
+
+class FundExportFormat(str, Enum):
+    csv = "csv"
+    ndjson = "ndjson"
+
+
+class FundTransactionImportItem(BaseModel):
+    fund_code: str = Field(..., description="基金代码", examples=["161725"])
+    trade_type: FundTradeType = Field(..., description="交易方向")
+    amount: float = Field(..., description="交易金额", examples=[1000.0])
+    fee_percent: float | None = Field(
+        default=None, description="手续费比例", examples=[0.15]
+    )
+    trade_date: dt_date = Field(..., description="交易日期", examples=["2025-01-31"])
+    is_after_cutoff: bool = Field(default=False, description="是否为15点后交易")
+    remark: str | None = Field(default=None, description="备注")
+
+
+class FundTransactionImportRequest(BaseModel):
+    account_id: int = Field(..., description="账户 ID", examples=[1])
+    items: list[FundTransactionImportItem] = Field(..., description="交易列表")
+
+
+class FundTransactionImportError(BaseModel):
+    row: int = Field(..., description="行号（从 1 开始）", examples=[3])
+    fund_code: str | None = Field(
+        default=None, description="基金代码", examples=["161725"]
+    )
+    message: str = Field(..., description="错误信息")
+
+
+class FundTransactionImportResponse(BaseModel):
+    account_id: int = Field(..., description="账户 ID", examples=[1])
+    total: int = Field(..., description="提交行数", examples=[100])
+    imported: int = Field(..., description="成功导入行数", examples=[98])
+    confirmed: int = Field(..., description="已确认交易数", examples=[96])
+    pending: int = Field(..., description="待确认交易数", examples=[2])
+    errors: list[FundTransactionImportError] = Field(
+        default_factory=list, description="逐行错误明细"
+    )
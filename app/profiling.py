@@ -0,0 +1,163 @@
+"""按需请求采样分析。
+
+请求头 `X-Profile` 与配置 `PROFILE_TOKEN` 一致，或按 `PROFILE_SAMPLE_RATE` 随机命中时，
+后台线程按固定间隔采集该请求所在线程（事件循环中的请求任务，以及线程池中执行
+该请求同步逻辑的 worker）的调用栈。worker 经 `profiled` 包装后，执行期间从复制
+的上下文中取得采样会话并登记当前线程。结束后以 collapsed stack 格式写入
+`<日志目录>/profiles/<trace_id>.collapsed`，可直接用 flamegraph.pl / speedscope 查看。
+
+未命中的请求只做一次请求头比较与随机数判断，不产生其它开销。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import hmac
+import random
+import sys
+import threading
+from collections import Counter
+from collections.abc import Callable
+from pathlib import Path
+from types import FrameType
+from typing import Optional, ParamSpec, TypeVar
+
+from app.config import settings
+
+PROFILE_HEADER = "X-Profile"
+_MAX_STACK_DEPTH = 128
+
+_profile_session_var: contextvars.ContextVar[Optional["ProfileSession"]] = (
+    contextvars.ContextVar("profile_session", default=None)
+)
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+
+def should_profile(header_value: str | None) -> bool:
+    """判断当前请求是否需要采样分析。"""
+    if header_value and settings.profile_token:
+        if hmac.compare_digest(header_value, settings.profile_token):
+            return True
+    rate = settings.profile_sample_rate
+    return rate > 0 and random.random() < rate
+
+
+class ProfileSession:
+    """单个请求的采样分析会话。"""
+
+    def __init__(self, trace_id: str, interval_ms: float) -> None:
+        self.trace_id = trace_id
+        self.samples = 0
+        self._interval = max(interval_ms, 1.0) / 1000
+        self._stacks: Counter[str] = Counter()
+        self._stop_event = threading.Event()
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f"profiler-{trace_id}",
+            daemon=True,
+        )
+        self._token: contextvars.Token | None = None
+        self._worker_threads: Counter[int] = Counter()
+        self._worker_lock = threading.Lock()
+
+    def start(self) -> None:
+        """绑定到当前上下文并启动采样线程。"""
+        self._token = _profile_session_var.set(self)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """停止采样并解除上下文绑定。"""
+        self._stop_event.set()
+        if self._token is not None:
+            _profile_session_var.reset(self._token)
+            self._token = None
+
+    def write(self, output_dir: Path) -> Path:
+        """等待采样线程退出并写出 collapsed stack 文件。"""
+        self._thread.join()
+        output_dir.mkdir(parents=True, exist_ok=True)
+        path = output_dir / f"{_safe_file_name(self.trace_id)}.collapsed"
+        with path.open("w", encoding="utf-8") as handle:
+            for stack, count in self._stacks.most_common():
+                handle.write(f"{stack} {count}\n")
+        return path
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self._interval):
+            self._sample()
+
+    def _sample(self) -> None:
+        own_thread_id = threading.get_ident()
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_thread_id:
+                continue
+            if thread_id == self._loop_thread_id:
+                if not self._owns_current_task():
+                    continue
+            elif thread_id not in self._worker_threads:
+                continue
+            self._stacks[_collapse(frame)] += 1
+            self.samples += 1
+
+    def _owns_current_task(self) -> bool:
+        task = asyncio.current_task(self._loop)
+        if task is None:
+            return False
+        return task.get_context().get(_profile_session_var) is self
+
+    def _enter_worker(self, thread_id: int) -> None:
+        with self._worker_lock:
+            self._worker_threads[thread_id] += 1
+
+    def _exit_worker(self, thread_id: int) -> None:
+        with self._worker_lock:
+            self._worker_threads[thread_id] -= 1
+            if self._worker_threads[thread_id] <= 0:
+                del self._worker_threads[thread_id]
+
+
+def profiled(func: Callable[P, T]) -> Callable[P, T]:
+    """包装在线程池中执行的同步函数，执行期间将当前线程登记到所属请求的采样会话。
+
+    须在复制了请求上下文的线程中调用（`run_in_threadpool`、`Context.run`）。
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+        session = _profile_session_var.get()
+        if session is None:
+            return func(*args, **kwargs)
+        thread_id = threading.get_ident()
+        session._enter_worker(thread_id)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            session._exit_worker(thread_id)
+
+    return wrapper
+
+
+def profile_output_dir() -> Path:
+    return Path(settings.log_file).parent / "profiles"
+
+
+def _collapse(frame: FrameType) -> str:
+    names: list[str] = []
+    current: FrameType | None = frame
+    while current is not None and len(names) < _MAX_STACK_DEPTH:
+        code = current.f_code
+        file_name = Path(code.co_filename).name
+        names.append(f"{code.co_qualname}@{file_name}:{code.co_firstlineno}")
+        current = current.f_back
+    return ";".join(reversed(names)).replace(" ", "_")
+
+
+def _safe_file_name(value: str) -> str:
+    safe = "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in value)
+    return safe or "profile"
@@ -1,17 +1,31 @@
-from fastapi import APIRouter, Depends
+from datetime import date
+
+from fastapi import APIRouter, Depends, Query, Request, Response
 from sqlalchemy.orm import Session
 
 from app.db import get_db
 from app.models.schemas import (
     FundAccountCreateRequest,
+    FundAccountDailyValueResponse,
     FundAccountDetailResponse,
     FundAccountResponse,
+    FundAccountStockExposureResponse,
     FundAccountSummaryResponse,
     FundAccountUpdateRequest,
+    FundReturnAnalyticsResponse,
+)
+from app.routers.routing import ProfiledRoute
+from app.services.fund import (
+    fund_account_service,
+    fund_analytics_service,
+    fund_exposure_service,
+    fund_valuation_service,
 )
-from app.services.fund import fund_account_service
+from app.utils.http_cache import conditional_json_response
 
-router = APIRouter(prefix="/fund-accounts", tags=["fund-accounts"])
+router = APIRouter(
+    prefix="/fund-accounts", tags=["fund-accounts"], route_class=ProfiledRoute
+)
 
 
 @router.post(
@@ -66,10 +80,14 @@ def update_fund_account(
 )
 def get_fund_account_detail(
     account_id: int,
+    request: Request,
     db: Session = Depends(get_db),
-) -> FundAccountDetailResponse:
-    """获取账户详情与持仓列表。"""
-    return fund_account_service.get_account_detail(db, account_id)
+) -> Response:
+    """获取账户详情与持仓列表，支持 ETag 条件请求。"""
+    cached = fund_account_service.get_account_detail_json(db, account_id)
+    return conditional_json_response(
+        request, cached.body, cached.etag, cached.max_age, private=True
+    )
 
 
 @router.get(
@@ -85,3 +103,53 @@ def get_fund_account_summary(
 ) -> FundAccountSummaryResponse:
     """获取账户汇总指标。"""
     return fund_account_service.get_account_summary(db, account_id)
+
+
+@router.get(
+    "/{account_id}/daily-values",
+    response_model=FundAccountDailyValueResponse,
+    summary="账户每日估值",
+    description="返回预计算的账户每日成本、市值与盈亏，可按日期区间与基金代码过滤。",
+    response_description="账户每日估值列表",
+)
+def get_fund_account_daily_values(
+    account_id: int,
+    start: date | None = Query(None, description="开始日期", examples=["2025-01-01"]),
+    end: date | None = Query(None, description="结束日期", examples=["2025-12-31"]),
+    fund_code: str | None = Query(None, description="基金代码", examples=["161725"]),
+    db: Session = Depends(get_db),
+) -> FundAccountDailyValueResponse:
+    """获取账户每日估值。"""
+    return fund_valuation_service.list_account_daily_values(
+        db, account_id, start, end, fund_code
+    )
+
+
+@router.get(
+    "/{account_id}/analytics",
+    response_model=FundReturnAnalyticsResponse,
+    summary="账户收益分析",
+    description="基于交易现金流与每日估值计算 XIRR、时间加权收益率、最大回撤与波动率。",
+    response_description="账户收益分析",
+)
+def get_fund_account_analytics(
+    account_id: int,
+    db: Session = Depends(get_db),
+) -> FundReturnAnalyticsResponse:
+    """获取账户收益分析。"""
+    return fund_analytics_service.get_account_analytics(db, account_id)
+
+
+@router.get(
+    "/{account_id}/stock-exposure",
+    response_model=FundAccountStockExposureResponse,
+    summary="股票穿透持仓",
+    description="按基金最新季度持仓权重与持仓预估市值，汇总账户在各股票上的穿透持仓。",
+    response_description="股票穿透持仓",
+)
+def get_fund_account_stock_exposure(
+    account_id: int,
+    db: Session = Depends(get_db),
+) -> FundAccountStockExposureResponse:
+    """获取账户股票穿透持仓。"""
+    return fund_exposure_service.get_account_stock_exposure(db, account_id)
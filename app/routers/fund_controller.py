@@ -1,15 +1,60 @@
-from fastapi import APIRouter, Path, Query
-from fastapi.concurrency import run_in_threadpool
+from datetime import date
 
+from fastapi import APIRouter, Depends, Path, Query, Request, Response
+from sqlalchemy.orm import Session
+
+from app.db import get_db
 from app.models.schemas import (
+    FundCompareResponse,
+    FundHoldingsDiffResponse,
+    FundMetricsResponse,
+    FundNavHistoryColumnsResponse,
+    FundNavHistoryFormat,
     FundNavHistoryPeriod,
     FundNavHistoryResponse,
     FundRealtimeEstimateResponse,
     FundSnapshotResponse,
 )
-from app.services.fund import fund_service
+from app.routers.routing import ProfiledRoute, run_in_threadpool
+from app.services.fund import (
+    fund_compare_service,
+    fund_metrics_service,
+    fund_service,
+)
+from app.utils.http_cache import conditional_json_response
 
-router = APIRouter(prefix="/funds", tags=["funds"])
+router = APIRouter(prefix="/funds", tags=["funds"], route_class=ProfiledRoute)
+
+
+@router.get(
+    "/compare",
+    response_model=FundCompareResponse,
+    summary="多基金净值对比",
+    description=(
+        "按交易日对齐多只基金的净值（外连接后前向填充），以各基金均有净值的首个交易日"
+        "为基准归一化，可选返回日收益率相关系数矩阵。"
+    ),
+    response_description="对齐后的归一化净值",
+)
+async def compare_funds(
+    request: Request,
+    codes: str = Query(
+        ..., description="逗号分隔的基金代码", examples=["161725,110022"]
+    ),
+    period: FundNavHistoryPeriod = Query(
+        FundNavHistoryPeriod.one_year,
+        description="查询周期",
+        examples=[FundNavHistoryPeriod.one_year.value],
+    ),
+    base: float = Query(1.0, gt=0, description="归一化基准值", examples=[100]),
+    correlation: bool = Query(False, description="是否返回相关系数矩阵"),
+) -> Response:
+    """对比多只基金的历史净值走势"""
+    fund_codes = fund_compare_service.parse_fund_codes(codes)
+    cached = await run_in_threadpool(
+        fund_compare_service.compare_funds_json, fund_codes, period, base, correlation
+    )
+    return conditional_json_response(request, cached.body, cached.etag, cached.max_age)
 
 
 @router.get(
@@ -20,29 +65,105 @@ router = APIRouter(prefix="/funds", tags=["funds"])
     response_description="基金快照数据",
 )
 async def get_fund_snapshot(
+    request: Request,
     code: str = Path(..., description="基金代码", examples=["161725"]),
-) -> FundSnapshotResponse:
-    """按基金代码返回基本信息与最新持仓"""
-    return await run_in_threadpool(fund_service.get_fund_snapshot, code)
+) -> Response:
+    """按基金代码返回基本信息与最新持仓，支持 ETag 条件请求"""
+    cached = await run_in_threadpool(fund_service.get_fund_snapshot_json, code)
+    return conditional_json_response(request, cached.body, cached.etag, cached.max_age)
+
+
+@router.get(
+    "/{code}/holdings/diff",
+    response_model=FundHoldingsDiffResponse,
+    summary="季度持仓变动",
+    description=(
+        "比较最近两个季度披露的股票持仓，返回新进、退出与两期均持有股票的占比变动。"
+        "季度持仓落库保存，每个季度仅从上游下载一次。"
+    ),
+    response_description="季度持仓变动",
+)
+async def get_fund_holdings_diff(
+    code: str = Path(..., description="基金代码", examples=["161725"]),
+) -> FundHoldingsDiffResponse:
+    """按基金代码返回最近两个季度的持仓变动"""
+    return await run_in_threadpool(fund_service.get_fund_holdings_diff, code)
+
+
+@router.get(
+    "/{code}/metrics",
+    response_model=FundMetricsResponse,
+    summary="基金业绩指标",
+    description=(
+        "返回近一月/三月/一年收益率及近一年年化波动率、最大回撤与夏普比率。"
+        "指标按最新净值日预计算，每只基金每个交易日仅计算一次。"
+    ),
+    response_description="基金业绩指标",
+)
+def get_fund_metrics(
+    code: str = Path(..., description="基金代码", examples=["161725"]),
+    db: Session = Depends(get_db),
+) -> FundMetricsResponse:
+    """按基金代码返回预计算的业绩指标"""
+    return fund_metrics_service.get_fund_metrics(db, code)
 
 
 @router.get(
     "/{code}/nav-history",
-    response_model=FundNavHistoryResponse,
+    response_model=FundNavHistoryResponse | FundNavHistoryColumnsResponse,
     summary="历史净值",
-    description="按基金代码返回指定周期内的历史净值数据。",
+    description=(
+        "按基金代码返回指定周期内的历史净值数据，"
+        "可用 `start`/`end` 进一步限定日期区间，"
+        "或用 `since` 只拉取该日期之后的新净值。"
+        "`format=columns` 时返回列式数组，体积约为逐行格式的一半。"
+    ),
     response_description="历史净值列表",
 )
 async def get_fund_nav_history(
+    request: Request,
     code: str = Path(..., description="基金代码", examples=["161725"]),
     period: FundNavHistoryPeriod = Query(
         FundNavHistoryPeriod.since_inception,
         description="查询周期",
         examples=[FundNavHistoryPeriod.since_inception.value],
     ),
-) -> FundNavHistoryResponse:
-    """按基金代码返回历史净值"""
-    return await run_in_threadpool(fund_service.get_fund_nav_history, code, period)
+    format: FundNavHistoryFormat = Query(
+        FundNavHistoryFormat.rows,
+        description="返回格式：rows 为逐行对象，columns 为列式数组",
+        examples=[FundNavHistoryFormat.columns.value],
+    ),
+    start: date | None = Query(
+        None, description="开始日期（含）", examples=["2025-01-01"]
+    ),
+    end: date | None = Query(
+        None, description="结束日期（含）", examples=["2025-12-31"]
+    ),
+    since: date | None = Query(
+        None,
+        description="增量查询：只返回晚于该日期的净值",
+        examples=["2025-06-30"],
+    ),
+    max_points: int | None = Query(
+        None,
+        ge=3,
+        le=10_000,
+        description="最多返回的点数，超出时按区间保留极值点降采样（用于图表）",
+        examples=[500],
+    ),
+) -> Response:
+    """按基金代码返回历史净值，支持 ETag 条件请求与压缩"""
+    cached = await run_in_threadpool(
+        fund_service.get_fund_nav_history_json,
+        code,
+        period,
+        format,
+        start,
+        end,
+        since,
+        max_points,
+    )
+    return conditional_json_response(request, cached.body, cached.etag, cached.max_age)
 
 
 @router.get(
@@ -54,6 +175,9 @@ async def get_fund_nav_history(
 )
 async def get_fund_realtime_estimate(
     code: str = Path(..., description="基金代码", examples=["161725"]),
-) -> FundRealtimeEstimateResponse:
-    """按基金代码返回实时预估净值与涨幅"""
-    return await run_in_threadpool(fund_service.get_fund_realtime_estimate, code)
+) -> Response:
+    """按基金代码返回实时预估净值与涨幅（直接返回缓存的 JSON，不再经过模型校验）"""
+    content = await run_in_threadpool(
+        fund_service.get_fund_realtime_estimate_json, code
+    )
+    return Response(content=content, media_type="application/json")
@@ -1,23 +1,36 @@
-from fastapi import APIRouter, Depends, Path, Query
+from collections.abc import Iterator
+
+from fastapi import APIRouter, Depends, Path, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.db import get_db
 from app.models.schemas import (
     FundConversionCreateRequest,
     FundConversionResponse,
+    FundExportFormat,
     FundHoldingCreateRequest,
     FundHoldingPositionResponse,
     FundHoldingTransactionCreateRequest,
     FundHoldingTransactionResponse,
     FundHoldingUpdateRequest,
+    FundReturnAnalyticsResponse,
+    FundTransactionImportRequest,
+    FundTransactionImportResponse,
 )
+from app.routers.routing import ProfiledRoute, run_in_threadpool
 from app.services.fund import (
     fund_account_service,
+    fund_analytics_service,
     fund_conversion_service,
+    fund_export_service,
     fund_holding_service,
+    fund_import_service,
 )
 
-router = APIRouter(prefix="/fund-holdings", tags=["fund-holdings"])
+router = APIRouter(
+    prefix="/fund-holdings", tags=["fund-holdings"], route_class=ProfiledRoute
+)
 
 
 @router.get(
@@ -36,6 +49,25 @@ def list_fund_holdings(
     return fund_account_service.list_account_holdings(db, account_id, fund_code)
 
 
+@router.get(
+    "/export",
+    summary="导出持仓",
+    description="按账户流式导出持仓记录，支持 csv 与 ndjson 格式。",
+    response_class=StreamingResponse,
+    response_description="持仓记录文件流",
+)
+def export_fund_holdings(
+    account_id: int = Query(..., description="账户 ID", examples=[1]),
+    export_format: FundExportFormat = Query(
+        FundExportFormat.csv, alias="format", description="导出格式"
+    ),
+    db: Session = Depends(get_db),
+) -> StreamingResponse:
+    """流式导出账户持仓。"""
+    content = fund_export_service.export_holdings(db, account_id, export_format)
+    return _build_export_response(content, export_format, f"holdings_{account_id}")
+
+
 @router.post(
     "",
     response_model=FundHoldingTransactionResponse,
@@ -66,6 +98,21 @@ def get_fund_holding_detail(
     return fund_holding_service.get_holding_detail(db, holding_id)
 
 
+@router.get(
+    "/{holding_id}/analytics",
+    response_model=FundReturnAnalyticsResponse,
+    summary="持仓收益分析",
+    description="基于交易现金流与每日估值计算 XIRR、时间加权收益率、最大回撤与波动率。",
+    response_description="持仓收益分析",
+)
+def get_fund_holding_analytics(
+    holding_id: int = Path(..., description="持仓 ID", examples=[1]),
+    db: Session = Depends(get_db),
+) -> FundReturnAnalyticsResponse:
+    """获取持仓收益分析。"""
+    return fund_analytics_service.get_holding_analytics(db, holding_id)
+
+
 @router.put(
     "/{holding_id}",
     response_model=FundHoldingPositionResponse,
@@ -111,6 +158,49 @@ def create_fund_transaction(
     return fund_holding_service.create_transaction(db, payload)
 
 
+@router.post(
+    "/transactions/import",
+    response_model=FundTransactionImportResponse,
+    summary="批量导入交易",
+    description="按时间顺序批量导入交易记录，单个事务写入，返回逐行错误。",
+    response_description="导入结果",
+)
+def import_fund_transactions(
+    payload: FundTransactionImportRequest,
+    db: Session = Depends(get_db),
+) -> FundTransactionImportResponse:
+    """批量导入交易（JSON）。"""
+    return fund_import_service.import_transactions(db, payload)
+
+
+@router.post(
+    "/transactions/import/csv",
+    response_model=FundTransactionImportResponse,
+    summary="批量导入交易（CSV）",
+    description=(
+        "请求体为 text/csv，表头字段：fund_code, trade_type, amount, fee_percent, "
+        "trade_date, is_after_cutoff, remark。"
+    ),
+    response_description="导入结果",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"text/csv": {"schema": {"type": "string"}}},
+        }
+    },
+)
+async def import_fund_transactions_csv(
+    request: Request,
+    account_id: int = Query(..., description="账户 ID", examples=[1]),
+    db: Session = Depends(get_db),
+) -> FundTransactionImportResponse:
+    """批量导入交易（CSV）。"""
+    content = (await request.body()).decode("utf-8")
+    return await run_in_threadpool(
+        fund_import_service.import_transactions_csv, db, account_id, content
+    )
+
+
 @router.get(
     "/transactions",
     response_model=list[FundHoldingTransactionResponse],
@@ -127,6 +217,28 @@ def list_fund_transactions(
     return fund_holding_service.list_transactions(db, account_id, fund_code)
 
 
+@router.get(
+    "/transactions/export",
+    summary="导出交易记录",
+    description="按账户流式导出交易记录，支持 csv 与 ndjson 格式，可选基金代码过滤。",
+    response_class=StreamingResponse,
+    response_description="交易记录文件流",
+)
+def export_fund_transactions(
+    account_id: int = Query(..., description="账户 ID", examples=[1]),
+    fund_code: str | None = Query(None, description="基金代码", examples=["161725"]),
+    export_format: FundExportFormat = Query(
+        FundExportFormat.csv, alias="format", description="导出格式"
+    ),
+    db: Session = Depends(get_db),
+) -> StreamingResponse:
+    """流式导出账户交易记录。"""
+    content = fund_export_service.export_transactions(
+        db, account_id, fund_code, export_format
+    )
+    return _build_export_response(content, export_format, f"transactions_{account_id}")
+
+
 @router.post(
     "/conversions",
     response_model=FundConversionResponse,
@@ -155,3 +267,19 @@ def list_fund_conversions(
 ) -> list[FundConversionResponse]:
     """获取账户转换记录。"""
     return fund_conversion_service.list_conversions(db, account_id)
+
+
+def _build_export_response(
+    content: Iterator[str],
+    export_format: FundExportFormat,
+    filename: str,
+) -> StreamingResponse:
+    return StreamingResponse(
+        content,
+        media_type=fund_export_service.EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="{filename}.{export_format.value}"'
+            )
+        },
+    )
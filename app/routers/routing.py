@@ -0,0 +1,31 @@
+"""路由公共设施：线程池中执行的同步逻辑计入所属请求的采样分析。"""
+
+from __future__ import annotations
+
+import inspect
+from collections.abc import Callable
+from typing import Any, ParamSpec, TypeVar
+
+from fastapi.concurrency import run_in_threadpool as _run_in_threadpool
+from fastapi.routing import APIRoute
+
+from app.profiling import profiled
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+
+async def run_in_threadpool(
+    func: Callable[P, T], *args: P.args, **kwargs: P.kwargs
+) -> T:
+    """在线程池中执行同步函数，采样分析时计入所属请求。"""
+    return await _run_in_threadpool(profiled(func), *args, **kwargs)
+
+
+class ProfiledRoute(APIRoute):
+    """同步接口由 FastAPI 放入线程池执行，包装后计入所属请求的采样分析。"""
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        if not inspect.iscoroutinefunction(endpoint):
+            endpoint = profiled(endpoint)
+        super().__init__(path, endpoint, **kwargs)
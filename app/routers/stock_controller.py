@@ -1,10 +1,10 @@
 from fastapi import APIRouter, Path
-from fastapi.concurrency import run_in_threadpool
 
 from app.models.schemas import StockRealtimeQuoteResponse
+from app.routers.routing import ProfiledRoute, run_in_threadpool
 from app.services.stock import stock_service
 
-router = APIRouter(prefix="/stocks", tags=["stocks"])
+router = APIRouter(prefix="/stocks", tags=["stocks"], route_class=ProfiledRoute)
 
 
 @router.get(
@@ -0,0 +1,321 @@
+"""akshare 调用适配层。
+
+服务层只通过本模块访问 akshare，每个接口统一具备：
+- 并发上限（信号量）与令牌桶限速，避免突发请求触发东方财富限流；
+- 硬超时：调用在独立线程池中执行，超时后立即返回，不再占用请求线程；
+- 网络类错误按抖动指数退避重试；
+- 按接口熔断：重试耗尽的失败连续出现时短时间内直接拒绝；
+- 可选的 SQLite 磁盘响应缓存（按接口与参数），上游失败或熔断时回退到过期缓存。
+
+`set_backend` 可替换底层实现（如基准与压测中的 fixtures 回放）。
+"""
+
+from __future__ import annotations
+
+import contextvars
+import hashlib
+import json
+import logging
+import pickle
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from app.circuit_breaker import CircuitBreaker
+from app.config import settings
+from app.exceptions import CircuitOpenError, UpstreamError, UpstreamTimeoutError
+from app.metrics import record_upstream_outcome, track_upstream
+from app.profiling import profiled
+from app.utils.lazy_import import lazy_import
+
+if TYPE_CHECKING:
+    import pandas as pd
+else:
+    pd = lazy_import("pandas")
+
+_logger = logging.getLogger(__name__)
+
+NAV_INDICATOR = "单位净值走势"
+
+
+class EndpointPolicy(NamedTuple):
+    """单个接口的调用策略；`disk_cache_ttl` 为 0 表示不做磁盘缓存。"""
+
+    max_concurrency: int
+    rate_per_second: float
+    disk_cache_ttl: float
+
+
+def _build_policies() -> dict[str, EndpointPolicy]:
+    concurrency = max(settings.akshare_max_concurrency, 1)
+    rate = settings.akshare_rate_limit_per_second
+    return {
+        # 全量列表类接口数据量大、变化慢，串行且低频
+        "fund_name_em": EndpointPolicy(1, min(rate, 1.0), 12 * 3600),
+        "tool_trade_date_hist_sina": EndpointPolicy(1, min(rate, 1.0), 24 * 3600),
+        "fund_individual_basic_info_xq": EndpointPolicy(concurrency, rate, 24 * 3600),
+        "fund_open_fund_info_em": EndpointPolicy(concurrency, rate, 10 * 60),
+        "fund_money_fund_info_em": EndpointPolicy(concurrency, rate, 10 * 60),
+        "fund_portfolio_hold_em": EndpointPolicy(concurrency, rate, 24 * 3600),
+    }
+
+
+_POLICIES = _build_policies()
+
+
+class TokenBucket:
+    """线程安全的令牌桶。"""
+
+    def __init__(self, rate_per_second: float, burst: int) -> None:
+        self._rate = rate_per_second
+        self._capacity = max(burst, 1)
+        self._tokens = float(self._capacity)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: float) -> bool:
+        """获取一个令牌，最多等待 `timeout` 秒。"""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self._capacity, self._tokens + (now - self._updated_at) * self._rate
+                )
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self._rate
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class _Endpoint:
+    def __init__(self, name: str, policy: EndpointPolicy) -> None:
+        self.policy = policy
+        self.breaker = CircuitBreaker(f"akshare.{name}")
+        self.semaphore = threading.BoundedSemaphore(policy.max_concurrency)
+        self.bucket = (
+            TokenBucket(policy.rate_per_second, max(int(policy.rate_per_second), 1))
+            if policy.rate_per_second > 0
+            else None
+        )
+
+
+class _DiskCache:
+    """SQLite 响应缓存，值为 pickle 后的 DataFrame。"""
+
+    def __init__(self, path: str) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, endpoint TEXT, created_at REAL, payload BLOB)"
+            )
+            self._conn.commit()
+
+    def get(self, key: str) -> tuple[float, pd.DataFrame] | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT created_at, payload FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], pickle.loads(row[1])
+
+    def set(self, key: str, endpoint: str, frame: pd.DataFrame) -> None:
+        payload = pickle.dumps(frame, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                (key, endpoint, time.time(), payload),
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_backend: Any = None
+_endpoints = {name: _Endpoint(name, policy) for name, policy in _POLICIES.items()}
+_executor = ThreadPoolExecutor(
+    max_workers=sum(policy.max_concurrency for policy in _POLICIES.values()),
+    thread_name_prefix="akshare",
+)
+_disk_cache: _DiskCache | None = None
+_disk_cache_lock = threading.Lock()
+_RETRYABLE_ERRORS: tuple[type[BaseException], ...] = (OSError,)
+try:
+    from requests import RequestException
+
+    _RETRYABLE_ERRORS = (OSError, RequestException)
+except ImportError:  # pragma: no cover - requests 随 akshare 安装
+    pass
+
+
+def set_backend(backend: Any) -> None:
+    """替换底层实现（需提供同名函数），传入 None 恢复 akshare。"""
+    global _backend
+    _backend = backend
+
+
+def _get_backend() -> Any:
+    global _backend
+    if _backend is None:
+        import akshare
+
+        _backend = akshare
+    return _backend
+
+
+def _get_disk_cache() -> _DiskCache | None:
+    global _disk_cache
+    if not settings.akshare_disk_cache_path:
+        return None
+    with _disk_cache_lock:
+        if _disk_cache is None:
+            _disk_cache = _DiskCache(settings.akshare_disk_cache_path)
+    return _disk_cache
+
+
+def close() -> None:
+    """关闭磁盘缓存连接。"""
+    global _disk_cache
+    with _disk_cache_lock:
+        if _disk_cache is not None:
+            _disk_cache.close()
+            _disk_cache = None
+
+
+def _cache_key(name: str, kwargs: dict[str, Any]) -> str:
+    raw = json.dumps([name, sorted((k, str(v)) for k, v in kwargs.items())])
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def _invoke_once(name: str, kwargs: dict[str, Any], deadline: float) -> pd.DataFrame:
+    endpoint = _endpoints[name]
+    if not endpoint.semaphore.acquire(timeout=max(deadline - time.monotonic(), 0)):
+        record_upstream_outcome("akshare", name, "throttled")
+        raise UpstreamTimeoutError(f"akshare {name} 等待并发配额超时")
+    released = False
+    try:
+        bucket = endpoint.bucket
+        if (
+            bucket is not None
+            and settings.akshare_rate_limit_per_second > 0
+            and not bucket.acquire(max(deadline - time.monotonic(), 0))
+        ):
+            record_upstream_outcome("akshare", name, "throttled")
+            raise UpstreamTimeoutError(f"akshare {name} 等待限速配额超时")
+
+        @profiled
+        def _tracked(**call_kwargs: Any) -> pd.DataFrame:
+            with track_upstream("akshare", name):
+                return getattr(_get_backend(), name)(**call_kwargs)
+
+        future: Future = _executor.submit(
+            contextvars.copy_context().run, _tracked, **kwargs
+        )
+        # 上游调用真正结束后才归还并发配额，超时的调用仍计入并发上限
+        future.add_done_callback(lambda _: endpoint.semaphore.release())
+        released = True
+        try:
+            return future.result(timeout=max(deadline - time.monotonic(), 0))
+        except FutureTimeoutError as exc:
+            record_upstream_outcome("akshare", name, "timeout")
+            raise UpstreamTimeoutError(f"akshare {name} 调用超时") from exc
+    finally:
+        if not released:
+            endpoint.semaphore.release()
+
+
+def _invoke_with_retry(name: str, kwargs: dict[str, Any]) -> pd.DataFrame:
+    deadline = time.monotonic() + settings.akshare_timeout_seconds
+    attempt = 0
+    while True:
+        try:
+            return _invoke_once(name, kwargs, deadline)
+        except _RETRYABLE_ERRORS as exc:
+            attempt += 1
+            backoff = settings.akshare_retry_backoff_seconds * 2 ** (attempt - 1)
+            backoff *= random.uniform(0.5, 1.5)
+            if (
+                attempt > settings.akshare_max_retries
+                or time.monotonic() + backoff >= deadline
+            ):
+                raise UpstreamError(f"akshare {name} 调用失败: {exc}") from exc
+            _logger.warning(
+                "akshare 调用失败，%.2fs 后重试(%s/%s): %s %s",
+                backoff,
+                attempt,
+                settings.akshare_max_retries,
+                name,
+                exc,
+            )
+            time.sleep(backoff)
+
+
+def call(name: str, **kwargs: Any) -> pd.DataFrame:
+    """按接口策略调用 akshare 函数。"""
+    policy = _POLICIES[name]
+    disk_cache = _get_disk_cache() if policy.disk_cache_ttl > 0 else None
+    key = _cache_key(name, kwargs)
+    cached = disk_cache.get(key) if disk_cache is not None else None
+    if cached is not None and time.time() - cached[0] < policy.disk_cache_ttl:
+        return cached[1]
+    breaker = _endpoints[name].breaker
+    try:
+        if not breaker.allow():
+            raise CircuitOpenError(f"akshare {name} 熔断中，暂不请求")
+        try:
+            frame = _invoke_with_retry(name, kwargs)
+        except UpstreamError:
+            breaker.record_failure()
+            raise
+        except Exception:
+            # 上游有响应（如参数无效），不计为不可用
+            breaker.record_success()
+            raise
+        breaker.record_success()
+    except UpstreamError:
+        if cached is None:
+            raise
+        _logger.warning("akshare 调用失败，使用过期磁盘缓存: %s %s", name, kwargs)
+        return cached[1]
+    if disk_cache is not None and isinstance(frame, pd.DataFrame) and not frame.empty:
+        disk_cache.set(key, name, frame)
+    return frame
+
+
+def fund_name_em() -> pd.DataFrame:
+    return call("fund_name_em")
+
+
+def tool_trade_date_hist_sina() -> pd.DataFrame:
+    return call("tool_trade_date_hist_sina")
+
+
+def fund_individual_basic_info_xq(symbol: str) -> pd.DataFrame:
+    return call("fund_individual_basic_info_xq", symbol=symbol)
+
+
+def fund_open_fund_info_em(symbol: str, indicator: str = NAV_INDICATOR) -> pd.DataFrame:
+    return call("fund_open_fund_info_em", symbol=symbol, indicator=indicator)
+
+
+def fund_money_fund_info_em(symbol: str) -> pd.DataFrame:
+    return call("fund_money_fund_info_em", symbol=symbol)
+
+
+def fund_portfolio_hold_em(symbol: str, date: str | int) -> pd.DataFrame:
+    return call("fund_portfolio_hold_em", symbol=symbol, date=str(date))
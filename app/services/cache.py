@@ -1,37 +1,116 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
+import threading
+import time
+from collections import OrderedDict
 from concurrent.futures import ThreadPoolExecutor, TimeoutError
 from datetime import timedelta
-from typing import Any, Callable
+from typing import TYPE_CHECKING, Any, Callable, NamedTuple
 
-import akshare as ak
-import pandas as pd
 import redis
 from redis.exceptions import RedisError
 
+from app.circuit_breaker import CircuitBreaker
 from app.config import settings
+from app.exceptions import UpstreamError
+from app.metrics import record_cache_result, track_cache
+from app.services import akshare_adapter, trading_calendar
+from app.services.snapshot_store import load_snapshot, save_snapshot
+from app.utils.lazy_import import lazy_import
+
+if TYPE_CHECKING:
+    import pandas as pd
+else:
+    pd = lazy_import("pandas")
 
 FUND_LIST_CACHE_KEY = "fund:list"
 FUND_BASIC_INFO_CACHE_PREFIX = "fund:basic_info"
 FUND_HOLDINGS_CACHE_PREFIX = "fund:latest_holdings"
 FUND_ESTIMATE_CACHE_PREFIX = "fund:realtime_estimate"
+FUND_SNAPSHOT_CACHE_PREFIX = "fund:snapshot"
+FUND_NAV_HISTORY_CACHE_PREFIX = "fund:nav_history"
+FUND_NAV_SERIES_CACHE_PREFIX = "fund:nav_series"
+FUND_COMPARE_CACHE_PREFIX = "fund:compare"
 STOCK_QUOTE_CACHE_PREFIX = "stock:realtime_quote"
+ACCOUNT_EXPOSURE_CACHE_PREFIX = "account:stock_exposure"
+ACCOUNT_DETAIL_CACHE_PREFIX = "account:detail"
 
 _CACHE_TTL = timedelta(minutes=30)
+_FUND_LIST_SNAPSHOT = "fund_list"
+_FUND_LIST_SNAPSHOT_MAX_AGE = timedelta(hours=12)
 _FUND_BASIC_INFO_TTL = timedelta(hours=12)
 _FUND_HOLDINGS_TTL = timedelta(hours=6)
 _FUND_ESTIMATE_TTL = timedelta(minutes=1)
 _STOCK_QUOTE_TTL = timedelta(seconds=30)
+# 穿透权重矩阵只随基金组合与披露季度变化，由指纹失效
+_ACCOUNT_EXPOSURE_TTL = timedelta(hours=12)
+# 与 akshare 净值接口的磁盘缓存有效期一致
+_FUND_SNAPSHOT_TTL = timedelta(minutes=10)
+_FUND_NAV_HISTORY_TTL = timedelta(minutes=10)
+_ACCOUNT_DETAIL_TTL = _FUND_ESTIMATE_TTL
+_CACHE_PREFIXES = (
+    FUND_LIST_CACHE_KEY,
+    FUND_BASIC_INFO_CACHE_PREFIX,
+    FUND_HOLDINGS_CACHE_PREFIX,
+    FUND_ESTIMATE_CACHE_PREFIX,
+    STOCK_QUOTE_CACHE_PREFIX,
+    FUND_SNAPSHOT_CACHE_PREFIX,
+    FUND_NAV_HISTORY_CACHE_PREFIX,
+    FUND_NAV_SERIES_CACHE_PREFIX,
+    FUND_COMPARE_CACHE_PREFIX,
+    ACCOUNT_EXPOSURE_CACHE_PREFIX,
+    ACCOUNT_DETAIL_CACHE_PREFIX,
+)
 _redis_client: redis.Redis | None = None
+_redis_breaker = CircuitBreaker("redis")
 _logger = logging.getLogger(__name__)
 
 
+class _LocalCache:
+    """进程内 TTL 缓存（LRU 淘汰），Redis 不可用时的降级路径。"""
+
+    def __init__(self, max_entries: int) -> None:
+        self._max_entries = max(max_entries, 1)
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, payload: str, ttl: timedelta) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl.total_seconds(), payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+
+_local_cache = _LocalCache(settings.local_cache_max_entries)
+
+
 def _build_cache_key(prefix: str, code: str) -> str:
     return f"{prefix}:{code}"
 
 
+def _resolve_cache_prefix(key: str) -> str:
+    """将缓存 key 归并为前缀，作为指标标签（避免高基数）。"""
+    for prefix in _CACHE_PREFIXES:
+        if key == prefix or key.startswith(f"{prefix}:"):
+            return prefix
+    return "other"
+
+
 def _get_or_set_cache(
     key: str,
     loader: Callable[[], Any],
@@ -39,12 +118,17 @@ def _get_or_set_cache(
     setter: Callable[[str, Any], None],
     should_cache: Callable[[Any], bool] | None = None,
 ) -> Any:
-    cached = getter(key)
+    prefix = _resolve_cache_prefix(key)
+    with track_cache(prefix, "get"):
+        cached = getter(key)
+    record_cache_result(prefix, cached is not None)
     if cached is not None:
         return cached
-    data = loader()
+    with track_cache(prefix, "load"):
+        data = loader()
     if should_cache is None or should_cache(data):
-        setter(key, data)
+        with track_cache(prefix, "set"):
+            setter(key, data)
     return data
 
 
@@ -54,7 +138,12 @@ def _get_redis_client() -> redis.Redis | None:
         return _redis_client
     redis_url = settings.redis_url
     try:
-        _redis_client = redis.Redis.from_url(redis_url, decode_responses=True)
+        _redis_client = redis.Redis.from_url(
+            redis_url,
+            decode_responses=True,
+            socket_timeout=settings.redis_socket_timeout_seconds,
+            socket_connect_timeout=settings.redis_socket_timeout_seconds,
+        )
     except RedisError as exc:
         _logger.warning("Redis 客户端初始化失败: %s", exc)
         _redis_client = None
@@ -73,15 +162,39 @@ def close_redis() -> None:
         _redis_client = None
 
 
-def _get_json_cache(key: str) -> Any | None:
+def _read_payload(key: str) -> str | None:
+    """读取缓存原文；Redis 不可用或熔断时改读进程内缓存。"""
     client = _get_redis_client()
-    if client is None:
-        return None
+    if client is None or not _redis_breaker.allow():
+        return _local_cache.get(key)
     try:
-        cached = client.get(key)
+        payload = client.get(key)
     except RedisError as exc:
+        _redis_breaker.record_failure()
         _logger.warning("读取 Redis 缓存失败: %s", exc)
-        return None
+        return _local_cache.get(key)
+    _redis_breaker.record_success()
+    return payload
+
+
+def _write_payload(key: str, payload: str, ttl: timedelta) -> None:
+    """写入缓存原文；Redis 不可用或熔断时改写进程内缓存。"""
+    client = _get_redis_client()
+    if client is None or not _redis_breaker.allow():
+        _local_cache.set(key, payload, ttl)
+        return
+    try:
+        client.set(key, payload, ex=int(ttl.total_seconds()))
+    except RedisError as exc:
+        _redis_breaker.record_failure()
+        _logger.warning("写入 Redis 缓存失败: %s", exc)
+        _local_cache.set(key, payload, ttl)
+        return
+    _redis_breaker.record_success()
+
+
+def _get_json_cache(key: str) -> Any | None:
+    cached = _read_payload(key)
     if not cached:
         return None
     try:
@@ -92,18 +205,12 @@ def _get_json_cache(key: str) -> Any | None:
 
 
 def _set_json_cache(key: str, data: Any, ttl: timedelta) -> None:
-    client = _get_redis_client()
-    if client is None:
-        return
     try:
         payload = json.dumps(data, ensure_ascii=True)
     except TypeError as exc:
         _logger.warning("Redis 缓存序列化失败: %s", exc)
         return
-    try:
-        client.set(key, payload, ex=int(ttl.total_seconds()))
-    except RedisError as exc:
-        _logger.warning("写入 Redis 缓存失败: %s", exc)
+    _write_payload(key, payload, ttl)
 
 
 def _get_or_set_json_cache(
@@ -128,9 +235,75 @@ def _get_or_set_json_cache(
     )
 
 
+def _get_or_set_text_cache(
+    key: str,
+    loader: Callable[[], str],
+    ttl: timedelta,
+) -> str:
+    """缓存已序列化的 JSON 文本，命中时原样返回，不再解析。"""
+
+    def _setter(cache_key: str, payload: str) -> None:
+        _write_payload(cache_key, payload, ttl)
+
+    return _get_or_set_cache(
+        key,
+        loader,
+        lambda cache_key: _read_payload(cache_key) or None,
+        _setter,
+        should_cache=lambda payload: bool(payload),
+    )
+
+
+class CachedResponse(NamedTuple):
+    """已序列化的响应体、强 ETag（内容哈希）与缓存时长（秒）。"""
+
+    body: bytes
+    etag: str
+    max_age: int
+
+
+def _get_or_set_response_cache(
+    key: str,
+    loader: Callable[[], str],
+    ttl: timedelta,
+    version: str = "",
+) -> CachedResponse:
+    """缓存序列化后的响应体并记录其 ETag；`version` 与缓存不一致时视为未命中。"""
+
+    def _getter(cache_key: str) -> tuple[str, str] | None:
+        payload = _read_payload(cache_key)
+        if not payload:
+            return None
+        parts = payload.split("\n", 2)
+        if len(parts) != 3 or parts[0] != version:
+            return None
+        return parts[1], parts[2]
+
+    def _setter(cache_key: str, entry: tuple[str, str]) -> None:
+        _write_payload(cache_key, "\n".join((version, *entry)), ttl)
+
+    def _load() -> tuple[str, str]:
+        body = loader()
+        digest = hashlib.blake2b(body.encode("utf-8"), digest_size=16).hexdigest()
+        return f'"{digest}"', body
+
+    etag, body = _get_or_set_cache(key, _load, _getter, _setter)
+    return CachedResponse(body.encode("utf-8"), etag, int(ttl.total_seconds()))
+
+
 def _load_fund_list_records() -> list[dict[str, Any]]:
-    fund_df = ak.fund_name_em()
-    return fund_df.to_dict("records")
+    try:
+        fund_df = akshare_adapter.fund_name_em()
+    except UpstreamError:
+        snapshot = load_snapshot(_FUND_LIST_SNAPSHOT)
+        if snapshot is None:
+            raise
+        _logger.warning("基金列表拉取失败，使用本地快照")
+        return snapshot.data
+    records = fund_df.to_dict("records")
+    if records:
+        save_snapshot(_FUND_LIST_SNAPSHOT, records)
+    return records
 
 
 def get_fund_list_cache() -> pd.DataFrame:
@@ -162,12 +335,45 @@ def get_fund_latest_holdings_cache(
     return _get_or_set_json_cache(key, loader, _FUND_HOLDINGS_TTL, list)
 
 
-def get_fund_realtime_estimate_cache(
+def get_fund_realtime_estimate_cache(code: str, loader: Callable[[], str]) -> str:
+    """实时估值缓存，保存最终响应 JSON 文本。"""
+    key = _build_cache_key(FUND_ESTIMATE_CACHE_PREFIX, code)
+    return _get_or_set_text_cache(key, loader, _FUND_ESTIMATE_TTL)
+
+
+def get_fund_snapshot_response_cache(
+    code: str,
+    loader: Callable[[], str],
+) -> CachedResponse:
+    key = _build_cache_key(FUND_SNAPSHOT_CACHE_PREFIX, code)
+    return _get_or_set_response_cache(key, loader, _FUND_SNAPSHOT_TTL)
+
+
+def get_fund_nav_history_response_cache(
+    code: str,
+    period: str,
+    loader: Callable[[], str],
+) -> CachedResponse:
+    key = _build_cache_key(FUND_NAV_HISTORY_CACHE_PREFIX, f"{code}:{period}")
+    return _get_or_set_response_cache(key, loader, _FUND_NAV_HISTORY_TTL)
+
+
+def get_fund_compare_response_cache(
+    codes: list[str],
+    variant: str,
+    loader: Callable[[], str],
+) -> CachedResponse:
+    key = _build_cache_key(FUND_COMPARE_CACHE_PREFIX, f"{','.join(codes)}:{variant}")
+    return _get_or_set_response_cache(key, loader, _FUND_NAV_HISTORY_TTL)
+
+
+def get_fund_nav_series_cache(
     code: str,
     loader: Callable[[], dict[str, Any]],
 ) -> dict[str, Any]:
-    key = _build_cache_key(FUND_ESTIMATE_CACHE_PREFIX, code)
-    return _get_or_set_json_cache(key, loader, _FUND_ESTIMATE_TTL, dict)
+    """完整历史净值序列（列式），供各类历史净值查询截取。"""
+    key = _build_cache_key(FUND_NAV_SERIES_CACHE_PREFIX, code)
+    return _get_or_set_json_cache(key, loader, _FUND_NAV_HISTORY_TTL, dict)
 
 
 def get_stock_quote_cache(
@@ -176,8 +382,11 @@ def get_stock_quote_cache(
 ) -> dict[str, Any] | None:
     key = _build_cache_key(STOCK_QUOTE_CACHE_PREFIX, code)
     if loader is None:
-        cached = _get_json_cache(key)
-        return cached if isinstance(cached, dict) else None
+        with track_cache(STOCK_QUOTE_CACHE_PREFIX, "get"):
+            cached = _get_json_cache(key)
+        cached = cached if isinstance(cached, dict) else None
+        record_cache_result(STOCK_QUOTE_CACHE_PREFIX, cached is not None)
+        return cached
     return _get_or_set_json_cache(key, loader, _STOCK_QUOTE_TTL, dict)
 
 
@@ -186,7 +395,48 @@ def set_stock_quote_cache(code: str, data: dict[str, Any]) -> None:
     _set_json_cache(key, data, _STOCK_QUOTE_TTL)
 
 
-def _safe_load(name: str, loader: Callable[[], pd.DataFrame]) -> None:
+def get_account_exposure_cache(
+    account_id: int,
+    fingerprint: str,
+    loader: Callable[[], dict[str, Any]],
+) -> dict[str, Any]:
+    """账户穿透权重矩阵缓存；基金组合或披露季度指纹变化时重新计算。"""
+    key = _build_cache_key(ACCOUNT_EXPOSURE_CACHE_PREFIX, str(account_id))
+
+    def _getter(cache_key: str) -> dict[str, Any] | None:
+        cached = _get_json_cache(cache_key)
+        if not isinstance(cached, dict) or cached.get("fingerprint") != fingerprint:
+            return None
+        data = cached.get("data")
+        return data if isinstance(data, dict) else None
+
+    def _setter(cache_key: str, data: dict[str, Any]) -> None:
+        _set_json_cache(
+            cache_key,
+            {"fingerprint": fingerprint, "data": data},
+            _ACCOUNT_EXPOSURE_TTL,
+        )
+
+    return _get_or_set_cache(
+        key,
+        loader,
+        _getter,
+        _setter,
+        should_cache=lambda data: isinstance(data, dict),
+    )
+
+
+def get_account_detail_response_cache(
+    account_id: int,
+    fingerprint: str,
+    loader: Callable[[], str],
+) -> CachedResponse:
+    """账户详情响应缓存；账户或持仓指纹变化时重新计算。"""
+    key = _build_cache_key(ACCOUNT_DETAIL_CACHE_PREFIX, str(account_id))
+    return _get_or_set_response_cache(key, loader, _ACCOUNT_DETAIL_TTL, fingerprint)
+
+
+def _safe_load(name: str, loader: Callable[[], Any]) -> None:
     try:
         loader()
         _logger.info("缓存加载完成: %s", name)
@@ -194,10 +444,25 @@ def _safe_load(name: str, loader: Callable[[], pd.DataFrame]) -> None:
         _logger.warning("缓存加载失败: %s, 错误: %s", name, exc)
 
 
+def _warm_up_fund_list() -> None:
+    """优先用本地快照填充基金列表缓存，快照过旧时再从上游刷新。"""
+    if _get_json_cache(FUND_LIST_CACHE_KEY) is not None:
+        return
+    snapshot = load_snapshot(_FUND_LIST_SNAPSHOT)
+    if snapshot is None or not isinstance(snapshot.data, list):
+        get_fund_list_cache()
+        return
+    _set_json_cache(FUND_LIST_CACHE_KEY, snapshot.data, _CACHE_TTL)
+    if snapshot.age_seconds < _FUND_LIST_SNAPSHOT_MAX_AGE.total_seconds():
+        return
+    _set_json_cache(FUND_LIST_CACHE_KEY, _load_fund_list_records(), _CACHE_TTL)
+
+
 def warm_up_cache(timeout: float | None = None) -> None:
     """应用启动时预加载全量数据"""
     tasks = [
-        ("fund_list", get_fund_list_cache),
+        ("fund_list", _warm_up_fund_list),
+        ("trade_calendar", trading_calendar.load_trade_calendar),
     ]
     if timeout is None:
         for name, loader in tasks:
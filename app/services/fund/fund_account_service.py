@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import hashlib
+
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
@@ -13,6 +15,7 @@ from app.models.schemas import (
     FundAccountUpdateRequest,
     FundHoldingPositionResponse,
 )
+from app.services.cache import CachedResponse, get_account_detail_response_cache
 from app.services.fund import fund_service
 from app.utils.parsing import parse_float
 
@@ -81,14 +84,54 @@ def update_account(
 
 def get_account_detail(db: Session, account_id: int) -> FundAccountDetailResponse:
     """获取账户详情与持仓。"""
+    account, holdings = _load_account_with_holdings(db, account_id)
+    return _build_account_detail(account, holdings)
+
+
+def get_account_detail_json(db: Session, account_id: int) -> CachedResponse:
+    """返回账户详情响应的 JSON 字节及 ETag；账户与持仓未变化时复用缓存。"""
+    account, holdings = _load_account_with_holdings(db, account_id)
+    return get_account_detail_response_cache(
+        account_id,
+        _account_fingerprint(account, holdings),
+        lambda: _build_account_detail(account, holdings).model_dump_json(),
+    )
+
+
+def _load_account_with_holdings(
+    db: Session, account_id: int
+) -> tuple[FundAccount, list[FundHolding]]:
     account = db.get(FundAccount, account_id)
     if account is None:
         raise FundAccountNotFoundError(f"未找到基金账户: {account_id}")
     holdings = (
-        db.execute(select(FundHolding).where(FundHolding.account_id == account_id))
+        db.execute(
+            select(FundHolding)
+            .where(FundHolding.account_id == account_id)
+            .order_by(FundHolding.id)
+        )
         .scalars()
         .all()
     )
+    return account, list(holdings)
+
+
+def _account_fingerprint(account: FundAccount, holdings: list[FundHolding]) -> str:
+    """账户指纹：账户信息或任一持仓的金额、份额变化时缓存失效。"""
+    digest = hashlib.sha1(
+        f"{account.name}|{account.remark}|{account.default_buy_fee_percent};".encode()
+    )
+    for holding in holdings:
+        digest.update(
+            f"{holding.id}:{holding.fund_code}:{holding.total_amount:.6f}:"
+            f"{holding.total_shares:.6f};".encode()
+        )
+    return digest.hexdigest()
+
+
+def _build_account_detail(
+    account: FundAccount, holdings: list[FundHolding]
+) -> FundAccountDetailResponse:
     holding_responses = [_build_holding_position(holding) for holding in holdings]
     summary = _build_account_summary(holding_responses)
     return FundAccountDetailResponse(
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from app.exceptions import FundAccountNotFoundError, FundHoldingNotFoundError
+from app.models.db.models import (
+    FundAccount,
+    FundHolding,
+    FundHoldingDailyValue,
+    FundTransaction,
+)
+from app.models.enums import FundTradeStatus, FundTradeType
+from app.models.schemas import FundReturnAnalyticsResponse
+from app.utils.lazy_import import lazy_import
+from app.utils.returns import (
+    annualize_return,
+    annualized_volatility,
+    max_drawdown,
+    period_returns,
+    time_weighted_return,
+    xirr,
+)
+
+if TYPE_CHECKING:
+    import numpy as np
+else:
+    np = lazy_import("numpy")
+
+
+def get_account_analytics(db: Session, account_id: int) -> FundReturnAnalyticsResponse:
+    """获取账户收益分析（XIRR/TWR/最大回撤/波动率）。"""
+    if db.get(FundAccount, account_id) is None:
+        raise FundAccountNotFoundError(f"未找到基金账户: {account_id}")
+    return _build_analytics(db, account_id)
+
+
+def get_holding_analytics(db: Session, holding_id: int) -> FundReturnAnalyticsResponse:
+    """获取单个持仓收益分析。"""
+    holding = db.get(FundHolding, holding_id)
+    if holding is None:
+        raise FundHoldingNotFoundError(f"未找到基金持仓: {holding_id}")
+    return _build_analytics(db, holding.account_id, holding.fund_code, holding.id)
+
+
+def _build_analytics(
+    db: Session,
+    account_id: int,
+    fund_code: str | None = None,
+    holding_id: int | None = None,
+) -> FundReturnAnalyticsResponse:
+    value_dates, values = _load_value_series(db, account_id, fund_code)
+    flow_dates, flows = _load_cash_flows(db, account_id, fund_code)
+    response = FundReturnAnalyticsResponse(
+        account_id=account_id,
+        holding_id=holding_id,
+        fund_code=fund_code,
+        total_invested=float(flows[flows > 0].sum()),
+        total_redeemed=float(-flows[flows < 0].sum()),
+    )
+    if values.size == 0:
+        return response
+
+    end_date = value_dates[-1]
+    in_window = flow_dates <= end_date
+    flow_dates, flows = flow_dates[in_window], flows[in_window]
+
+    positions = np.searchsorted(value_dates, flow_dates, side="left")
+    aligned_flows = np.bincount(positions, weights=flows, minlength=values.size)
+    returns = period_returns(values, aligned_flows)
+    twr = time_weighted_return(returns)
+
+    money_weighted = xirr(
+        np.append(-flows, values[-1]),
+        np.append(flow_dates, end_date),
+    )
+
+    response.start_date = value_dates[0].astype(object)
+    response.end_date = end_date.astype(object)
+    response.ending_value = float(values[-1])
+    response.money_weighted_return_percent = _to_percent(money_weighted)
+    response.time_weighted_return_percent = _to_percent(twr)
+    response.annualized_time_weighted_return_percent = _to_percent(
+        annualize_return(twr, int(np.count_nonzero(~np.isnan(returns))))
+    )
+    response.max_drawdown_percent = _to_percent(max_drawdown(returns))
+    response.annualized_volatility_percent = _to_percent(annualized_volatility(returns))
+    return response
+
+
+def _load_value_series(
+    db: Session,
+    account_id: int,
+    fund_code: str | None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """读取每日估值快照，按日期汇总为市值序列。"""
+    stmt = select(
+        FundHoldingDailyValue.value_date,
+        func.sum(FundHoldingDailyValue.market_value),
+    ).where(FundHoldingDailyValue.account_id == account_id)
+    if fund_code:
+        stmt = stmt.where(FundHoldingDailyValue.fund_code == fund_code)
+    stmt = stmt.group_by(FundHoldingDailyValue.value_date).order_by(
+        FundHoldingDailyValue.value_date
+    )
+    return _to_arrays(db.execute(stmt).all())
+
+
+def _load_cash_flows(
+    db: Session,
+    account_id: int,
+    fund_code: str | None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """读取确认交易，按确认日期汇总净流入（买入为正、卖出为负）。"""
+    signed_amount = case(
+        (FundTransaction.trade_type == FundTradeType.sell, -FundTransaction.amount),
+        else_=FundTransaction.amount,
+    )
+    stmt = select(
+        FundTransaction.confirmed_nav_date,
+        func.sum(signed_amount),
+    ).where(
+        FundTransaction.account_id == account_id,
+        FundTransaction.status == FundTradeStatus.confirmed,
+    )
+    if fund_code:
+        stmt = stmt.where(FundTransaction.fund_code == fund_code)
+    stmt = stmt.group_by(FundTransaction.confirmed_nav_date).order_by(
+        FundTransaction.confirmed_nav_date
+    )
+    return _to_arrays(db.execute(stmt).all())
+
+
+def _to_arrays(rows: list) -> tuple[np.ndarray, np.ndarray]:
+    if not rows:
+        return np.empty(0, dtype="datetime64[D]"), np.empty(0)
+    dates, amounts = zip(*rows)
+    return (
+        np.array(dates, dtype="datetime64[D]"),
+        np.array(amounts, dtype=float),
+    )
+
+
+def _to_percent(value: float | None) -> float | None:
+    return value * 100 if value is not None else None
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+from typing import TYPE_CHECKING
+
+from app.config import settings
+from app.models.schemas import (
+    FundCompareResponse,
+    FundCompareSeries,
+    FundNavHistoryPeriod,
+)
+from app.services import trading_calendar
+from app.services.cache import CachedResponse, get_fund_compare_response_cache
+from app.services.fund import fund_service
+from app.utils.lazy_import import lazy_import
+
+if TYPE_CHECKING:
+    import pandas as pd
+else:
+    pd = lazy_import("pandas")
+
+MAX_COMPARE_FUNDS = 10
+
+
+def parse_fund_codes(value: str) -> list[str]:
+    """解析逗号分隔的基金代码，去重并保持顺序。"""
+    codes = list(
+        dict.fromkeys(code.strip() for code in value.split(",") if code.strip())
+    )
+    if len(codes) < 2:
+        raise ValueError("至少需要两只基金进行对比")
+    if len(codes) > MAX_COMPARE_FUNDS:
+        raise ValueError(f"最多支持 {MAX_COMPARE_FUNDS} 只基金对比")
+    return codes
+
+
+def compare_funds_json(
+    codes: list[str],
+    period: FundNavHistoryPeriod,
+    base: float = 1.0,
+    correlation: bool = False,
+) -> CachedResponse:
+    """返回基金对比响应的 JSON 字节及 ETag，按参数组合缓存。"""
+    return get_fund_compare_response_cache(
+        codes,
+        f"{period.value}:{base:g}:{int(correlation)}",
+        lambda: compare_funds(codes, period, base, correlation).model_dump_json(),
+    )
+
+
+def compare_funds(
+    codes: list[str],
+    period: FundNavHistoryPeriod,
+    base: float = 1.0,
+    correlation: bool = False,
+) -> FundCompareResponse:
+    """多基金净值对比：按交易日外连接对齐、前向填充，并以共同起始日归一化。"""
+    # 先用基金列表校验类型，避免货币基金请求在拉取全部净值后才失败
+    for code in codes:
+        meta = fund_service._resolve_fund_by_code(code)
+        if "货币型" in meta["type"]:
+            raise ValueError(f"货币型基金不支持净值对比: {meta['code']}")
+
+    workers = max(min(len(codes), settings.akshare_max_concurrency), 1)
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="fund-compare"
+    ) as executor:
+        loaded = list(
+            executor.map(fund_service.get_fund_nav_series, codes, repeat(period))
+        )
+    metas = [meta for meta, _ in loaded]
+
+    frame = _align_nav_frame(codes, [columns for _, columns in loaded])
+    complete = frame.notna().all(axis=1)
+    if not complete.any():
+        return FundCompareResponse(
+            period=period.value,
+            base=base,
+            dates=[],
+            series=[_build_series(meta, [], None) for meta in metas],
+        )
+
+    frame = frame.loc[complete.idxmax() :]
+    normalized = frame / frame.iloc[0] * base
+    total_returns = (frame.iloc[-1] / frame.iloc[0] - 1) * 100
+    matrix = None
+    if correlation:
+        corr = frame.pct_change(fill_method=None).corr()
+        matrix = corr.astype(object).where(corr.notna(), None).values.tolist()
+    return FundCompareResponse(
+        period=period.value,
+        base=base,
+        base_date=frame.index[0].date(),
+        dates=frame.index.strftime("%Y-%m-%d").tolist(),
+        series=[
+            _build_series(meta, normalized[code].tolist(), float(total_returns[code]))
+            for meta, code in zip(metas, codes)
+        ],
+        correlation=matrix,
+    )
+
+
+def _align_nav_frame(
+    codes: list[str], columns_list: list[fund_service.NavHistoryColumns]
+) -> pd.DataFrame:
+    """外连接各基金净值，补齐区间内全部交易日后前向填充。"""
+    series = []
+    for columns in columns_list:
+        values = pd.Series(
+            columns.nav, index=pd.to_datetime(columns.dates), dtype=float
+        )
+        series.append(values[~values.index.duplicated(keep="last")])
+    frame = pd.concat(series, axis=1, keys=codes).sort_index()
+    if frame.empty:
+        return frame
+    trading_days = pd.DatetimeIndex(
+        trading_calendar.trading_days_between(
+            frame.index[0].date(), frame.index[-1].date()
+        )
+    )
+    return frame.reindex(frame.index.union(trading_days)).ffill()
+
+
+def _build_series(
+    meta: dict, values: list[float], total_return: float | None
+) -> FundCompareSeries:
+    return FundCompareSeries(
+        code=meta["code"],
+        name=meta["name"],
+        type=meta["type"],
+        values=values,
+        total_return_percent=total_return,
+    )
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+from collections.abc import Iterator, Sequence
+from datetime import date, datetime
+from enum import Enum
+from typing import Any
+
+from sqlalchemy import Select, select
+from sqlalchemy.orm import InstrumentedAttribute, Session
+
+from app.db import SessionLocal
+from app.exceptions import FundAccountNotFoundError
+from app.models.db.models import FundAccount, FundHolding, FundTransaction
+from app.models.schemas import FundExportFormat
+
+_EXPORT_BATCH_SIZE = 500
+
+_TRANSACTION_EXPORT_COLUMNS: tuple[InstrumentedAttribute, ...] = (
+    FundTransaction.id,
+    FundTransaction.account_id,
+    FundTransaction.holding_id,
+    FundTransaction.conversion_id,
+    FundTransaction.fund_code,
+    FundTransaction.trade_type,
+    FundTransaction.status,
+    FundTransaction.amount,
+    FundTransaction.fee_percent,
+    FundTransaction.fee_amount,
+    FundTransaction.confirmed_nav,
+    FundTransaction.confirmed_nav_date,
+    FundTransaction.shares,
+    FundTransaction.holding_amount,
+    FundTransaction.profit_amount,
+    FundTransaction.trade_time,
+    FundTransaction.remark,
+)
+
+_HOLDING_EXPORT_COLUMNS: tuple[InstrumentedAttribute, ...] = (
+    FundHolding.id,
+    FundHolding.account_id,
+    FundHolding.fund_code,
+    FundHolding.total_amount,
+    FundHolding.total_shares,
+    FundHolding.updated_at,
+)
+
+EXPORT_MEDIA_TYPES = {
+    FundExportFormat.csv: "text/csv; charset=utf-8",
+    FundExportFormat.ndjson: "application/x-ndjson",
+}
+
+
+def export_transactions(
+    db: Session,
+    account_id: int,
+    fund_code: str | None,
+    export_format: FundExportFormat,
+) -> Iterator[str]:
+    """按账户流式导出交易记录。"""
+    _ensure_account(db, account_id)
+    stmt = select(*_TRANSACTION_EXPORT_COLUMNS).where(
+        FundTransaction.account_id == account_id
+    )
+    if fund_code:
+        stmt = stmt.where(FundTransaction.fund_code == str(fund_code).strip())
+    return _iter_export(
+        stmt.order_by(FundTransaction.id),
+        _TRANSACTION_EXPORT_COLUMNS,
+        export_format,
+    )
+
+
+def export_holdings(
+    db: Session,
+    account_id: int,
+    export_format: FundExportFormat,
+) -> Iterator[str]:
+    """按账户流式导出持仓记录。"""
+    _ensure_account(db, account_id)
+    stmt = select(*_HOLDING_EXPORT_COLUMNS).where(FundHolding.account_id == account_id)
+    return _iter_export(
+        stmt.order_by(FundHolding.id),
+        _HOLDING_EXPORT_COLUMNS,
+        export_format,
+    )
+
+
+def _ensure_account(db: Session, account_id: int) -> None:
+    if db.get(FundAccount, account_id) is None:
+        raise FundAccountNotFoundError(f"未找到基金账户: {account_id}")
+
+
+def _iter_export(
+    stmt: Select,
+    columns: Sequence[InstrumentedAttribute],
+    export_format: FundExportFormat,
+) -> Iterator[str]:
+    """使用服务端游标分批读取并逐批输出，内存占用与数据量无关。"""
+    fields = [column.key for column in columns]
+    db = SessionLocal()
+    try:
+        result = db.execute(stmt.execution_options(yield_per=_EXPORT_BATCH_SIZE))
+        if export_format == FundExportFormat.csv:
+            yield from _iter_csv(fields, result.partitions())
+        else:
+            yield from _iter_ndjson(fields, result.partitions())
+    finally:
+        db.close()
+
+
+def _iter_csv(
+    fields: list[str],
+    partitions: Iterator[Sequence[Sequence[Any]]],
+) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    for rows in partitions:
+        writer.writerows(
+            ["" if value is None else _to_plain(value) for value in row] for row in rows
+        )
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def _iter_ndjson(
+    fields: list[str],
+    partitions: Iterator[Sequence[Sequence[Any]]],
+) -> Iterator[str]:
+    for rows in partitions:
+        yield "".join(
+            json.dumps(
+                {field: _to_plain(value) for field, value in zip(fields, row)},
+                ensure_ascii=False,
+            )
+            + "\n"
+            for row in rows
+        )
+
+
+def _to_plain(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import hashlib
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.exceptions import FundAccountNotFoundError
+from app.models.db.models import FundAccount, FundHolding
+from app.models.schemas import FundAccountStockExposureResponse
+from app.services.cache import get_account_exposure_cache
+from app.services.fund import fund_account_service, fund_portfolio_service
+from app.utils.lazy_import import lazy_import
+
+if TYPE_CHECKING:
+    import numpy as np
+else:
+    np = lazy_import("numpy")
+
+
+def get_account_stock_exposure(
+    db: Session,
+    account_id: int,
+) -> FundAccountStockExposureResponse:
+    """账户级股票穿透持仓：基金持仓权重矩阵 × 持仓预估市值向量。
+
+    权重矩阵只随持有的基金及其已入库的披露季度变化，按账户长期缓存；
+    预估市值每次请求按最新估值相乘，不重建矩阵。
+    """
+    if db.get(FundAccount, account_id) is None:
+        raise FundAccountNotFoundError(f"未找到基金账户: {account_id}")
+    holdings = (
+        db.execute(
+            select(FundHolding)
+            .where(FundHolding.account_id == account_id, FundHolding.total_shares > 0)
+            .order_by(FundHolding.fund_code)
+        )
+        .scalars()
+        .all()
+    )
+    fund_codes = [holding.fund_code for holding in holdings]
+    quarters = fund_portfolio_service.latest_stored_quarters(db, fund_codes)
+
+    matrix = get_account_exposure_cache(
+        account_id,
+        _portfolio_fingerprint(fund_codes, quarters),
+        lambda: _build_weight_matrix(fund_codes),
+    )
+    return _compute_exposure(account_id, holdings, matrix)
+
+
+def _portfolio_fingerprint(
+    fund_codes: list[str], quarters: dict[str, tuple[int, int]]
+) -> str:
+    """权重矩阵指纹：持有的基金或其最新入库季度变化时缓存失效。"""
+    digest = hashlib.sha1()
+    for fund_code in fund_codes:
+        year, quarter = quarters.get(fund_code, (0, 0))
+        digest.update(f"{fund_code}:{year}Q{quarter};".encode())
+    return digest.hexdigest()
+
+
+def _build_weight_matrix(fund_codes: list[str]) -> dict[str, Any]:
+    """以 COO 形式构造 (基金 × 股票) 稀疏权重矩阵，行号对应 `fund_codes` 的下标。"""
+    stock_index: dict[str, int] = {}
+    stock_names: list[str] = []
+    rows: list[int] = []
+    cols: list[int] = []
+    weights: list[float] = []
+    for row, fund_code in enumerate(fund_codes):
+        quarters = fund_portfolio_service.get_recent_quarter_holdings(
+            fund_code, limit=1
+        )
+        if not quarters:
+            continue
+        _, items = quarters[0]
+        for item in items:
+            if item.weight_percent is None:
+                continue
+            col = stock_index.setdefault(item.stock_code, len(stock_index))
+            if col == len(stock_names):
+                stock_names.append(item.stock_name)
+            rows.append(row)
+            cols.append(col)
+            weights.append(item.weight_percent / 100)
+    return {
+        "fund_codes": fund_codes,
+        "stock_codes": list(stock_index),
+        "stock_names": stock_names,
+        "rows": rows,
+        "cols": cols,
+        "weights": weights,
+    }
+
+
+def _compute_exposure(
+    account_id: int,
+    holdings: list[FundHolding],
+    matrix: dict[str, Any],
+) -> FundAccountStockExposureResponse:
+    positions = [
+        fund_account_service._build_holding_position(holding) for holding in holdings
+    ]
+    fund_codes = matrix["fund_codes"]
+    values = np.array(
+        [position.estimated_value or 0.0 for position in positions], dtype=float
+    )
+
+    total_value = float(values.sum())
+    stock_codes = matrix["stock_codes"]
+    if not stock_codes:
+        return FundAccountStockExposureResponse(
+            account_id=account_id,
+            total_value=total_value,
+            covered_value=0.0,
+            data=[],
+        )
+
+    row_idx = np.array(matrix["rows"], dtype=np.intp)
+    col_idx = np.array(matrix["cols"], dtype=np.intp)
+    entries = np.array(matrix["weights"], dtype=float) * values[row_idx]
+    exposure = np.bincount(col_idx, weights=entries, minlength=len(stock_codes))
+
+    # 单次遍历收集各股票的贡献基金（按基金顺序）
+    contributors: dict[int, list[str]] = {}
+    for row, col, entry in zip(matrix["rows"], matrix["cols"], entries.tolist()):
+        if entry != 0:
+            contributors.setdefault(col, []).append(fund_codes[row])
+
+    stock_names = matrix["stock_names"]
+    data = []
+    for col in np.argsort(-exposure, kind="stable").tolist():
+        data.append(
+            {
+                "stock_code": stock_codes[col],
+                "stock_name": stock_names[col],
+                "exposure_value": float(exposure[col]),
+                "exposure_percent": (
+                    float(exposure[col] / total_value * 100)
+                    if total_value > 0
+                    else None
+                ),
+                "fund_codes": contributors.get(col, []),
+            }
+        )
+    return FundAccountStockExposureResponse(
+        account_id=account_id,
+        total_value=total_value,
+        covered_value=float(exposure.sum()),
+        data=data,
+    )
@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import csv
+import io
+from typing import Any
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.exceptions import FundAccountNotFoundError, FundNotFoundError, UpstreamError
+from app.models.db.models import FundAccount, FundHolding, FundTransaction
+from app.models.enums import FundTradeStatus, FundTradeType
+from app.models.schemas import (
+    FundTransactionImportError,
+    FundTransactionImportItem,
+    FundTransactionImportRequest,
+    FundTransactionImportResponse,
+)
+from app.services.fund import fund_holding_service, fund_service
+
+ImportRow = tuple[int, FundTransactionImportItem]
+
+_CSV_OPTIONAL_FIELDS = ("fee_percent", "is_after_cutoff", "remark")
+
+
+def import_transactions(
+    db: Session,
+    payload: FundTransactionImportRequest,
+) -> FundTransactionImportResponse:
+    """批量导入交易（JSON）。"""
+    rows = list(enumerate(payload.items, start=1))
+    return _import_rows(db, payload.account_id, rows, [])
+
+
+def import_transactions_csv(
+    db: Session,
+    account_id: int,
+    content: str,
+) -> FundTransactionImportResponse:
+    """批量导入交易（CSV）。"""
+    rows, errors = parse_import_csv(content)
+    return _import_rows(db, account_id, rows, errors)
+
+
+def parse_import_csv(
+    content: str,
+) -> tuple[list[ImportRow], list[FundTransactionImportError]]:
+    """解析 CSV 交易文件，表头字段与 JSON 导入字段一致。"""
+    reader = csv.DictReader(io.StringIO(content.lstrip("\ufeff")))
+    rows: list[ImportRow] = []
+    errors: list[FundTransactionImportError] = []
+    for row_no, raw in enumerate(reader, start=1):
+        data: dict[str, Any] = {
+            key.strip(): value.strip() if isinstance(value, str) else value
+            for key, value in raw.items()
+            if key
+        }
+        for field in _CSV_OPTIONAL_FIELDS:
+            if data.get(field) == "":
+                data.pop(field)
+        try:
+            rows.append((row_no, FundTransactionImportItem.model_validate(data)))
+        except ValidationError as exc:
+            errors.append(
+                FundTransactionImportError(
+                    row=row_no,
+                    fund_code=data.get("fund_code") or None,
+                    message=_format_validation_error(exc),
+                )
+            )
+    return rows, errors
+
+
+def _import_rows(
+    db: Session,
+    account_id: int,
+    rows: list[ImportRow],
+    errors: list[FundTransactionImportError],
+) -> FundTransactionImportResponse:
+    account = db.get(FundAccount, account_id)
+    if account is None:
+        raise FundAccountNotFoundError(f"未找到基金账户: {account_id}")
+
+    errors = list(errors)
+    total = len(rows) + len(errors)
+    prepared: list[dict[str, Any]] = []
+    for row_no, item in rows:
+        record, message = _prepare_record(account, row_no, item)
+        if message is not None:
+            errors.append(
+                FundTransactionImportError(
+                    row=row_no, fund_code=item.fund_code, message=message
+                )
+            )
+            continue
+        prepared.append(record)
+
+    nav_maps = _load_nav_maps(
+        {
+            record["fund_code"]
+            for record in prepared
+            if record["status"] == FundTradeStatus.confirmed
+        }
+    )
+    holdings = {
+        holding.fund_code: holding
+        for holding in db.execute(
+            select(FundHolding).where(FundHolding.account_id == account_id)
+        ).scalars()
+    }
+
+    accepted: list[dict[str, Any]] = []
+    for record in sorted(prepared, key=lambda r: (r["trade_time"], r["row"])):
+        message = _apply_record(db, account_id, record, holdings, nav_maps)
+        if message is not None:
+            errors.append(
+                FundTransactionImportError(
+                    row=record["row"], fund_code=record["fund_code"], message=message
+                )
+            )
+            continue
+        accepted.append(record)
+
+    db.flush()
+    if accepted:
+        db.execute(
+            insert(FundTransaction),
+            [
+                {
+                    "account_id": account_id,
+                    "holding_id": record["holding"].id,
+                    "conversion_id": None,
+                    "fund_code": record["fund_code"],
+                    "trade_type": record["trade_type"],
+                    "status": record["status"],
+                    "amount": record["amount"],
+                    "fee_percent": record["fee_percent"],
+                    "fee_amount": record["fee_amount"],
+                    "confirmed_nav": record["confirmed_nav"],
+                    "confirmed_nav_date": record["confirmed_nav_date"],
+                    "shares": record["shares"],
+                    "trade_time": record["trade_time"],
+                    "remark": record["remark"],
+                }
+                for record in accepted
+            ],
+        )
+    db.commit()
+
+    pending = sum(
+        1 for record in accepted if record["status"] == FundTradeStatus.pending
+    )
+    return FundTransactionImportResponse(
+        account_id=account_id,
+        total=total,
+        imported=len(accepted),
+        confirmed=len(accepted) - pending,
+        pending=pending,
+        errors=sorted(errors, key=lambda error: error.row),
+    )
+
+
+def _prepare_record(
+    account: FundAccount,
+    row_no: int,
+    item: FundTransactionImportItem,
+) -> tuple[dict[str, Any], str | None]:
+    """校验单行交易并计算确认日期、手续费等与净值无关的字段。"""
+    fund_code = str(item.fund_code).strip()
+    if not fund_code:
+        return {}, "基金代码不能为空"
+    if item.amount <= 0:
+        return {}, "交易金额必须大于 0"
+
+    fee_percent = item.fee_percent
+    if fee_percent is None and item.trade_type == FundTradeType.buy:
+        fee_percent = account.default_buy_fee_percent
+    fee_percent = fee_percent or 0.0
+    fee_amount = item.amount * fee_percent / 100
+    share_base_amount = item.amount - fee_amount
+    if share_base_amount <= 0:
+        return {}, "份额计算基础金额必须大于 0"
+
+    confirmed_nav_date = fund_holding_service._resolve_confirmed_nav_date(
+        item.trade_date, item.is_after_cutoff
+    )
+    return {
+        "row": row_no,
+        "fund_code": fund_code,
+        "trade_type": item.trade_type,
+        "status": fund_holding_service._resolve_trade_status(confirmed_nav_date),
+        "amount": item.amount,
+        "fee_percent": fee_percent,
+        "fee_amount": fee_amount,
+        "share_base_amount": share_base_amount,
+        "confirmed_nav": 0.0,
+        "confirmed_nav_date": confirmed_nav_date,
+        "shares": 0.0,
+        "trade_time": fund_holding_service._resolve_trade_time(
+            item.trade_date, item.is_after_cutoff
+        ),
+        "remark": item.remark,
+    }, None
+
+
+def _load_nav_maps(fund_codes: set[str]) -> dict[str, dict | str]:
+    """每只基金仅拉取一次历史净值；失败（含上游异常、熔断）时记录错误信息。"""
+    nav_maps: dict[str, dict | str] = {}
+    for fund_code in sorted(fund_codes):
+        try:
+            nav_maps[fund_code] = fund_service.get_fund_nav_map(fund_code)
+        except (FundNotFoundError, ValueError, UpstreamError) as exc:
+            nav_maps[fund_code] = str(exc)
+    return nav_maps
+
+
+def _apply_record(
+    db: Session,
+    account_id: int,
+    record: dict[str, Any],
+    holdings: dict[str, FundHolding],
+    nav_maps: dict[str, dict | str],
+) -> str | None:
+    """按时间顺序在内存中应用持仓变化，返回错误信息或 None。"""
+    fund_code = record["fund_code"]
+    trade_type = record["trade_type"]
+    holding = holdings.get(fund_code)
+    if holding is None and trade_type == FundTradeType.sell:
+        return f"未找到基金持仓: {fund_code}"
+
+    if record["status"] == FundTradeStatus.confirmed:
+        nav_map = nav_maps.get(fund_code)
+        if isinstance(nav_map, str):
+            return nav_map
+        confirmed_nav = (nav_map or {}).get(record["confirmed_nav_date"])
+        if confirmed_nav is None:
+            return (
+                "未找到基金净值数据: "
+                f"{fund_code} {record['confirmed_nav_date'].isoformat()}"
+            )
+        if confirmed_nav <= 0:
+            return "确认净值必须大于 0"
+        shares = record["share_base_amount"] / confirmed_nav
+        if trade_type == FundTradeType.sell:
+            if holding.total_amount < record["amount"]:
+                return "减仓金额不能超过当前持仓金额"
+            if holding.total_shares < shares:
+                return "减仓份额不能超过当前持仓份额"
+        record["confirmed_nav"] = confirmed_nav
+        record["shares"] = shares
+
+    if holding is None:
+        holding = FundHolding(
+            account_id=account_id,
+            fund_code=fund_code,
+            total_amount=0.0,
+            total_shares=0.0,
+        )
+        db.add(holding)
+        holdings[fund_code] = holding
+
+    if record["status"] == FundTradeStatus.confirmed:
+        fund_holding_service._apply_holding_change(
+            holding, trade_type, record["amount"], record["shares"]
+        )
+    record["holding"] = holding
+    return None
+
+
+def _format_validation_error(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+        for error in exc.errors()
+    )
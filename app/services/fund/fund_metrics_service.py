@@ -0,0 +1,191 @@
+"""基金业绩指标：基于本地缓存的净值序列向量化计算，按最新净值日落库。
+
+定时任务在净值发布时段内每次轮询都检查尚未到最近交易日的基金，仅当净值
+序列出现新的净值日时重算，因此每只基金每个交易日只计算一次；接口直接读取
+预计算结果，落后时同样即时检查。已错过上一晚发布的滞后基金（如 QDII）
+在定时任务中按 `checked_at` 退避，避免每轮都下载净值序列。
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import select, union
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.db.models import FundHolding, FundMetric
+from app.models.schemas import FundMetricsResponse
+from app.services import trading_calendar
+from app.services.fund import fund_service
+from app.time_utils import cst_now
+from app.utils.lazy_import import lazy_import
+from app.utils.returns import annualize_return, annualized_volatility, max_drawdown
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+else:
+    np = lazy_import("numpy")
+    pd = lazy_import("pandas")
+
+_logger = logging.getLogger(__name__)
+_RETURN_WINDOW_MONTHS = (1, 3, 12)
+# 滞后基金在定时任务中的检查间隔，略短于三个轮询周期以容忍调度抖动
+_LAGGING_RECHECK_INTERVAL = timedelta(hours=2, minutes=30)
+
+
+def compute_fund_metrics(
+    dates: list[str],
+    nav: list[float | None],
+    daily_growth: list[float | None] | None,
+) -> dict[str, Any]:
+    """由按日期升序的净值序列计算区间收益、年化波动率、最大回撤与夏普比率。
+
+    日收益率优先取日增长率（已含分红），缺失时按单位净值计算；
+    各区间收益率由同一累计净值指数相除得到，区间起点以二分查找定位。
+    """
+    nav_values = np.array(nav, dtype=float)
+    growth = (
+        np.array(daily_growth, dtype=float) / 100
+        if daily_growth is not None
+        else np.full(nav_values.size, np.nan)
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        nav_returns = np.concatenate(([np.nan], nav_values[1:] / nav_values[:-1] - 1))
+    returns = np.where(np.isnan(growth), nav_returns, growth)
+    returns[0] = np.nan
+    index = np.cumprod(1.0 + np.nan_to_num(returns))
+
+    date_values = np.array(dates, dtype="datetime64[D]")
+    latest = pd.Timestamp(date_values[-1])
+    window_starts = np.array(
+        [latest - pd.DateOffset(months=months) for months in _RETURN_WINDOW_MONTHS],
+        dtype="datetime64[D]",
+    )
+    # 区间基准为不晚于起点的最后一个净值日，历史不足时为 -1
+    base_positions = np.searchsorted(date_values, window_starts, side="right") - 1
+    window_returns = [
+        float(index[-1] / index[position] - 1) if position >= 0 else None
+        for position in base_positions
+    ]
+
+    # 成立不足一年时波动率与回撤按成立以来计算，夏普比率不计算
+    one_year_base = int(base_positions[-1])
+    one_year_returns = returns[max(one_year_base, 0) + 1 :]
+    volatility = annualized_volatility(one_year_returns)
+    sharpe = None
+    if volatility and window_returns[-1] is not None:
+        annualized = annualize_return(
+            window_returns[-1], int(np.count_nonzero(~np.isnan(one_year_returns)))
+        )
+        if annualized is not None:
+            sharpe = (annualized - settings.risk_free_rate_percent / 100) / volatility
+
+    return {
+        "nav_date": latest.date(),
+        "return_1m_percent": _to_percent(window_returns[0]),
+        "return_3m_percent": _to_percent(window_returns[1]),
+        "return_1y_percent": _to_percent(window_returns[2]),
+        "annualized_volatility_percent": _to_percent(volatility),
+        "max_drawdown_percent": _to_percent(max_drawdown(one_year_returns)),
+        "sharpe_ratio": sharpe,
+    }
+
+
+def get_fund_metrics(db: Session, code: str) -> FundMetricsResponse:
+    """获取基金业绩指标，优先返回预计算结果；缺失或已过期时即时计算并落库。"""
+    code = str(code).strip()
+    meta = fund_service._resolve_fund_by_code(code)
+    if "货币型" in meta["type"]:
+        raise ValueError(f"货币型基金不支持业绩指标: {meta['code']}")
+    metric = db.get(FundMetric, meta["code"])
+    if metric is None or _needs_check(metric, cst_now()):
+        metric, _ = _refresh_one(db, meta["code"], metric)
+        db.commit()
+    return FundMetricsResponse(
+        code=meta["code"],
+        name=meta["name"],
+        type=meta["type"],
+        nav_date=metric.nav_date,
+        return_1m_percent=metric.return_1m_percent,
+        return_3m_percent=metric.return_3m_percent,
+        return_1y_percent=metric.return_1y_percent,
+        annualized_volatility_percent=metric.annualized_volatility_percent,
+        max_drawdown_percent=metric.max_drawdown_percent,
+        sharpe_ratio=metric.sharpe_ratio,
+        computed_at=metric.computed_at,
+    )
+
+
+def refresh_fund_metrics(db: Session) -> int:
+    """为持仓基金及已有指标的基金重算业绩指标，无需检查或无新净值的跳过，返回重算数量。"""
+    codes = db.scalars(
+        union(
+            select(FundHolding.fund_code).where(FundHolding.total_shares > 0),
+            select(FundMetric.fund_code),
+        )
+    ).all()
+    now = cst_now()
+    count = 0
+    for code in sorted(codes):
+        metric = db.get(FundMetric, code)
+        if metric is not None and not _needs_check(metric, now, backoff=True):
+            continue
+        try:
+            meta = fund_service._resolve_fund_by_code(code)
+            if "货币型" in meta["type"]:
+                continue
+            _, updated = _refresh_one(db, code, metric)
+            db.commit()
+            count += int(updated)
+        except Exception as exc:
+            db.rollback()
+            _logger.warning("基金业绩指标计算失败: %s, 错误: %s", code, exc)
+    return count
+
+
+def _refresh_one(
+    db: Session, code: str, metric: FundMetric | None
+) -> tuple[FundMetric, bool]:
+    """检查净值序列，出现新的净值日时重算；返回指标及是否重算。"""
+    _, columns = fund_service.get_fund_nav_series(code)
+    if not columns.dates:
+        raise ValueError(f"基金暂无历史净值: {code}")
+    now = cst_now()
+    if metric is not None and columns.dates[-1] <= metric.nav_date.isoformat():
+        metric.checked_at = now
+        return metric, False
+    values = compute_fund_metrics(columns.dates, columns.nav, columns.daily_growth)
+    if metric is None:
+        metric = FundMetric(fund_code=code)
+        db.add(metric)
+    for name, value in values.items():
+        setattr(metric, name, value)
+    metric.computed_at = now
+    metric.checked_at = now
+    return metric, True
+
+
+def _needs_check(metric: FundMetric, now: datetime, backoff: bool = False) -> bool:
+    """净值日早于最近交易日时需要检查新净值。
+
+    `backoff` 为真时，连上一交易日净值也缺失（已错过一整晚发布）的滞后基金
+    距上次检查超过间隔才再检查。
+    """
+    expected = trading_calendar.last_trading_day(now.date())
+    if metric.nav_date >= expected:
+        return False
+    if not backoff:
+        return True
+    previous = trading_calendar.last_trading_day(expected - timedelta(days=1))
+    if metric.nav_date >= previous:
+        return True
+    checked_at = metric.checked_at or metric.computed_at
+    return now - checked_at >= _LAGGING_RECHECK_INTERVAL
+
+
+def _to_percent(value: float | None) -> float | None:
+    return value * 100 if value is not None else None
@@ -0,0 +1,279 @@
+"""基金季度持仓存储：定期报告持仓按 (基金, 年, 季度) 落库，每个季度只下载一次。
+
+上游按年份返回全年各季度持仓。以各季度报告的披露截止日推算当前应已披露的
+最新季度，只在该季度尚未入库、且本季度还未拉取过时重新下载；缺失的年份并发拉取。
+"""
+
+from __future__ import annotations
+
+import datetime
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.db import SessionLocal
+from app.exceptions import UpstreamError
+from app.models.db.models import FundPortfolioFetch, FundPortfolioHolding
+from app.services import akshare_adapter
+from app.time_utils import cst_now
+from app.utils.lazy_import import lazy_import
+from app.utils.parsing import parse_float, parse_percent
+
+if TYPE_CHECKING:
+    import pandas as pd
+else:
+    pd = lazy_import("pandas")
+
+_logger = logging.getLogger(__name__)
+# 季度报告在季度结束后 15 个工作日内披露，按 30 天留出节假日余量
+_DISCLOSURE_LAG = datetime.timedelta(days=30)
+
+Quarter = tuple[int, int]
+
+
+def _quarter_end(year: int, quarter: int) -> datetime.date:
+    if quarter == 4:
+        return datetime.date(year, 12, 31)
+    return datetime.date(year, quarter * 3 + 1, 1) - datetime.timedelta(days=1)
+
+
+def _disclosure_date(year: int, quarter: int) -> datetime.date:
+    return _quarter_end(year, quarter) + _DISCLOSURE_LAG
+
+
+def disclosed_quarter(today: datetime.date | None = None) -> Quarter:
+    """返回截至给定日期应已披露持仓的最新季度。"""
+    today = today or cst_now().date()
+    year, quarter = today.year, (today.month - 1) // 3 + 1
+    while True:
+        year, quarter = (year, quarter - 1) if quarter > 1 else (year - 1, 4)
+        if _disclosure_date(year, quarter) <= today:
+            return year, quarter
+
+
+def portfolio_years(today: datetime.date | None = None) -> tuple[int, int]:
+    """需要保存的持仓年份：最新披露季度所在年份及上一年（用于环比）。"""
+    year, _ = disclosed_quarter(today)
+    return year, year - 1
+
+
+def _extract_quarter(value: str, year: int) -> int | None:
+    """从季度描述中提取季度数"""
+    if not isinstance(value, str):
+        return None
+    if f"{year}年" not in value:
+        return None
+    for q in range(4, 0, -1):
+        if f"{q}季度" in value:
+            return q
+    return None
+
+
+def _is_fetch_fresh(
+    fetch: FundPortfolioFetch | None, year: int, latest: Quarter
+) -> bool:
+    """已入库目标季度，或在目标季度披露截止后拉取过（基金未披露），均无需重新下载。"""
+    if fetch is None:
+        return False
+    target = latest[1] if year == latest[0] else 4
+    if fetch.latest_quarter is not None and fetch.latest_quarter >= target:
+        return True
+    return fetch.fetched_at.date() >= _disclosure_date(year, target)
+
+
+def _fetch_year(code: str, year: int) -> list[FundPortfolioHolding]:
+    holdings = akshare_adapter.fund_portfolio_hold_em(symbol=code, date=year)
+    if holdings.empty:
+        return []
+    holdings = holdings.assign(
+        _quarter=holdings["季度"].map(lambda value: _extract_quarter(value, year))
+    )
+    holdings = holdings.dropna(subset=["_quarter"]).drop_duplicates(
+        subset=["_quarter", "股票代码"]
+    )
+    return [
+        FundPortfolioHolding(
+            fund_code=code,
+            year=year,
+            quarter=int(row["_quarter"]),
+            quarter_label=str(row["季度"]),
+            stock_code=str(row["股票代码"]),
+            stock_name=str(row.get("股票名称")),
+            weight_percent=parse_percent(row.get("占净值比例")),
+            shares=parse_float(row.get("持股数")),
+            market_value=parse_float(row.get("持仓市值")),
+        )
+        for _, row in holdings.iterrows()
+    ]
+
+
+def _store_year(
+    db: Session, code: str, year: int, rows: list[FundPortfolioHolding]
+) -> None:
+    db.execute(
+        delete(FundPortfolioHolding).where(
+            FundPortfolioHolding.fund_code == code, FundPortfolioHolding.year == year
+        )
+    )
+    db.add_all(rows)
+    db.merge(
+        FundPortfolioFetch(
+            fund_code=code,
+            year=year,
+            latest_quarter=max((row.quarter for row in rows), default=None),
+            fetched_at=cst_now(),
+        )
+    )
+
+
+def ensure_fund_portfolio(db: Session, code: str) -> None:
+    """确保最近两年的持仓已入库，过期或缺失的年份并发下载。
+
+    下载失败的年份不记录拉取时间（下次请求重试），已入库的持仓继续使用。
+    """
+    latest = disclosed_quarter()
+    years = portfolio_years()
+    fetches = {
+        fetch.year: fetch
+        for fetch in db.scalars(
+            select(FundPortfolioFetch).where(
+                FundPortfolioFetch.fund_code == code,
+                FundPortfolioFetch.year.in_(years),
+            )
+        )
+    }
+    stale = [
+        year for year in years if not _is_fetch_fresh(fetches.get(year), year, latest)
+    ]
+    if not stale:
+        return
+    with ThreadPoolExecutor(
+        max_workers=len(stale), thread_name_prefix="fund-portfolio"
+    ) as executor:
+        futures = {year: executor.submit(_fetch_year, code, year) for year in stale}
+    fetched: dict[int, list[FundPortfolioHolding]] = {}
+    error: UpstreamError | None = None
+    for year, future in futures.items():
+        try:
+            fetched[year] = future.result()
+        except UpstreamError as exc:
+            _logger.warning("基金持仓下载失败: %s %s, 错误: %s", code, year, exc)
+            error = exc
+    try:
+        for year, rows in fetched.items():
+            _store_year(db, code, year, rows)
+        db.commit()
+    except IntegrityError:
+        # 并发请求已写入同一基金的持仓
+        db.rollback()
+        _logger.info("基金持仓已由并发请求写入: %s", code)
+    if error is not None and not _has_stored_holdings(db, code):
+        # 没有可回退的已入库持仓时才向上抛出
+        raise error
+
+
+def _has_stored_holdings(db: Session, code: str) -> bool:
+    return (
+        db.scalar(
+            select(FundPortfolioHolding.id)
+            .where(FundPortfolioHolding.fund_code == code)
+            .limit(1)
+        )
+        is not None
+    )
+
+
+def latest_stored_quarters(db: Session, codes: list[str]) -> dict[str, Quarter]:
+    """各基金已入库持仓的最新季度（未入库的基金不在结果中）。"""
+    if not codes:
+        return {}
+    rows = db.execute(
+        select(
+            FundPortfolioHolding.fund_code,
+            FundPortfolioHolding.year,
+            FundPortfolioHolding.quarter,
+        )
+        .where(FundPortfolioHolding.fund_code.in_(codes))
+        .distinct()
+    ).all()
+    latest: dict[str, Quarter] = {}
+    for code, year, quarter in rows:
+        latest[code] = max(latest.get(code, (year, quarter)), (year, quarter))
+    return latest
+
+
+def load_quarter_holdings(
+    db: Session, code: str, limit: int = 2
+) -> list[tuple[Quarter, list[FundPortfolioHolding]]]:
+    """读取已入库的最近若干季度持仓（新到旧），每季度保持上游披露顺序。"""
+    quarters = db.execute(
+        select(FundPortfolioHolding.year, FundPortfolioHolding.quarter)
+        .where(FundPortfolioHolding.fund_code == code)
+        .distinct()
+        .order_by(FundPortfolioHolding.year.desc(), FundPortfolioHolding.quarter.desc())
+        .limit(limit)
+    ).all()
+    output = []
+    for year, quarter in quarters:
+        rows = db.scalars(
+            select(FundPortfolioHolding)
+            .where(
+                FundPortfolioHolding.fund_code == code,
+                FundPortfolioHolding.year == year,
+                FundPortfolioHolding.quarter == quarter,
+            )
+            .order_by(FundPortfolioHolding.id)
+        ).all()
+        output.append(((year, quarter), list(rows)))
+    return output
+
+
+def get_recent_quarter_holdings(
+    code: str, limit: int = 2
+) -> list[tuple[Quarter, list[FundPortfolioHolding]]]:
+    """按需补齐后返回最近若干季度持仓。"""
+    with SessionLocal() as db:
+        ensure_fund_portfolio(db, code)
+        return load_quarter_holdings(db, code, limit)
+
+
+def latest_quarter_holdings(code: str) -> pd.DataFrame | None:
+    """返回最新季度持仓，列名与上游 `fund_portfolio_hold_em` 一致。"""
+    quarters = get_recent_quarter_holdings(code, limit=1)
+    if not quarters:
+        return None
+    _, rows = quarters[0]
+    return pd.DataFrame(
+        {
+            "股票代码": [row.stock_code for row in rows],
+            "股票名称": [row.stock_name for row in rows],
+            "占净值比例": [row.weight_percent for row in rows],
+            "持股数": [row.shares for row in rows],
+            "持仓市值": [row.market_value for row in rows],
+            "季度": [row.quarter_label for row in rows],
+        }
+    )
+
+
+def diff_quarter_holdings(
+    current: list[FundPortfolioHolding], previous: list[FundPortfolioHolding]
+) -> tuple[
+    list[FundPortfolioHolding],
+    list[FundPortfolioHolding],
+    list[tuple[FundPortfolioHolding, FundPortfolioHolding]],
+]:
+    """按股票代码比较两期持仓，返回新进、退出与两期均持有的 (本期, 上期) 配对。"""
+    previous_map = {row.stock_code: row for row in previous}
+    current_codes = {row.stock_code for row in current}
+    added = [row for row in current if row.stock_code not in previous_map]
+    removed = [row for row in previous if row.stock_code not in current_codes]
+    retained = [
+        (row, previous_map[row.stock_code])
+        for row in current
+        if row.stock_code in previous_map
+    ]
+    return added, removed, retained
@@ -1,34 +1,53 @@
 from __future__ import annotations
 
 import datetime
-from typing import Any, Callable, TypeVar
-
-import akshare as ak
-import pandas as pd
+import json
+from bisect import bisect_left, bisect_right
+from typing import TYPE_CHECKING, Any, Callable, Iterator, NamedTuple, TypeVar
 
 from app.exceptions import FundNotFoundError
+from app.models.db.models import FundPortfolioHolding
 from app.models.schemas import (
     BasicInfoItem,
     FundHolding,
+    FundHoldingChangeItem,
     FundHoldingEstimate,
+    FundHoldingsDiffResponse,
     FundNav,
-    FundNavHistoryItem,
+    FundNavHistoryFormat,
     FundNavHistoryPeriod,
     FundNavHistoryResponse,
     FundRealtimeEstimateResponse,
     FundSnapshotResponse,
 )
+from app.services import akshare_adapter
 from app.services.cache import (
+    CachedResponse,
     get_fund_basic_info_cache,
     get_fund_latest_holdings_cache,
     get_fund_list_cache,
+    get_fund_nav_history_response_cache,
+    get_fund_nav_series_cache,
     get_fund_realtime_estimate_cache,
+    get_fund_snapshot_response_cache,
 )
+from app.services.fund import fund_portfolio_service
 from app.services.stock import stock_service
+from app.utils.downsampling import minmax_downsample_indices
+from app.utils.lazy_import import lazy_import
 from app.utils.parsing import parse_float, parse_percent
 
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+else:
+    np = lazy_import("numpy")
+    pd = lazy_import("pandas")
+
 T = TypeVar("T")
 
+_NAV_HISTORY_CHUNK_ROWS = 500
+
 
 def _resolve_fund_by_code(code: str) -> dict:
     """根据基金代码解析基金"""
@@ -49,7 +68,7 @@ def _resolve_fund_by_code(code: str) -> dict:
 
 def _get_basic_info(code: str) -> list[BasicInfoItem]:
     """获取基金基本信息"""
-    info_df = ak.fund_individual_basic_info_xq(symbol=code)
+    info_df = akshare_adapter.fund_individual_basic_info_xq(symbol=code)
     return [
         BasicInfoItem(item=str(row["item"]), value=str(row["value"]))
         for _, row in info_df.iterrows()
@@ -58,7 +77,7 @@ def _get_basic_info(code: str) -> list[BasicInfoItem]:
 
 def _get_basic_info_cached(code: str) -> list[BasicInfoItem]:
     def _loader() -> list[dict[str, str | None]]:
-        info_df = ak.fund_individual_basic_info_xq(symbol=code)
+        info_df = akshare_adapter.fund_individual_basic_info_xq(symbol=code)
         return [
             {
                 "item": str(row["item"]),
@@ -77,14 +96,14 @@ def _get_basic_info_cached(code: str) -> list[BasicInfoItem]:
 
 def _latest_nav_open_fund(code: str) -> FundNav:
     """开放式基金最新净值"""
-    nav_df = ak.fund_open_fund_info_em(symbol=code, indicator="单位净值走势")
+    nav_df = akshare_adapter.fund_open_fund_info_em(symbol=code)
     latest = nav_df.iloc[-1]
     return FundNav(date=latest["净值日期"], nav=float(latest["单位净值"]))
 
 
 def _latest_nav_money_fund(code: str) -> FundNav:
     """货币型基金最新净值"""
-    nav_df = ak.fund_money_fund_info_em(symbol=code)
+    nav_df = akshare_adapter.fund_money_fund_info_em(symbol=code)
     latest = nav_df.iloc[-1]
     nav = float(latest["每万份收益"])
     nav_7d = float(latest["7日年化收益率"])
@@ -92,7 +111,7 @@ def _latest_nav_money_fund(code: str) -> FundNav:
 
 
 def _resolve_nav_by_date_open_fund(code: str, date_value: datetime.date) -> float:
-    nav_df = ak.fund_open_fund_info_em(symbol=code, indicator="单位净值走势")
+    nav_df = akshare_adapter.fund_open_fund_info_em(symbol=code)
     target = date_value.isoformat()
     matched = nav_df[nav_df["净值日期"].astype(str) == target]
     if matched.empty:
@@ -101,7 +120,7 @@ def _resolve_nav_by_date_open_fund(code: str, date_value: datetime.date) -> floa
 
 
 def _resolve_nav_by_date_money_fund(code: str, date_value: datetime.date) -> float:
-    nav_df = ak.fund_money_fund_info_em(symbol=code)
+    nav_df = akshare_adapter.fund_money_fund_info_em(symbol=code)
     target = date_value.isoformat()
     matched = nav_df[nav_df["净值日期"].astype(str) == target]
     if matched.empty:
@@ -117,42 +136,19 @@ def resolve_fund_nav_by_date(code: str, date_value: datetime.date) -> float:
     return _resolve_nav_by_date_open_fund(meta["code"], date_value)
 
 
-def _extract_quarter(value: str, year: int) -> int | None:
-    """从季度描述中提取季度数"""
-    if not isinstance(value, str):
-        return None
-    if f"{year}年" not in value:
-        return None
-    for q in range(4, 0, -1):
-        if f"{q}季度" in value:
-            return q
-    return None
-
-
-def _latest_quarter_holdings_by_year(code: str, year: int) -> pd.DataFrame | None:
-    """获取指定年份最后一个季度的持仓数据"""
-    holdings = ak.fund_portfolio_hold_em(symbol=code, date=year)
-    if holdings.empty:
-        return None
-
-    quarters = holdings["季度"].apply(lambda x: _extract_quarter(x, year))
-    if quarters.isna().all():
-        return None
-
-    latest_quarter = int(quarters.dropna().max())
-    return holdings[
-        holdings["季度"].str.contains(f"{year}年{latest_quarter}季度", na=False)
-    ]
+def get_fund_nav_map(code: str) -> dict[datetime.date, float]:
+    """获取基金全部历史净值（日期 -> 净值），读取缓存的完整净值序列。"""
+    _, columns = get_fund_nav_series(code)
+    return {
+        datetime.date.fromisoformat(date_value): value
+        for date_value, value in zip(columns.dates, columns.nav)
+        if value is not None
+    }
 
 
 def _latest_quarter_holdings(code: str) -> pd.DataFrame | None:
-    """当前年份无数据时回退上一年"""
-    year = datetime.datetime.now().year
-    for y in [year, year - 1]:
-        result = _latest_quarter_holdings_by_year(code, y)
-        if result is not None and not result.empty:
-            return result
-    return None
+    """最新季度持仓（读取本地持仓存储，缺失时按季度补齐）"""
+    return fund_portfolio_service.latest_quarter_holdings(code)
 
 
 def _format_holdings(holdings: pd.DataFrame | None) -> list[FundHolding]:
@@ -257,27 +253,175 @@ def _estimate_from_holdings(
     return details, skipped, estimated_growth
 
 
-def _filter_history_by_period(
-    nav_df: pd.DataFrame,
-    date_col: str,
-    period: FundNavHistoryPeriod,
-) -> pd.DataFrame:
-    """按时间维度过滤历史净值"""
-    if period == FundNavHistoryPeriod.since_inception:
-        return nav_df
-
-    period_days = {
-        FundNavHistoryPeriod.one_week: 7,
-        FundNavHistoryPeriod.one_month: 30,
-        FundNavHistoryPeriod.three_months: 90,
-        FundNavHistoryPeriod.one_year: 365,
+_PERIOD_DAYS = {
+    FundNavHistoryPeriod.one_week: 7,
+    FundNavHistoryPeriod.one_month: 30,
+    FundNavHistoryPeriod.three_months: 90,
+    FundNavHistoryPeriod.one_year: 365,
+}
+
+
+class NavHistoryColumns(NamedTuple):
+    dates: list[str]
+    nav: list[float | None]
+    daily_growth: list[float | None] | None
+    nav_7d: list[float | None] | None
+
+
+def _nullable_floats(series: pd.Series) -> list[float | None]:
+    """数值列转为浮点列表，无法解析的值为 None。"""
+    values = pd.to_numeric(series, errors="coerce")
+    return values.astype(object).where(values.notna(), None).tolist()
+
+
+def _load_nav_series(meta: dict) -> dict[str, Any]:
+    """拉取全部历史净值，按日期升序整理为列式数据。
+
+    日期统一为 ISO 字符串，字典序即时间序，可直接二分查找。
+    """
+    if "货币型" in meta["type"]:
+        nav_df = akshare_adapter.fund_money_fund_info_em(symbol=meta["code"])
+        value_col, extra_col = "每万份收益", "7日年化收益率"
+    else:
+        nav_df = akshare_adapter.fund_open_fund_info_em(symbol=meta["code"])
+        value_col, extra_col = "单位净值", "日增长率"
+    if nav_df.empty:
+        nav_df = pd.DataFrame(columns=["净值日期", value_col, extra_col])
+    dates = pd.to_datetime(nav_df["净值日期"])
+    if not dates.is_monotonic_increasing:
+        order = dates.argsort(kind="stable")
+        nav_df = nav_df.iloc[order]
+        dates = dates.iloc[order]
+    extra = _nullable_floats(nav_df[extra_col])
+    return {
+        "meta": meta,
+        "dates": dates.dt.strftime("%Y-%m-%d").tolist(),
+        "nav": _nullable_floats(nav_df[value_col]),
+        "daily_growth": extra if extra_col == "日增长率" else None,
+        "nav_7d": None if extra_col == "日增长率" else extra,
     }
 
-    nav_df = nav_df.copy()
-    nav_df[date_col] = pd.to_datetime(nav_df[date_col])
-    end_date = nav_df[date_col].max()
-    start_date = end_date - pd.Timedelta(days=period_days[period])
-    return nav_df[nav_df[date_col] >= start_date]
+
+def get_fund_nav_series(
+    code: str,
+    period: FundNavHistoryPeriod = FundNavHistoryPeriod.since_inception,
+) -> tuple[dict, NavHistoryColumns]:
+    """返回基金信息与指定周期内按日期升序的列式净值（读取缓存的完整序列）。"""
+    code = str(code).strip()
+    series = get_fund_nav_series_cache(
+        code, lambda: _load_nav_series(_resolve_fund_by_code(code))
+    )
+    columns = NavHistoryColumns(
+        series["dates"], series["nav"], series["daily_growth"], series["nav_7d"]
+    )
+    if period != FundNavHistoryPeriod.since_inception:
+        columns = _slice_nav_history(columns, period)
+    return series["meta"], columns
+
+
+def _slice_nav_history(
+    columns: NavHistoryColumns,
+    period: FundNavHistoryPeriod,
+    start: datetime.date | None = None,
+    end: datetime.date | None = None,
+    since: datetime.date | None = None,
+) -> NavHistoryColumns:
+    """按周期与日期区间截取历史净值，在升序日期上二分查找边界。
+
+    `start`/`end` 为闭区间，`since` 只返回严格晚于该日期的数据（增量拉取）。
+    """
+    dates = columns.dates
+    lo, hi = 0, len(dates)
+    if period != FundNavHistoryPeriod.since_inception and dates:
+        latest = datetime.date.fromisoformat(dates[-1])
+        cutoff = latest - datetime.timedelta(days=_PERIOD_DAYS[period])
+        lo = bisect_left(dates, cutoff.isoformat())
+    if start is not None:
+        lo = max(lo, bisect_left(dates, start.isoformat()))
+    if since is not None:
+        lo = max(lo, bisect_right(dates, since.isoformat()))
+    if end is not None:
+        hi = bisect_right(dates, end.isoformat())
+    hi = max(lo, hi)
+    return NavHistoryColumns(
+        dates[lo:hi],
+        columns.nav[lo:hi],
+        None if columns.daily_growth is None else columns.daily_growth[lo:hi],
+        None if columns.nav_7d is None else columns.nav_7d[lo:hi],
+    )
+
+
+def _downsample_nav_history(
+    columns: NavHistoryColumns, max_points: int
+) -> NavHistoryColumns:
+    """按净值做保形降采样，其余列取相同的点。"""
+    if len(columns.dates) <= max_points:
+        return columns
+    indices = minmax_downsample_indices(
+        np.array(columns.nav, dtype=float), max_points
+    ).tolist()
+
+    def _pick(values: list | None) -> list | None:
+        return None if values is None else [values[index] for index in indices]
+
+    return NavHistoryColumns(
+        _pick(columns.dates),
+        _pick(columns.nav),
+        _pick(columns.daily_growth),
+        _pick(columns.nav_7d),
+    )
+
+
+def _dump_json(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def _iter_nav_history_json(
+    meta: dict,
+    period: FundNavHistoryPeriod,
+    columns: NavHistoryColumns,
+    fmt: FundNavHistoryFormat,
+) -> Iterator[str]:
+    """分块生成历史净值 JSON，字段与 `FundNavHistoryResponse` /
+    `FundNavHistoryColumnsResponse` 一致。"""
+    header = _dump_json(
+        {
+            "code": meta["code"],
+            "name": meta["name"],
+            "type": meta["type"],
+            "period": period.value,
+        }
+    )[:-1]
+    if fmt == FundNavHistoryFormat.columns:
+        yield header
+        yield f',"dates":{_dump_json(columns.dates)}'
+        yield f',"nav":{_dump_json(columns.nav)}'
+        yield f',"daily_growth":{_dump_json(columns.daily_growth)}'
+        yield f',"nav_7d":{_dump_json(columns.nav_7d)}}}'
+        return
+
+    size = len(columns.dates)
+    daily_growth = columns.daily_growth or [None] * size
+    nav_7d = columns.nav_7d or [None] * size
+    yield f'{header},"data":['
+    for start in range(0, size, _NAV_HISTORY_CHUNK_ROWS):
+        stop = start + _NAV_HISTORY_CHUNK_ROWS
+        rows = [
+            {
+                "date": date_value,
+                "nav": nav,
+                "daily_growth": growth,
+                "nav_7d": nav_7d_value,
+            }
+            for date_value, nav, growth, nav_7d_value in zip(
+                columns.dates[start:stop],
+                columns.nav[start:stop],
+                daily_growth[start:stop],
+                nav_7d[start:stop],
+            )
+        ]
+        yield ("," if start else "") + _dump_json(rows)[1:-1]
+    yield "]}"
 
 
 def get_fund_nav_history(
@@ -285,39 +429,87 @@ def get_fund_nav_history(
     period: FundNavHistoryPeriod,
 ) -> FundNavHistoryResponse:
     """获取基金历史净值数据"""
-    meta = _resolve_fund_by_code(code)
+    return FundNavHistoryResponse.model_validate_json(
+        get_fund_nav_history_json(code, period).body
+    )
 
-    if "货币型" in meta["type"]:
-        nav_df = ak.fund_money_fund_info_em(symbol=meta["code"])
-        nav_df = _filter_history_by_period(nav_df, "净值日期", period)
-        data = [
-            FundNavHistoryItem(
-                date=row["净值日期"],
-                nav=float(row["每万份收益"]),
-                nav_7d=float(row["7日年化收益率"]),
-            )
-            for _, row in nav_df.iterrows()
-        ]
-    else:
-        nav_df = ak.fund_open_fund_info_em(
-            symbol=meta["code"], indicator="单位净值走势"
+
+def get_fund_nav_history_json(
+    code: str,
+    period: FundNavHistoryPeriod,
+    fmt: FundNavHistoryFormat = FundNavHistoryFormat.rows,
+    start: datetime.date | None = None,
+    end: datetime.date | None = None,
+    since: datetime.date | None = None,
+    max_points: int | None = None,
+) -> CachedResponse:
+    """返回历史净值响应的 JSON 字节及 ETag，命中缓存时不访问上游。
+
+    完整净值序列单独缓存，不同周期、日期区间与增量查询均在其上截取；
+    指定 `max_points` 时再降采样到不超过该点数，结果按参数组合分别缓存。
+    """
+    if start is not None and end is not None and start > end:
+        raise ValueError("开始日期不能晚于结束日期")
+    code = str(code).strip()
+
+    def _loader() -> str:
+        meta, columns = get_fund_nav_series(code)
+        columns = _slice_nav_history(columns, period, start, end, since)
+        if max_points is not None:
+            columns = _downsample_nav_history(columns, max_points)
+        return "".join(_iter_nav_history_json(meta, period, columns, fmt))
+
+    variant = ":".join(
+        (
+            period.value,
+            fmt.value,
+            *(value.isoformat() if value else "" for value in (start, end, since)),
+            str(max_points or ""),
         )
-        nav_df = _filter_history_by_period(nav_df, "净值日期", period)
-        data = [
-            FundNavHistoryItem(
-                date=row["净值日期"],
-                nav=float(row["单位净值"]),
-                daily_growth=float(row["日增长率"]),
-            )
-            for _, row in nav_df.iterrows()
-        ]
+    )
+    return get_fund_nav_history_response_cache(code, variant, _loader)
+
+
+def _build_holding_change(
+    current: FundPortfolioHolding | None, previous: FundPortfolioHolding | None
+) -> FundHoldingChangeItem:
+    row = current or previous
+    change = None
+    if current is not None and previous is not None:
+        if current.weight_percent is not None and previous.weight_percent is not None:
+            change = current.weight_percent - previous.weight_percent
+    return FundHoldingChangeItem(
+        stock_code=row.stock_code,
+        stock_name=row.stock_name,
+        previous_weight_percent=previous.weight_percent if previous else None,
+        current_weight_percent=current.weight_percent if current else None,
+        weight_change_percent=change,
+        previous_shares=previous.shares if previous else None,
+        current_shares=current.shares if current else None,
+    )
+
 
-    return FundNavHistoryResponse(
+def get_fund_holdings_diff(code: str) -> FundHoldingsDiffResponse:
+    """比较最近两个季度的持仓：新进、退出与占净值比例变动"""
+    meta = _resolve_fund_by_code(code)
+    quarters = fund_portfolio_service.get_recent_quarter_holdings(meta["code"])
+    labels = [f"{year}年{quarter}季度" for (year, quarter), _ in quarters]
+    current = quarters[0][1] if quarters else []
+    previous = quarters[1][1] if len(quarters) > 1 else []
+    added, removed, retained = fund_portfolio_service.diff_quarter_holdings(
+        current, previous
+    )
+    changed = [_build_holding_change(now, before) for now, before in retained]
+    changed.sort(key=lambda item: -abs(item.weight_change_percent or 0.0))
+    return FundHoldingsDiffResponse(
         code=meta["code"],
         name=meta["name"],
         type=meta["type"],
-        period=period,
-        data=data,
+        current_quarter=labels[0] if labels else None,
+        previous_quarter=labels[1] if len(labels) > 1 else None,
+        added=[_build_holding_change(row, None) for row in added],
+        removed=[_build_holding_change(None, row) for row in removed],
+        changed=changed,
     )
 
 
@@ -343,11 +535,38 @@ def get_fund_snapshot(code: str) -> FundSnapshotResponse:
     )
 
 
+def get_fund_snapshot_json(code: str) -> CachedResponse:
+    """返回基金快照响应的 JSON 字节及 ETag，命中缓存时不访问上游。"""
+    code = str(code).strip()
+    return get_fund_snapshot_response_cache(
+        code, lambda: get_fund_snapshot(code).model_dump_json()
+    )
+
+
+def prefetch_fund_data(code: str) -> None:
+    """预取基金快照（含基本信息、最新净值与持仓）与实时估值（含成分股行情）缓存。"""
+    meta = _resolve_fund_by_code(code)
+    get_fund_snapshot_json(meta["code"])
+    get_fund_realtime_estimate_json(meta["code"])
+
+
 def get_fund_realtime_estimate(code: str) -> FundRealtimeEstimateResponse:
     """根据基金持仓与股票实时涨幅计算预估净值与涨幅"""
-    meta = _resolve_fund_by_code(code)
+    return FundRealtimeEstimateResponse.model_validate_json(
+        get_fund_realtime_estimate_json(code)
+    )
+
+
+def get_fund_realtime_estimate_json(code: str) -> bytes:
+    """返回实时估值响应的 JSON 字节。
+
+    缓存按规范化后的基金代码查找，命中时直接复用已序列化的结果，
+    不再解析基金列表，也不再构造响应模型。
+    """
+    code = str(code).strip()
 
-    def _loader() -> dict[str, Any]:
+    def _loader() -> str:
+        meta = _resolve_fund_by_code(code)
         if "货币型" in meta["type"]:
             nav = _latest_nav_money_fund(meta["code"])
         else:
@@ -371,7 +590,6 @@ def get_fund_realtime_estimate(code: str) -> FundRealtimeEstimateResponse:
             holdings=holdings,
             skipped=skipped,
         )
-        return response.model_dump(mode="json")
+        return response.model_dump_json()
 
-    cached = get_fund_realtime_estimate_cache(meta["code"], _loader)
-    return FundRealtimeEstimateResponse(**cached)
+    return get_fund_realtime_estimate_cache(code, _loader).encode("utf-8")
@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import logging
+from datetime import date, timedelta
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import case, delete, func, insert, or_, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.exceptions import FundAccountNotFoundError, FundNotFoundError, UpstreamError
+from app.models.db.models import (
+    FundAccount,
+    FundHolding,
+    FundHoldingDailyValue,
+    FundTransaction,
+)
+from app.models.enums import FundTradeStatus, FundTradeType
+from app.models.schemas import FundAccountDailyValueItem, FundAccountDailyValueResponse
+from app.services.fund import fund_service
+from app.time_utils import cst_now
+from app.utils.lazy_import import lazy_import
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+else:
+    np = lazy_import("numpy")
+    pd = lazy_import("pandas")
+
+_logger = logging.getLogger(__name__)
+
+_MIN_SHARES = 1e-8
+
+
+def snapshot_daily_values(db: Session, end_date: date | None = None) -> int:
+    """生成持仓每日估值快照。
+
+    首次运行从最早的确认交易日开始回补；之后每次重算最近
+    `valuation_lookback_days` 天，补齐净值延迟发布的日期。上次快照之后新录入、
+    修改或确认的交易（补录、批量导入、待确认交易到期），以及被手动修改的持仓，
+    若确认日期更早，则从其确认日期开始重算。
+    """
+    end_date = end_date or cst_now().date()
+    last_date, last_written_at = db.execute(
+        select(
+            func.max(FundHoldingDailyValue.value_date),
+            func.max(FundHoldingDailyValue.created_at),
+        )
+    ).one()
+    confirmed_since = select(func.min(FundTransaction.confirmed_nav_date)).where(
+        FundTransaction.status == FundTradeStatus.confirmed
+    )
+    if last_date is None:
+        start_date = db.execute(confirmed_since).scalar()
+        if start_date is None:
+            return 0
+    else:
+        start_date = min(
+            last_date + timedelta(days=1),
+            end_date - timedelta(days=settings.valuation_lookback_days),
+        )
+        backdated = db.execute(
+            confirmed_since.outerjoin(
+                FundHolding, FundHolding.id == FundTransaction.holding_id
+            ).where(
+                or_(
+                    FundTransaction.updated_at > last_written_at,
+                    FundHolding.updated_at > last_written_at,
+                )
+            )
+        ).scalar()
+        if backdated is not None:
+            start_date = min(start_date, backdated)
+    return rebuild_daily_values(db, start_date, end_date)
+
+
+def rebuild_daily_values(
+    db: Session,
+    start_date: date,
+    end_date: date,
+    account_id: int | None = None,
+) -> int:
+    """重算指定日期区间的每日估值快照（先删后写，可重复执行）。
+
+    净值获取失败的基金保留原有快照，不参与删除。
+    """
+    if start_date > end_date:
+        return 0
+    rows, skipped = _build_daily_values(db, start_date, end_date, account_id)
+
+    stmt = delete(FundHoldingDailyValue).where(
+        FundHoldingDailyValue.value_date >= start_date,
+        FundHoldingDailyValue.value_date <= end_date,
+    )
+    if account_id is not None:
+        stmt = stmt.where(FundHoldingDailyValue.account_id == account_id)
+    if skipped:
+        stmt = stmt.where(FundHoldingDailyValue.fund_code.notin_(skipped))
+    db.execute(stmt)
+    if rows:
+        db.execute(insert(FundHoldingDailyValue), rows)
+    db.commit()
+    return len(rows)
+
+
+def list_account_daily_values(
+    db: Session,
+    account_id: int,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    fund_code: str | None = None,
+) -> FundAccountDailyValueResponse:
+    """按日期区间查询账户每日估值（单次索引范围查询）。"""
+    if db.get(FundAccount, account_id) is None:
+        raise FundAccountNotFoundError(f"未找到基金账户: {account_id}")
+
+    stmt = select(
+        FundHoldingDailyValue.value_date,
+        func.sum(FundHoldingDailyValue.cost_amount),
+        func.sum(FundHoldingDailyValue.market_value),
+    ).where(FundHoldingDailyValue.account_id == account_id)
+    if start_date is not None:
+        stmt = stmt.where(FundHoldingDailyValue.value_date >= start_date)
+    if end_date is not None:
+        stmt = stmt.where(FundHoldingDailyValue.value_date <= end_date)
+    if fund_code:
+        fund_code = str(fund_code).strip()
+        stmt = stmt.where(FundHoldingDailyValue.fund_code == fund_code)
+    stmt = stmt.group_by(FundHoldingDailyValue.value_date).order_by(
+        FundHoldingDailyValue.value_date
+    )
+
+    data: list[FundAccountDailyValueItem] = []
+    for value_date, total_cost, total_value in db.execute(stmt):
+        total_profit = total_value - total_cost
+        data.append(
+            FundAccountDailyValueItem(
+                date=value_date,
+                total_cost=total_cost,
+                total_value=total_value,
+                total_profit=total_profit,
+                total_profit_percent=(
+                    total_profit / total_cost * 100 if total_cost > 0 else None
+                ),
+            )
+        )
+    return FundAccountDailyValueResponse(
+        account_id=account_id,
+        fund_code=fund_code or None,
+        data=data,
+    )
+
+
+def load_position_deltas(
+    db: Session,
+    end_date: date,
+    account_id: int | None = None,
+) -> pd.DataFrame:
+    """读取确认交易并按 (账户, 基金, 确认日期) 汇总份额与成本变化。"""
+    stmt = select(
+        FundTransaction.account_id,
+        FundTransaction.fund_code,
+        case((FundTransaction.trade_type == FundTradeType.sell, -1.0), else_=1.0),
+        FundTransaction.amount,
+        FundTransaction.shares,
+        FundTransaction.confirmed_nav_date,
+    ).where(
+        FundTransaction.status == FundTradeStatus.confirmed,
+        FundTransaction.confirmed_nav_date <= end_date,
+    )
+    if account_id is not None:
+        stmt = stmt.where(FundTransaction.account_id == account_id)
+    columns = ["account_id", "fund_code", "sign", "amount", "shares", "date"]
+    tx_df = pd.DataFrame(db.execute(stmt).all(), columns=columns)
+    if tx_df.empty:
+        return tx_df
+
+    sign = tx_df["sign"].to_numpy(dtype=float)
+    tx_df["shares_delta"] = tx_df["shares"].to_numpy(dtype=float) * sign
+    tx_df["cost_delta"] = tx_df["amount"].to_numpy(dtype=float) * sign
+    return (
+        tx_df.groupby(["account_id", "fund_code", "date"], as_index=False)[
+            ["shares_delta", "cost_delta"]
+        ]
+        .sum()
+        .sort_values(["account_id", "fund_code", "date"], ignore_index=True)
+    )
+
+
+def _build_daily_values(
+    db: Session,
+    start_date: date,
+    end_date: date,
+    account_id: int | None,
+) -> tuple[list[dict[str, Any]], list[str]]:
+    """返回估值行与净值获取失败而跳过的基金代码。"""
+    deltas = load_position_deltas(db, end_date, account_id)
+    if deltas.empty:
+        return [], []
+
+    start = np.datetime64(start_date, "D")
+    end = np.datetime64(end_date, "D")
+    rows: list[dict[str, Any]] = []
+    skipped: list[str] = []
+    for fund_code, fund_deltas in deltas.groupby("fund_code", sort=False):
+        try:
+            nav_map = fund_service.get_fund_nav_map(fund_code)
+        except (FundNotFoundError, ValueError, UpstreamError) as exc:
+            _logger.warning("每日估值跳过基金: %s, 错误: %s", fund_code, exc)
+            skipped.append(fund_code)
+            continue
+        if not nav_map:
+            skipped.append(fund_code)
+            continue
+        nav_dates = np.array(list(nav_map.keys()), dtype="datetime64[D]")
+        nav_values = np.fromiter(nav_map.values(), dtype=float, count=len(nav_map))
+        order = np.argsort(nav_dates)
+        nav_dates, nav_values = nav_dates[order], nav_values[order]
+        in_range = (nav_dates >= start) & (nav_dates <= end)
+        nav_dates, nav_values = nav_dates[in_range], nav_values[in_range]
+        if nav_dates.size == 0:
+            continue
+
+        for holder_id, holder_deltas in fund_deltas.groupby("account_id", sort=False):
+            rows.extend(
+                _value_position(
+                    int(holder_id), fund_code, holder_deltas, nav_dates, nav_values
+                )
+            )
+    return rows, skipped
+
+
+def _value_position(
+    account_id: int,
+    fund_code: str,
+    deltas: pd.DataFrame,
+    nav_dates: np.ndarray,
+    nav_values: np.ndarray,
+) -> list[dict[str, Any]]:
+    """用累计份额与净值日期对齐（searchsorted）计算每日市值。"""
+    change_dates = np.array(deltas["date"].tolist(), dtype="datetime64[D]")
+    cum_shares = np.cumsum(deltas["shares_delta"].to_numpy(dtype=float))
+    cum_cost = np.cumsum(deltas["cost_delta"].to_numpy(dtype=float))
+
+    idx = np.searchsorted(change_dates, nav_dates, side="right") - 1
+    held = idx >= 0
+    idx = idx[held]
+    shares = cum_shares[idx]
+    cost = cum_cost[idx]
+    navs = nav_values[held]
+    dates = nav_dates[held]
+
+    active = shares > _MIN_SHARES
+    shares, cost = shares[active], cost[active]
+    navs, dates = navs[active], dates[active]
+    market_values = shares * navs
+    return [
+        {
+            "account_id": account_id,
+            "fund_code": fund_code,
+            "value_date": value_date,
+            "shares": float(share),
+            "cost_amount": float(cost_amount),
+            "nav": float(nav),
+            "market_value": float(market_value),
+            "profit_amount": float(market_value - cost_amount),
+        }
+        for value_date, share, cost_amount, nav, market_value in zip(
+            dates.astype(object), shares, cost, navs, market_values
+        )
+    ]
@@ -0,0 +1,119 @@
+"""基于数据库租约的选主：多 worker / 多实例中只有持有租约的进程执行定时任务。
+
+租约记录在 `scheduler_leases` 表中，持有者定期续约；持有者退出时主动释放，
+异常退出时其他实例在租约过期后接管。租约的写入与过期判断统一使用数据库时间，
+各实例之间的时钟偏差不影响互斥；本地只按单调时钟判断租约是否仍在有效期内。
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.db import SessionLocal
+from app.metrics import set_scheduler_leader
+from app.models.db.models import SchedulerLease
+
+_logger = logging.getLogger(__name__)
+
+
+class LeaderElector:
+    """单个租约名下的选主状态。"""
+
+    def __init__(self, name: str, lease_seconds: float) -> None:
+        self.name = name
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._lease = timedelta(seconds=lease_seconds)
+        self._valid_until: float | None = None
+        self._lock = threading.Lock()
+
+    def is_leader(self) -> bool:
+        """本地判断租约是否仍有效（不访问数据库）。"""
+        with self._lock:
+            return (
+                self._valid_until is not None and time.monotonic() < self._valid_until
+            )
+
+    def acquire_or_renew(self) -> bool:
+        """抢占或续约租约，返回当前是否为主节点。"""
+        # 本地有效期从发起续约前开始计算，不会长于数据库中的租约
+        started = time.monotonic()
+        try:
+            with SessionLocal() as db:
+                now = _database_now(db)
+                expires_at = now + self._lease
+                result = db.execute(
+                    update(SchedulerLease)
+                    .where(
+                        SchedulerLease.name == self.name,
+                        or_(
+                            SchedulerLease.owner == self.owner,
+                            SchedulerLease.expires_at < now,
+                        ),
+                    )
+                    .values(owner=self.owner, expires_at=expires_at, updated_at=now)
+                )
+                if result.rowcount == 0:
+                    db.add(
+                        SchedulerLease(
+                            name=self.name,
+                            owner=self.owner,
+                            expires_at=expires_at,
+                            updated_at=now,
+                        )
+                    )
+                db.commit()
+            acquired = True
+        except IntegrityError:
+            # 租约已被其他实例持有
+            acquired = False
+        except SQLAlchemyError as exc:
+            _logger.warning("续约定时任务租约失败: %s", exc)
+            return self.is_leader()
+        self._set_state(started + self._lease.total_seconds() if acquired else None)
+        return acquired
+
+    def release(self) -> None:
+        """主动释放租约，便于其他实例立即接管。"""
+        if not self.is_leader():
+            return
+        try:
+            with SessionLocal() as db:
+                db.execute(
+                    update(SchedulerLease)
+                    .where(
+                        SchedulerLease.name == self.name,
+                        SchedulerLease.owner == self.owner,
+                    )
+                    # 置为已过期，其他实例下次续约即可接管
+                    .values(expires_at=_database_now(db) - self._lease)
+                )
+                db.commit()
+        except SQLAlchemyError as exc:
+            _logger.warning("释放定时任务租约失败: %s", exc)
+        self._set_state(None)
+
+    def _set_state(self, valid_until: float | None) -> None:
+        with self._lock:
+            was_leader = self._valid_until is not None
+            self._valid_until = valid_until
+        is_leader = valid_until is not None
+        set_scheduler_leader(self.name, is_leader)
+        if is_leader and not was_leader:
+            _logger.info("成为定时任务主节点: %s owner=%s", self.name, self.owner)
+        elif was_leader and not is_leader:
+            _logger.info("不再是定时任务主节点: %s owner=%s", self.name, self.owner)
+
+
+def _database_now(db: Session) -> datetime:
+    """读取数据库当前时间（无时区信息），作为各实例共同的租约时钟。"""
+    return db.execute(select(func.now())).scalar_one().replace(tzinfo=None)
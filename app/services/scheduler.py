@@ -1,58 +1,192 @@
 from __future__ import annotations
 
 import logging
+import time
+from typing import Callable
 
 from apscheduler.schedulers.background import BackgroundScheduler
+from sqlalchemy.exc import SQLAlchemyError
 
 from app.config import settings
 from app.db import SessionLocal
-from app.services.fund import fund_holding_service
-from app.time_utils import CST_TZ
+from app.metrics import observe_scheduler_job
+from app.models.db.models import SchedulerJobRun
+from app.services.fund import (
+    fund_holding_service,
+    fund_metrics_service,
+    fund_valuation_service,
+)
+from app.services.leader_election import LeaderElector
+from app.time_utils import CST_TZ, cst_now
 
 _logger = logging.getLogger(__name__)
 _scheduler: BackgroundScheduler | None = None
+_elector: LeaderElector | None = None
+_LEASE_NAME = "scheduler"
 
 
 def start_scheduler() -> None:
-    """启动定时任务。"""
-    global _scheduler
+    """启动定时任务；多实例部署时仅持有租约的主节点实际执行任务。"""
+    global _scheduler, _elector
     if not settings.scheduler_enabled:
         _logger.info("定时任务已禁用")
         return
     if _scheduler is not None:
         return
+    elector = LeaderElector(_LEASE_NAME, settings.scheduler_lease_seconds)
+    elector.acquire_or_renew()
     scheduler = BackgroundScheduler(timezone=CST_TZ)
     scheduler.add_job(
-        _confirm_pending_trades,
+        elector.acquire_or_renew,
+        "interval",
+        seconds=max(settings.scheduler_lease_seconds / 3, 1.0),
+        id="renew_scheduler_lease",
+        coalesce=True,
+        max_instances=1,
+        replace_existing=True,
+    )
+    scheduler.add_job(
+        _run_job,
         "cron",
+        args=["confirm_pending_trades", _confirm_pending_trades],
         hour=settings.scheduler_confirm_hour,
         minute=settings.scheduler_confirm_minute,
         id="confirm_pending_trades",
         replace_existing=True,
     )
+    scheduler.add_job(
+        _run_job,
+        "cron",
+        args=["snapshot_daily_values", _snapshot_daily_values],
+        hour=settings.scheduler_valuation_hour,
+        minute=settings.scheduler_valuation_minute,
+        id="snapshot_daily_values",
+        replace_existing=True,
+    )
+    scheduler.add_job(
+        _run_job,
+        "cron",
+        args=["refresh_fund_metrics", _refresh_fund_metrics],
+        day_of_week="mon-fri",
+        hour=settings.scheduler_metrics_hours,
+        minute=settings.scheduler_metrics_minute,
+        id="refresh_fund_metrics",
+        replace_existing=True,
+    )
     scheduler.start()
     _scheduler = scheduler
+    _elector = elector
     _logger.info("定时任务已启动")
 
 
 def stop_scheduler() -> None:
-    """停止定时任务。"""
-    global _scheduler
+    """停止定时任务并释放租约。"""
+    global _scheduler, _elector
     if _scheduler is None:
         return
     _scheduler.shutdown(wait=False)
     _scheduler = None
+    if _elector is not None:
+        _elector.release()
+        _elector = None
     _logger.info("定时任务已停止")
 
 
-def _confirm_pending_trades() -> None:
+def _run_job(job_id: str, func: Callable[[], int]) -> None:
+    """仅在主节点执行任务，并记录执行历史与耗时。"""
+    if _elector is None or not _elector.acquire_or_renew():
+        _logger.info("非定时任务主节点，跳过任务: %s", job_id)
+        return
+    run_id = _record_job_start(job_id, _elector.owner)
+    start_time = time.perf_counter()
+    status = "success"
+    count: int | None = None
+    error: str | None = None
+    try:
+        count = func()
+    except Exception as exc:
+        status = "failed"
+        error = f"{type(exc).__name__}: {exc}"
+        _logger.exception("定时任务执行失败: %s", job_id)
+    duration = time.perf_counter() - start_time
+    observe_scheduler_job(job_id, status, duration)
+    _record_job_finish(run_id, status, duration * 1000, count, error)
+    _logger.info(
+        "定时任务完成: %s status=%s count=%s duration_ms=%.2f",
+        job_id,
+        status,
+        count,
+        duration * 1000,
+    )
+
+
+def _record_job_start(job_id: str, owner: str) -> int | None:
+    try:
+        with SessionLocal() as db:
+            run = SchedulerJobRun(
+                job_id=job_id, owner=owner, status="running", started_at=cst_now()
+            )
+            db.add(run)
+            db.commit()
+            return run.id
+    except SQLAlchemyError as exc:
+        _logger.warning("写入定时任务执行记录失败: %s", exc)
+        return None
+
+
+def _record_job_finish(
+    run_id: int | None,
+    status: str,
+    duration_ms: float,
+    count: int | None,
+    error: str | None,
+) -> None:
+    if run_id is None:
+        return
+    try:
+        with SessionLocal() as db:
+            run = db.get(SchedulerJobRun, run_id)
+            if run is None:
+                return
+            run.status = status
+            run.finished_at = cst_now()
+            run.duration_ms = duration_ms
+            run.result_count = count
+            run.error = error
+            db.commit()
+    except SQLAlchemyError as exc:
+        _logger.warning("更新定时任务执行记录失败: %s", exc)
+
+
+def _confirm_pending_trades() -> int:
     """确认待确认交易。"""
     db = SessionLocal()
     try:
         count = fund_holding_service.confirm_pending_transactions(db)
         if count:
             _logger.info("确认待确认交易数量: %s", count)
-    except Exception as exc:
-        _logger.exception("确认待确认交易失败: %s", exc)
+        return count
+    finally:
+        db.close()
+
+
+def _snapshot_daily_values() -> int:
+    """生成持仓每日估值快照（净值发布后执行）。"""
+    db = SessionLocal()
+    try:
+        count = fund_valuation_service.snapshot_daily_values(db)
+        _logger.info("每日估值快照写入数量: %s", count)
+        return count
+    finally:
+        db.close()
+
+
+def _refresh_fund_metrics() -> int:
+    """重算出现新净值的基金业绩指标（净值发布时段内轮询）。"""
+    db = SessionLocal()
+    try:
+        count = fund_metrics_service.refresh_fund_metrics(db)
+        _logger.info("基金业绩指标重算数量: %s", count)
+        return count
     finally:
         db.close()
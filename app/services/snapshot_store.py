@@ -0,0 +1,59 @@
+"""本地快照：将基金列表、交易日历等变化缓慢的全量数据落盘，启动时直接加载。"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from app.config import settings
+
+_logger = logging.getLogger(__name__)
+
+
+class Snapshot(NamedTuple):
+    saved_at: float
+    data: Any
+
+    @property
+    def age_seconds(self) -> float:
+        return time.time() - self.saved_at
+
+
+def _snapshot_path(name: str) -> Path | None:
+    if not settings.snapshot_dir:
+        return None
+    return Path(settings.snapshot_dir) / f"{name}.json"
+
+
+def load_snapshot(name: str) -> Snapshot | None:
+    """读取快照，不存在或损坏时返回 None。"""
+    path = _snapshot_path(name)
+    if path is None or not path.exists():
+        return None
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+        return Snapshot(float(payload["saved_at"]), payload["data"])
+    except (OSError, ValueError, KeyError, TypeError) as exc:
+        _logger.warning("读取本地快照失败: %s, 错误: %s", path, exc)
+        return None
+
+
+def save_snapshot(name: str, data: Any) -> None:
+    """原子写入快照（先写临时文件再替换）。"""
+    path = _snapshot_path(name)
+    if path is None:
+        return
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(
+            json.dumps({"saved_at": time.time(), "data": data}, ensure_ascii=False),
+            encoding="utf-8",
+        )
+        os.replace(tmp_path, path)
+    except (OSError, TypeError, ValueError) as exc:
+        _logger.warning("写入本地快照失败: %s, 错误: %s", path, exc)
@@ -6,7 +6,10 @@ from urllib.parse import urlencode
 
 import httpx
 
+from app.circuit_breaker import CircuitBreaker
 from app.config import settings
+from app.exceptions import CircuitOpenError, UpstreamError
+from app.metrics import track_upstream
 from app.models.schemas import StockMarket, StockRealtimeQuoteResponse
 from app.services.cache import get_stock_quote_cache, set_stock_quote_cache
 from app.utils.parsing import parse_float
@@ -55,6 +58,7 @@ def _get_nowapi_config() -> tuple[str, str, str]:
 
 
 _nowapi_client: httpx.Client | None = None
+_nowapi_breaker = CircuitBreaker("nowapi")
 
 
 def _get_nowapi_client() -> httpx.Client:
@@ -63,7 +67,7 @@ def _get_nowapi_client() -> httpx.Client:
     if _nowapi_client is not None:
         return _nowapi_client
     _nowapi_client = httpx.Client(
-        timeout=8.0,
+        timeout=settings.nowapi_timeout_seconds,
         limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
     )
     return _nowapi_client
@@ -91,9 +95,21 @@ def _request_nowapi(symbol: str) -> dict[str, Any]:
     )
     url = f"{base_url}/?{query}"
     client = _get_nowapi_client()
-    response = client.get(url)
-    response.raise_for_status()
-    return response.json()
+    if not _nowapi_breaker.allow():
+        raise CircuitOpenError("NowAPI 熔断中，暂不请求")
+    try:
+        with track_upstream("nowapi", "finance.stock_realtime"):
+            response = client.get(url)
+            response.raise_for_status()
+            payload = response.json()
+    except httpx.HTTPError as exc:
+        _nowapi_breaker.record_failure()
+        raise UpstreamError(f"NowAPI 请求失败: {exc}") from exc
+    except Exception:
+        _nowapi_breaker.record_failure()
+        raise
+    _nowapi_breaker.record_success()
+    return payload
 
 
 def _extract_nowapi_quote(payload: dict[str, Any]) -> tuple[float | None, float | None]:
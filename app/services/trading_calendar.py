@@ -1,12 +1,25 @@
 from __future__ import annotations
 
+import logging
+import threading
 from datetime import date as dt_date
-from typing import Iterable
+from datetime import timedelta
+from typing import TYPE_CHECKING, Iterable
 
-import akshare as ak
-import pandas as pd
+from app.services import akshare_adapter
+from app.services.snapshot_store import load_snapshot, save_snapshot
+from app.utils.lazy_import import lazy_import
 
+if TYPE_CHECKING:
+    import pandas as pd
+else:
+    pd = lazy_import("pandas")
+
+_SNAPSHOT_NAME = "trade_calendar"
+_SNAPSHOT_MAX_AGE = timedelta(days=1)
 _trade_dates: set[dt_date] | None = None
+_load_lock = threading.Lock()
+_logger = logging.getLogger(__name__)
 
 
 def is_trading_day(date_value: dt_date) -> bool:
@@ -17,19 +30,66 @@ def is_trading_day(date_value: dt_date) -> bool:
     return date_value in trade_dates
 
 
+def trading_days_between(start: dt_date, end: dt_date) -> list[dt_date]:
+    """返回区间内的交易日（含首尾，升序）；交易日历不可用时按工作日计。"""
+    trade_dates = _get_trade_dates()
+    if not trade_dates:
+        return [value.date() for value in pd.bdate_range(start, end)]
+    return sorted(value for value in trade_dates if start <= value <= end)
+
+
+def last_trading_day(date_value: dt_date) -> dt_date:
+    """返回不晚于给定日期的最近一个交易日。"""
+    for offset in range(30):
+        candidate = date_value - timedelta(days=offset)
+        if is_trading_day(candidate):
+            return candidate
+    return date_value
+
+
+def load_trade_calendar() -> None:
+    """预加载交易日历（启动预热使用）。"""
+    _get_trade_dates()
+
+
 def _get_trade_dates() -> set[dt_date]:
     global _trade_dates
     if _trade_dates is None:
-        _trade_dates = _load_trade_dates()
+        with _load_lock:
+            if _trade_dates is None:
+                _trade_dates = _load_trade_dates()
     return _trade_dates
 
 
 def _load_trade_dates() -> set[dt_date]:
-    trade_df = ak.tool_trade_date_hist_sina()
+    """优先读取本地快照，快照过旧时在后台刷新。"""
+    snapshot = load_snapshot(_SNAPSHOT_NAME)
+    if snapshot is None or not isinstance(snapshot.data, list):
+        return _fetch_trade_dates()
+    if snapshot.age_seconds >= _SNAPSHOT_MAX_AGE.total_seconds():
+        threading.Thread(target=_refresh_trade_dates, daemon=True).start()
+    return {dt_date.fromisoformat(value) for value in snapshot.data}
+
+
+def _fetch_trade_dates() -> set[dt_date]:
+    trade_df = akshare_adapter.tool_trade_date_hist_sina()
     if trade_df.empty:
         return set()
     date_series = _extract_trade_date_series(trade_df)
-    return {value.date() for value in pd.to_datetime(date_series)}
+    trade_dates = {value.date() for value in pd.to_datetime(date_series)}
+    save_snapshot(_SNAPSHOT_NAME, sorted(value.isoformat() for value in trade_dates))
+    return trade_dates
+
+
+def _refresh_trade_dates() -> None:
+    global _trade_dates
+    try:
+        trade_dates = _fetch_trade_dates()
+    except Exception as exc:
+        _logger.warning("刷新交易日历失败: %s", exc)
+        return
+    if trade_dates:
+        _trade_dates = trade_dates
 
 
 def _extract_trade_date_series(trade_df: pd.DataFrame) -> Iterable[str]:
@@ -0,0 +1,158 @@
+"""启动缓存预热：按实际持仓的基金代码并行预取，受并发上限与总时间预算约束。
+
+先加载基金列表与交易日历，再对 `fund_holdings` 中出现的每只基金预取基金快照
+（基本信息、最新净值与持仓）与实时估值（含成分股行情）。仅主 worker 执行预热，
+进度写入同主机共享的状态文件，供各 worker 的就绪检查读取。
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.config import settings
+from app.db import SessionLocal
+from app.metrics import set_warmup_progress
+from app.models.db.models import FundHolding
+from app.services.cache import warm_up_cache
+from app.services.fund import fund_service
+from app.worker_lock import read_primary_pid, shared_state_path
+
+_logger = logging.getLogger(__name__)
+_STATE_NAME = "warmup"
+_FINISHED_STATUSES = ("completed", "timeout", "failed", "disabled")
+
+_state: dict[str, Any] = {"status": "pending"}
+_state_lock = threading.Lock()
+
+
+def _update_state(publish: bool = False, **changes: Any) -> None:
+    with _state_lock:
+        _state.update(changes)
+        snapshot = dict(_state)
+    set_warmup_progress(
+        snapshot.get("total", 0),
+        snapshot.get("completed", 0),
+        snapshot.get("failed", 0),
+        snapshot["status"] in _FINISHED_STATUSES,
+    )
+    if publish:
+        _publish_state(snapshot)
+
+
+def _publish_state(snapshot: dict[str, Any]) -> None:
+    path = shared_state_path(_STATE_NAME)
+    try:
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps({**snapshot, "pid": os.getpid()}), "utf-8")
+        os.replace(tmp_path, path)
+    except OSError as exc:
+        _logger.warning("写入预热状态失败: %s", exc)
+
+
+def get_warmup_state() -> dict[str, Any]:
+    """返回预热状态；非主 worker 读取主 worker 发布的状态。"""
+    with _state_lock:
+        if _state["status"] != "pending":
+            return dict(_state)
+    try:
+        published = json.loads(shared_state_path(_STATE_NAME).read_text("utf-8"))
+    except (OSError, ValueError):
+        return {"status": "pending"}
+    if published.get("pid") != read_primary_pid():
+        # 上一次启动遗留的状态
+        return {"status": "pending"}
+    return published
+
+
+def is_ready() -> bool:
+    return get_warmup_state()["status"] in _FINISHED_STATUSES
+
+
+def _load_fund_codes() -> list[str]:
+    with SessionLocal() as db:
+        rows = db.execute(
+            select(FundHolding.fund_code).where(FundHolding.total_shares > 0).distinct()
+        ).all()
+    return sorted(str(row[0]) for row in rows)
+
+
+def _prefetch(code: str) -> None:
+    fund_service.prefetch_fund_data(code)
+
+
+def run_warmup() -> None:
+    """执行预热（阻塞，直到完成或超出时间预算）。"""
+    budget = settings.cache_warmup_budget_seconds
+    deadline = time.monotonic() + budget
+    started_at = time.time()
+    _update_state(publish=True, status="running", started_at=started_at)
+
+    warm_up_cache(timeout=budget)
+    try:
+        codes = _load_fund_codes()
+    except SQLAlchemyError as exc:
+        _logger.warning("读取持仓基金代码失败: %s", exc)
+        codes = []
+    _update_state(total=len(codes), completed=0, failed=0)
+
+    completed = failed = 0
+    executor = ThreadPoolExecutor(
+        max_workers=max(settings.cache_warmup_concurrency, 1),
+        thread_name_prefix="warmup",
+    )
+    pending = {executor.submit(_prefetch, code): code for code in codes}
+    try:
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                code = pending.pop(future)
+                try:
+                    future.result()
+                    completed += 1
+                except Exception as exc:
+                    failed += 1
+                    _logger.warning("基金预热失败: %s, 错误: %s", code, exc)
+            _update_state(completed=completed, failed=failed)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    status = "timeout" if pending else "completed"
+    duration = time.time() - started_at
+    _update_state(publish=True, status=status, finished_at=time.time())
+    _logger.info(
+        "缓存预热结束 status=%s funds=%s completed=%s failed=%s duration_s=%.2f",
+        status,
+        len(codes),
+        completed,
+        failed,
+        duration,
+    )
+
+
+def start_warmup() -> None:
+    """在后台线程中启动预热；未启用时直接标记为就绪。"""
+    if not settings.cache_warmup_enabled:
+        _update_state(publish=True, status="disabled")
+        return
+    _update_state(publish=True, status="running", started_at=time.time())
+    threading.Thread(target=_run_safely, name="cache-warmup", daemon=True).start()
+
+
+def _run_safely() -> None:
+    try:
+        run_warmup()
+    except Exception:
+        _logger.exception("缓存预热异常")
+        _update_state(publish=True, status="failed", finished_at=time.time())
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from app.utils.lazy_import import lazy_import
+
+if TYPE_CHECKING:
+    import numpy as np
+else:
+    np = lazy_import("numpy")
+
+
+def minmax_downsample_indices(values: np.ndarray, max_points: int) -> np.ndarray:
+    """按桶保留最小值与最大值点的降采样，返回升序的保留下标。
+
+    首尾点始终保留，中间点均分为 `(max_points - 2) // 2` 个桶，每桶取最小、
+    最大各一个点，保证折线的峰谷形状不丢失；结果不超过 `max_points`（至少为 2）个点。
+    NaN 不参与极值选择（整桶为 NaN 时任取一点）。
+    """
+    values = np.asarray(values, dtype=float)
+    size = values.size
+    if size <= max_points:
+        return np.arange(size)
+    buckets = (max_points - 2) // 2
+    if buckets < 1:
+        return np.array([0, size - 1])
+
+    interior = values[1:-1]
+    edges = np.linspace(0, interior.size, buckets + 1).astype(np.int64)
+    bucket_ids = np.searchsorted(edges, np.arange(interior.size), side="right") - 1
+    starts = edges[:-1]
+
+    # 按 (桶, 值) 排序后每桶首个即最小值；对取负值排序得到最大值，NaN 均排在桶末
+    lowest = np.lexsort((interior, bucket_ids))[starts]
+    highest = np.lexsort((-interior, bucket_ids))[starts]
+    return np.unique(np.concatenate(([0], lowest + 1, highest + 1, [size - 1])))
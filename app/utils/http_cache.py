@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import gzip
+import threading
+from collections import OrderedDict
+
+import brotli
+from fastapi import Request, Response
+
+_COMPRESS_MIN_BYTES = 1024
+_COMPRESSED_MAX_ENTRIES = 256
+_compressed: OrderedDict[tuple[str, str], bytes] = OrderedDict()
+_compressed_lock = threading.Lock()
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """判断 `If-None-Match` 是否命中给定 ETag（按弱比较，支持 `*` 与多个值）。"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
+
+
+def _negotiate_encoding(accept_encoding: str | None) -> str | None:
+    """按 `Accept-Encoding` 选择压缩方式，优先 br，其次 gzip。"""
+    if not accept_encoding:
+        return None
+    accepted: set[str] = set()
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = params.strip().removeprefix("q=")
+        if params and quality.replace(".", "", 1).isdigit() and float(quality) == 0:
+            continue
+        accepted.add(name.strip().lower())
+    if "br" in accepted or "*" in accepted:
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+def _compress(body: bytes, etag: str, encoding: str) -> bytes:
+    """压缩响应体；同一 ETag 的压缩结果在进程内复用。"""
+    key = (etag, encoding)
+    with _compressed_lock:
+        cached = _compressed.get(key)
+        if cached is not None:
+            _compressed.move_to_end(key)
+            return cached
+    if encoding == "br":
+        compressed = brotli.compress(body, quality=5)
+    else:
+        compressed = gzip.compress(body, compresslevel=6, mtime=0)
+    with _compressed_lock:
+        _compressed[key] = compressed
+        while len(_compressed) > _COMPRESSED_MAX_ENTRIES:
+            _compressed.popitem(last=False)
+    return compressed
+
+
+def conditional_json_response(
+    request: Request,
+    body: bytes,
+    etag: str,
+    max_age: int,
+    private: bool = False,
+) -> Response:
+    """返回带 ETag 与 Cache-Control 的 JSON 响应，客户端缓存仍有效时返回 304。
+
+    响应体较大且客户端支持时按 br/gzip 压缩，压缩后的表示使用带编码后缀的 ETag。
+    """
+    scope = "private" if private else "public"
+    headers = {
+        "Cache-Control": f"{scope}, max-age={max_age}",
+        "Vary": "Accept-Encoding",
+    }
+    encoding = None
+    if len(body) >= _COMPRESS_MIN_BYTES:
+        encoding = _negotiate_encoding(request.headers.get("accept-encoding"))
+    if encoding is not None:
+        etag = f'{etag[:-1]}-{encoding}"'
+    headers["ETag"] = etag
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+        body = _compress(body, etag, encoding)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -1,15 +1,14 @@
 from __future__ import annotations
 
+import math
 from typing import Any
 
-import pandas as pd
-
 
 def parse_float(value: Any) -> float | None:
     """解析浮点数，无法解析时返回 None。"""
     if value in (None, ""):
         return None
-    if isinstance(value, float) and pd.isna(value):
+    if isinstance(value, float) and math.isnan(value):
         return None
     try:
         return float(str(value).replace(",", "").strip())
@@ -21,7 +20,7 @@ def parse_percent(value: Any) -> float | None:
     """解析百分比数值，支持带 % 的字符串。"""
     if value is None:
         return None
-    if isinstance(value, float) and pd.isna(value):
+    if isinstance(value, float) and math.isnan(value):
         return None
     if isinstance(value, (int, float)):
         return float(value)
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING
+
+from app.utils.lazy_import import lazy_import
+
+if TYPE_CHECKING:
+    import numpy as np
+else:
+    np = lazy_import("numpy")
+
+TRADING_DAYS_PER_YEAR = 252
+_DAYS_PER_YEAR = 365.0
+
+
+def xirr(
+    amounts: np.ndarray,
+    dates: np.ndarray,
+    guess: float = 0.1,
+    tol: float = 1e-10,
+    max_iter: int = 100,
+) -> float | None:
+    """计算资金加权收益率（年化，小数）。
+
+    `amounts` 以投资者视角计：投入为负、取回（含期末市值）为正。
+    先用牛顿法迭代，不收敛时回退到二分法；无解时返回 None。
+    """
+    amounts = np.asarray(amounts, dtype=float)
+    if amounts.size < 2 or not (np.any(amounts > 0) and np.any(amounts < 0)):
+        return None
+    dates = np.asarray(dates, dtype="datetime64[D]")
+    years = (dates - dates.min()).astype(float) / _DAYS_PER_YEAR
+
+    rate = guess
+    for _ in range(max_iter):
+        base = 1.0 + rate
+        if base <= 0:
+            break
+        discount = base**-years
+        npv = np.dot(amounts, discount)
+        derivative = np.dot(-years * amounts, discount / base)
+        if derivative == 0 or not math.isfinite(derivative):
+            break
+        step = npv / derivative
+        rate -= step
+        if abs(step) < tol:
+            return float(rate) if math.isfinite(rate) else None
+    return _xirr_bisect(amounts, years, tol)
+
+
+def _xirr_bisect(amounts: np.ndarray, years: np.ndarray, tol: float) -> float | None:
+    def _npv(rate: float) -> float:
+        return float(np.dot(amounts, (1.0 + rate) ** -years))
+
+    low, high = -0.9999, 1.0
+    npv_low = _npv(low)
+    while _npv(high) * npv_low > 0:
+        high *= 2
+        if high > 1e6:
+            return None
+    for _ in range(200):
+        mid = (low + high) / 2
+        npv_mid = _npv(mid)
+        if abs(npv_mid) < tol or high - low < tol:
+            return mid
+        if npv_mid * npv_low < 0:
+            high = mid
+        else:
+            low, npv_low = mid, npv_mid
+    return (low + high) / 2
+
+
+def period_returns(values: np.ndarray, flows: np.ndarray) -> np.ndarray:
+    """剔除外部现金流后的逐期收益率：r_t = (V_t - F_t) / V_{t-1} - 1。
+
+    `flows` 为当期净流入（买入为正、卖出为负）；上期市值为 0 的期间记为 NaN。
+    """
+    values = np.asarray(values, dtype=float)
+    flows = np.asarray(flows, dtype=float)
+    if values.size < 2:
+        return np.empty(0)
+    previous = values[:-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = (values[1:] - flows[1:]) / previous - 1.0
+    return np.where(previous > 0, returns, np.nan)
+
+
+def time_weighted_return(returns: np.ndarray) -> float | None:
+    """时间加权收益率（累计，小数）。"""
+    returns = np.asarray(returns, dtype=float)
+    valid = returns[~np.isnan(returns)]
+    if valid.size == 0:
+        return None
+    return float(np.prod(1.0 + valid) - 1.0)
+
+
+def annualize_return(total_return: float | None, periods: int) -> float | None:
+    """按交易日数年化累计收益率。"""
+    if total_return is None or periods <= 0 or total_return <= -1:
+        return None
+    return float((1.0 + total_return) ** (TRADING_DAYS_PER_YEAR / periods) - 1.0)
+
+
+def max_drawdown(returns: np.ndarray) -> float | None:
+    """基于收益率序列构造净值指数并计算最大回撤（正数，小数）。"""
+    returns = np.asarray(returns, dtype=float)
+    if returns.size == 0:
+        return None
+    index = np.cumprod(1.0 + np.nan_to_num(returns))
+    peaks = np.maximum.accumulate(np.maximum(index, 1.0))
+    return float(np.max(1.0 - index / peaks))
+
+
+def annualized_volatility(
+    returns: np.ndarray,
+    periods_per_year: int = TRADING_DAYS_PER_YEAR,
+) -> float | None:
+    """年化波动率（小数）。"""
+    returns = np.asarray(returns, dtype=float)
+    valid = returns[~np.isnan(returns)]
+    if valid.size < 2:
+        return None
+    return float(np.std(valid, ddof=1) * math.sqrt(periods_per_year))
@@ -0,0 +1,91 @@
+"""同一主机上多个 worker 进程之间的文件锁。
+
+- `acquire_primary_worker`：非阻塞抢占主 worker 锁，进程存活期间持有，
+  主 worker 负责定时任务与缓存预热；
+- `exclusive`：阻塞式互斥，用于串行执行启动阶段的数据库迁移等操作。
+
+锁文件位于日志目录下；不支持 `fcntl` 的平台视为单进程部署。
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Iterator
+
+from app.config import settings
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+_logger = logging.getLogger(__name__)
+_primary_handle: IO[str] | None = None
+
+
+def _lock_path(name: str) -> Path:
+    lock_dir = Path(settings.log_file).parent / "locks"
+    lock_dir.mkdir(parents=True, exist_ok=True)
+    return lock_dir / f"{name}.lock"
+
+
+def shared_state_path(name: str) -> Path:
+    """同一主机各 worker 共享的状态文件路径。"""
+    return _lock_path(name).with_suffix(".json")
+
+
+def read_primary_pid() -> int | None:
+    """读取当前主 worker 的进程号。"""
+    try:
+        return int(_lock_path("primary").read_text(encoding="utf-8").strip())
+    except (OSError, ValueError):
+        return None
+
+
+def acquire_primary_worker() -> bool:
+    """尝试成为主 worker，成功后持有锁直到进程退出或调用 `release_primary_worker`。"""
+    global _primary_handle
+    if _primary_handle is not None:
+        return True
+    if fcntl is None:
+        return True
+    handle = open(_lock_path("primary"), "a+", encoding="utf-8")
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return False
+    handle.seek(0)
+    handle.truncate()
+    handle.write(str(os.getpid()))
+    handle.flush()
+    _primary_handle = handle
+    _logger.info("当前进程为主 worker: pid=%s", os.getpid())
+    return True
+
+
+def release_primary_worker() -> None:
+    global _primary_handle
+    if _primary_handle is None:
+        return
+    if fcntl is not None:
+        fcntl.flock(_primary_handle, fcntl.LOCK_UN)
+    _primary_handle.close()
+    _primary_handle = None
+
+
+@contextmanager
+def exclusive(name: str) -> Iterator[None]:
+    """阻塞式获取同名文件锁。"""
+    if fcntl is None:
+        yield
+        return
+    with open(_lock_path(name), "a+", encoding="utf-8") as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
@@ -0,0 +1,169 @@
+"""实时估值缓存命中的单次 CPU 开销：对比旧路径与预序列化字节路径。
+
+- `legacy`：解析基金代码（读取基金列表缓存）→ 读取缓存 JSON → `json.loads`
+  → 构造 `FundRealtimeEstimateResponse`，再由 FastAPI 按 `response_model`
+  校验并序列化（即改动前的实现）；
+- `bytes`：按基金代码直接读取缓存中的最终响应 JSON，作为 `Response` 返回。
+
+每个模式分别测量服务层（得到响应体字节）与完整 HTTP 请求（进程内 ASGI），
+以 `time.process_time` 统计 CPU 时间。基于回放 fixtures，不访问上游。
+
+用法：python -m benchmarks.bench_estimate_hit --requests 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+_WORK_DIR = Path(tempfile.mkdtemp(prefix="bench-estimate-"))
+os.environ["DATABASE_URL"] = f"sqlite:///{_WORK_DIR / 'bench.db'}"
+os.environ.setdefault("CACHE_WARMUP_ENABLED", "false")
+os.environ.setdefault("SCHEDULER_ENABLED", "false")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("LOG_REQUEST_SAMPLE_RATE", "0")
+os.environ.setdefault("AKSHARE_RATE_LIMIT_PER_SECOND", "0")
+os.environ["LOG_FILE"] = str(_WORK_DIR / "app.log")
+
+import httpx  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_model_field  # noqa: E402
+
+from app.db import init_db  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.schemas import FundRealtimeEstimateResponse  # noqa: E402
+from app.services import cache  # noqa: E402
+from app.services.fund import fund_service  # noqa: E402
+from benchmarks.fixtures import (  # noqa: E402
+    AKSHARE_FIXTURE,
+    DEFAULT_FIXTURE_DIR,
+    install_replay,
+    synthesize_fixtures,
+)
+
+_LEGACY_PATH = "/__bench/legacy-estimate/{code}"
+_RESPONSE_FIELD = create_model_field(
+    "Response_legacy", FundRealtimeEstimateResponse, mode="serialization"
+)
+
+
+def _legacy_estimate(code: str) -> FundRealtimeEstimateResponse:
+    meta = fund_service._resolve_fund_by_code(code)
+    key = cache._build_cache_key(cache.FUND_ESTIMATE_CACHE_PREFIX, meta["code"])
+    return FundRealtimeEstimateResponse(**json.loads(cache._read_payload(key)))
+
+
+async def _legacy_body(code: str) -> bytes:
+    content = await serialize_response(
+        field=_RESPONSE_FIELD, response_content=_legacy_estimate(code)
+    )
+    return JSONResponse(content).body
+
+
+async def _bytes_body(code: str) -> bytes:
+    return fund_service.get_fund_realtime_estimate_json(code)
+
+
+async def _cpu_per_call_us(func: Callable[[], Awaitable[Any]], requests: int) -> float:
+    await func()
+    started = time.process_time()
+    for _ in range(requests):
+        await func()
+    return (time.process_time() - started) / requests * 1_000_000
+
+
+async def _http_cpu_per_request_us(path: str, requests: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        (await client.get(path)).raise_for_status()
+        started = time.process_time()
+        for _ in range(requests):
+            (await client.get(path)).raise_for_status()
+        return (time.process_time() - started) / requests * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--fixtures", type=Path, default=DEFAULT_FIXTURE_DIR)
+    parser.add_argument("--requests", type=int, default=2_000)
+    args = parser.parse_args()
+
+    fixture_dir = args.fixtures
+    if not (fixture_dir / AKSHARE_FIXTURE).exists():
+        fixture_dir = _WORK_DIR / "fixtures"
+        synthesize_fixtures(fixture_dir)
+    replay, _ = install_replay(fixture_dir)
+    init_db()
+    code = next(
+        code for code in replay.fund_codes if "货币型" not in replay.fund_type(code)
+    )
+    app.add_api_route(
+        _LEGACY_PATH,
+        _legacy_estimate,
+        response_model=FundRealtimeEstimateResponse,
+        include_in_schema=False,
+    )
+
+    # 预热缓存，之后各模式均为命中
+    body = fund_service.get_fund_realtime_estimate_json(code)
+    holdings = len(json.loads(body)["holdings"])
+    assert asyncio.run(_legacy_body(code)) == body
+
+    service = {
+        "legacy": asyncio.run(
+            _cpu_per_call_us(lambda: _legacy_body(code), args.requests)
+        ),
+        "bytes": asyncio.run(
+            _cpu_per_call_us(lambda: _bytes_body(code), args.requests)
+        ),
+    }
+    http = {
+        "legacy": asyncio.run(
+            _http_cpu_per_request_us(_LEGACY_PATH.format(code=code), args.requests)
+        ),
+        "bytes": asyncio.run(
+            _http_cpu_per_request_us(f"/funds/{code}/realtime-estimate", args.requests)
+        ),
+    }
+    results = [
+        {"layer": layer, "mode": mode, "cpu_us_per_hit": round(value, 1)}
+        for layer, values in (("service", service), ("http", http))
+        for mode, value in values.items()
+    ]
+    for item in results:
+        print(
+            f"{item['layer']:<8} {item['mode']:<7} {item['cpu_us_per_hit']:>10.1f} us",
+            file=sys.stderr,
+        )
+    print(
+        json.dumps(
+            {
+                "benchmark": "estimate_cache_hit",
+                "requests": args.requests,
+                "holdings": holdings,
+                "response_bytes": len(body),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "results": results,
+            },
+            ensure_ascii=False,
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
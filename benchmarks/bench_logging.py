@@ -0,0 +1,116 @@
+"""请求日志基准：对比不记录、同步写文件、队列异步写与采样记录下的吞吐量。
+
+在进程内通过 ASGI 直接驱动应用与请求中间件，日志写入临时目录。
+
+用法：python -m benchmarks.bench_logging --requests 5000 --concurrency 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+
+_LOG_DIR = Path(tempfile.mkdtemp(prefix="bench-logging-"))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("CACHE_WARMUP_ENABLED", "false")
+os.environ.setdefault("SCHEDULER_ENABLED", "false")
+os.environ["LOG_FILE"] = str(_LOG_DIR / "app.log")
+
+import httpx  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.logging_config import (  # noqa: E402
+    get_dropped_log_count,
+    setup_logging,
+    shutdown_logging,
+)
+from app.main import app  # noqa: E402
+
+_BENCH_PATH = "/__bench/ping"
+
+# (名称, 队列大小, 请求日志采样率)，采样率为 0 时仅记录错误与慢请求
+_MODES = (
+    ("disabled", 0, 0.0),
+    ("sync", 0, 1.0),
+    ("queue", 10_000, 1.0),
+    ("queue_sampled_10pct", 10_000, 0.1),
+)
+
+
+async def _ping() -> dict[str, bool]:
+    return {"ok": True}
+
+
+async def _drive(requests: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _one() -> None:
+            async with semaphore:
+                response = await client.get(_BENCH_PATH)
+                response.raise_for_status()
+
+        await _one()
+        started = time.perf_counter()
+        await asyncio.gather(*(_one() for _ in range(requests)))
+        return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5_000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    app.add_api_route(_BENCH_PATH, _ping, include_in_schema=False)
+    # 客户端自身的请求日志不计入对比
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    results = []
+    for name, queue_size, sample_rate in _MODES:
+        setup_logging(
+            log_file=settings.log_file,
+            log_level="INFO",
+            max_bytes=settings.log_max_bytes,
+            backup_count=settings.log_backup_count,
+            enable_console=False,
+            queue_size=queue_size,
+        )
+        settings.log_request_sample_rate = sample_rate
+        elapsed = asyncio.run(_drive(args.requests, args.concurrency))
+        dropped = get_dropped_log_count()
+        shutdown_logging()
+        results.append(
+            {
+                "mode": name,
+                "requests_per_second": round(args.requests / elapsed, 1),
+                "mean_latency_ms": round(elapsed / args.requests * 1000, 3),
+                "dropped_records": dropped,
+            }
+        )
+
+    print(
+        json.dumps(
+            {
+                "benchmark": "request_logging",
+                "requests": args.requests,
+                "concurrency": args.concurrency,
+                "log_dir": str(_LOG_DIR),
+                "results": results,
+            },
+            ensure_ascii=False,
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
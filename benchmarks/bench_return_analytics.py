@@ -0,0 +1,162 @@
+"""收益分析基准：合成账本上对比向量化实现与逐行循环实现。
+
+用法：python -m benchmarks.bench_return_analytics --transactions 10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import time
+from datetime import date
+
+import numpy as np
+
+from app.utils.returns import (
+    annualized_volatility,
+    max_drawdown,
+    period_returns,
+    time_weighted_return,
+    xirr,
+)
+
+
+def build_ledger(
+    transactions: int,
+    days: int,
+    seed: int = 7,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """生成合成账本：交易日期/净流入与每日市值序列。"""
+    rng = np.random.default_rng(seed)
+    start = np.datetime64(date(2012, 1, 4), "D")
+    value_dates = start + np.arange(days)
+    navs = np.cumprod(1.0 + rng.normal(0.0003, 0.012, days))
+
+    flow_days = np.sort(rng.integers(0, days, transactions))
+    flows = rng.uniform(100, 5000, transactions)
+    sells = rng.random(transactions) < 0.3
+    flows[sells] *= -0.5
+    flows[0] = abs(flows[0])
+
+    net_by_day = np.bincount(flow_days, weights=flows, minlength=days)
+    shares = np.cumsum(net_by_day / navs)
+    shares = np.maximum(shares, 0.0)
+    values = shares * navs
+    return value_dates[flow_days], flows, value_dates, values
+
+
+def analytics_vectorized(
+    flow_dates: np.ndarray,
+    flows: np.ndarray,
+    value_dates: np.ndarray,
+    values: np.ndarray,
+) -> dict[str, float | None]:
+    positions = np.searchsorted(value_dates, flow_dates, side="left")
+    aligned = np.bincount(positions, weights=flows, minlength=values.size)
+    returns = period_returns(values, aligned)
+    return {
+        "xirr": xirr(
+            np.append(-flows, values[-1]), np.append(flow_dates, value_dates[-1])
+        ),
+        "twr": time_weighted_return(returns),
+        "max_drawdown": max_drawdown(returns),
+        "volatility": annualized_volatility(returns),
+    }
+
+
+def analytics_loop(
+    flow_dates: np.ndarray,
+    flows: np.ndarray,
+    value_dates: np.ndarray,
+    values: np.ndarray,
+) -> dict[str, float | None]:
+    """逐行 Python 循环的参考实现，用于对比。"""
+    date_list = [d.astype(object) for d in value_dates]
+    value_list = [float(v) for v in values]
+    flow_by_date: dict[date, float] = {}
+    for flow_date, amount in zip(flow_dates, flows):
+        key = flow_date.astype(object)
+        flow_by_date[key] = flow_by_date.get(key, 0.0) + float(amount)
+
+    returns: list[float] = []
+    for i in range(1, len(value_list)):
+        previous = value_list[i - 1]
+        if previous <= 0:
+            continue
+        flow = flow_by_date.get(date_list[i], 0.0)
+        returns.append((value_list[i] - flow) / previous - 1.0)
+
+    index, peak, worst, growth = 1.0, 1.0, 0.0, 1.0
+    for r in returns:
+        index *= 1.0 + r
+        growth *= 1.0 + r
+        peak = max(peak, index)
+        worst = max(worst, 1.0 - index / peak)
+    mean = sum(returns) / len(returns)
+    variance = sum((r - mean) ** 2 for r in returns) / (len(returns) - 1)
+
+    cash = [(d.astype(object), -float(a)) for d, a in zip(flow_dates, flows)]
+    cash.append((date_list[-1], value_list[-1]))
+    first = min(d for d, _ in cash)
+    rate = 0.1
+    for _ in range(100):
+        npv = 0.0
+        derivative = 0.0
+        for d, amount in cash:
+            years = (d - first).days / 365.0
+            npv += amount / (1 + rate) ** years
+            derivative -= years * amount / (1 + rate) ** (years + 1)
+        step = npv / derivative
+        rate -= step
+        if abs(step) < 1e-10:
+            break
+
+    return {
+        "xirr": rate,
+        "twr": growth - 1.0,
+        "max_drawdown": worst,
+        "volatility": math.sqrt(variance) * math.sqrt(252),
+    }
+
+
+def _best_of(fn, repeat: int, *args) -> tuple[float, dict]:
+    best = math.inf
+    result: dict = {}
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - started)
+    return best * 1000, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--transactions", type=int, default=10_000)
+    parser.add_argument("--days", type=int, default=3_650)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    ledger = build_ledger(args.transactions, args.days)
+    vector_ms, vector_result = _best_of(analytics_vectorized, args.repeat, *ledger)
+    loop_ms, loop_result = _best_of(analytics_loop, args.repeat, *ledger)
+    print(
+        json.dumps(
+            {
+                "benchmark": "return_analytics",
+                "transactions": args.transactions,
+                "days": args.days,
+                "vectorized_ms": round(vector_ms, 3),
+                "loop_ms": round(loop_ms, 3),
+                "speedup": round(loop_ms / vector_ms, 1),
+                "vectorized": vector_result,
+                "loop": loop_result,
+            },
+            ensure_ascii=False,
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""服务层热点路径基准：基于回放 fixtures，不访问真实 akshare/NowAPI/Redis。
+
+规模参数 `--sizes` 中的每个 n 对应：
+- 基金列表 100·n 行、净值序列 250·n 行；
+- 账户持仓 n 只基金；
+- 待确认交易 10·n 笔。
+
+每个用例分别测量冷缓存（每轮清空回放 Redis）与热缓存，输出 JSON 结果；
+指定 `--baseline` 时与基线比较，耗时中位数超过阈值倍数即视为回退并以非零状态退出。
+
+用法：
+    python -m benchmarks.bench_services --sizes 1,10,50 --latency-ms 0
+    python -m benchmarks.bench_services --baseline benchmarks/baseline.json
+    python -m benchmarks.bench_services --update-baseline benchmarks/baseline.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable
+
+_WORK_DIR = Path(tempfile.mkdtemp(prefix="bench-services-"))
+os.environ["DATABASE_URL"] = f"sqlite:///{_WORK_DIR / 'bench.db'}"
+os.environ.setdefault("CACHE_WARMUP_ENABLED", "false")
+os.environ.setdefault("SCHEDULER_ENABLED", "false")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+# 基准关注服务层自身开销，默认关闭 akshare 限速
+os.environ.setdefault("AKSHARE_RATE_LIMIT_PER_SECOND", "0")
+os.environ["LOG_FILE"] = str(_WORK_DIR / "app.log")
+
+from benchmarks.fixtures import (  # noqa: E402
+    AKSHARE_FIXTURE,
+    DEFAULT_FIXTURE_DIR,
+    install_replay,
+    synthesize_fixtures,
+)
+from benchmarks.regression import compare_with_baseline  # noqa: E402
+
+from app.db import SessionLocal, init_db  # noqa: E402
+from app.models.db.models import (  # noqa: E402
+    FundAccount,
+    FundHolding,
+    FundTransaction,
+)
+from app.models.enums import FundTradeStatus, FundTradeType  # noqa: E402
+from app.models.schemas import FundNavHistoryPeriod  # noqa: E402
+from app.services.fund import (  # noqa: E402
+    fund_account_service,
+    fund_holding_service,
+    fund_service,
+)
+
+_MONEY_FUND_TYPE = "货币型"
+
+
+class _Case:
+    def __init__(
+        self,
+        name: str,
+        run: Callable[[], Any],
+        setup: Callable[[], None] | None = None,
+        modes: tuple[str, ...] = ("cold", "warm"),
+    ) -> None:
+        self.name = name
+        self.run = run
+        self.setup = setup
+        self.modes = modes
+
+
+def _measure(case: _Case, mode: str, repeat: int, flush: Callable[[], None]) -> dict:
+    timings: list[float] = []
+    if mode == "warm" and case.setup is None:
+        case.run()
+    for _ in range(repeat):
+        if case.setup is not None:
+            case.setup()
+        if mode == "cold":
+            flush()
+        started = time.perf_counter()
+        case.run()
+        timings.append((time.perf_counter() - started) * 1000)
+    return {
+        "median_ms": round(statistics.median(timings), 3),
+        "min_ms": round(min(timings), 3),
+        "max_ms": round(max(timings), 3),
+    }
+
+
+def _prepare_account(replay, size: int) -> tuple[int, list[str]]:
+    codes = [
+        code
+        for code in replay.fund_codes
+        if _MONEY_FUND_TYPE not in replay.fund_type(code)
+    ][:size]
+    with SessionLocal() as db:
+        account = FundAccount(name=f"bench-{size}", default_buy_fee_percent=0.15)
+        db.add(account)
+        db.flush()
+        for code in codes:
+            db.add(
+                FundHolding(
+                    account_id=account.id,
+                    fund_code=code,
+                    total_amount=10_000.0,
+                    total_shares=8_000.0,
+                )
+            )
+        db.commit()
+        return account.id, codes
+
+
+def _make_pending_setup(
+    account_id: int,
+    codes: list[str],
+    count: int,
+    nav_date,
+) -> Callable[[], None]:
+    def _setup() -> None:
+        with SessionLocal() as db:
+            db.query(FundTransaction).filter(
+                FundTransaction.account_id == account_id
+            ).delete()
+            db.query(FundHolding).filter(FundHolding.account_id == account_id).update(
+                {FundHolding.total_amount: 10_000.0, FundHolding.total_shares: 8_000.0}
+            )
+            trade_time = datetime.combine(nav_date, datetime.min.time())
+            db.add_all(
+                FundTransaction(
+                    account_id=account_id,
+                    fund_code=codes[i % len(codes)],
+                    trade_type=FundTradeType.buy,
+                    status=FundTradeStatus.pending,
+                    amount=1_000.0,
+                    fee_percent=0.15,
+                    fee_amount=1.5,
+                    confirmed_nav=0.0,
+                    confirmed_nav_date=nav_date,
+                    shares=0.0,
+                    trade_time=trade_time - timedelta(days=1),
+                )
+                for i in range(count)
+            )
+            db.commit()
+
+    return _setup
+
+
+def _confirm_pending() -> int:
+    with SessionLocal() as db:
+        return fund_holding_service.confirm_pending_transactions(db)
+
+
+def _account_detail(account_id: int) -> Any:
+    with SessionLocal() as db:
+        return fund_account_service.get_account_detail(db, account_id)
+
+
+def run_suite(
+    fixture_dir: Path,
+    sizes: list[int],
+    repeat: int,
+    latency_ms: float,
+) -> list[dict]:
+    init_db()
+    results: list[dict] = []
+    for size in sizes:
+        replay, redis_client = install_replay(
+            fixture_dir,
+            latency_ms=latency_ms,
+            fund_list_size=100 * size,
+            nav_rows=250 * size,
+        )
+        account_id, codes = _prepare_account(replay, size)
+        fund_code = codes[0]
+        nav_frame = replay.fund_open_fund_info_em(
+            symbol=fund_code, indicator="单位净值走势"
+        )
+        nav_date = nav_frame["净值日期"].iloc[-1]
+        cases = [
+            _Case(
+                "_resolve_fund_by_code",
+                lambda: fund_service._resolve_fund_by_code(replay.fund_codes[-1]),
+            ),
+            _Case(
+                "get_fund_snapshot", lambda: fund_service.get_fund_snapshot(fund_code)
+            ),
+            _Case(
+                "get_fund_realtime_estimate",
+                lambda: fund_service.get_fund_realtime_estimate(fund_code),
+            ),
+            _Case(
+                "get_fund_nav_history",
+                lambda: fund_service.get_fund_nav_history(
+                    fund_code, FundNavHistoryPeriod.since_inception
+                ),
+            ),
+            _Case("get_account_detail", lambda: _account_detail(account_id)),
+            _Case(
+                "confirm_pending_transactions",
+                _confirm_pending,
+                setup=_make_pending_setup(account_id, codes, 10 * size, nav_date),
+                modes=("warm",),
+            ),
+        ]
+        for case in cases:
+            for mode in case.modes:
+                stats = _measure(case, mode, repeat, redis_client.flushall)
+                results.append({"case": case.name, "size": size, "mode": mode, **stats})
+                label = f"{case.name:<30} n={size:<5} {mode:<5}"
+                print(f"{label} {stats['median_ms']:>10.3f} ms", file=sys.stderr)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--fixtures", type=Path, default=DEFAULT_FIXTURE_DIR)
+    parser.add_argument("--sizes", default="1,10,50")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument("--threshold", type=float, default=1.3)
+    parser.add_argument("--update-baseline", type=Path)
+    args = parser.parse_args()
+
+    fixture_dir = args.fixtures
+    fixture_source = "recorded"
+    if not (fixture_dir / AKSHARE_FIXTURE).exists():
+        fixture_dir = _WORK_DIR / "fixtures"
+        synthesize_fixtures(fixture_dir)
+        fixture_source = "synthetic"
+
+    sizes = [int(value) for value in args.sizes.split(",") if value]
+    results = run_suite(fixture_dir, sizes, args.repeat, args.latency_ms)
+    report: dict[str, Any] = {
+        "benchmark": "services",
+        "fixture_source": fixture_source,
+        "latency_ms": args.latency_ms,
+        "repeat": args.repeat,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+    regressions: list[dict] = []
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare_with_baseline(results, baseline, args.threshold)
+        report["threshold"] = args.threshold
+        report["regressions"] = regressions
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    print(output)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(output, encoding="utf-8")
+    if args.update_baseline:
+        args.update_baseline.write_text(output, encoding="utf-8")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""启动耗时基准：每轮在全新子进程中测量。
+
+- `import_app`：`import app.main` 耗时，并记录 pandas/numpy/akshare 是否已被导入；
+- `first_200`：从启动服务进程（`main.run` 生产模式，单 worker，全新 SQLite 含迁移）
+  到 `GET /metrics` 首次返回 200 的耗时。
+
+默认关闭缓存预热与定时任务，不访问上游；结果格式与 `bench_services` 一致，
+可用 `--baseline` 检查回退。
+
+用法：
+    python -m benchmarks.bench_startup --repeat 5
+    python -m benchmarks.bench_startup --baseline benchmarks/baseline_startup.json
+    python -m benchmarks.bench_startup \
+        --update-baseline benchmarks/baseline_startup.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from benchmarks.regression import compare_with_baseline
+
+_REPO_ROOT = Path(__file__).resolve().parent.parent
+_HEAVY_MODULES = ("pandas", "numpy", "akshare")
+_IMPORT_SCRIPT = (
+    "import json, sys, time\n"
+    "started = time.perf_counter()\n"
+    "import app.main\n"
+    "elapsed = (time.perf_counter() - started) * 1000\n"
+    f"heavy = [name for name in {_HEAVY_MODULES!r} if name in sys.modules]\n"
+    "print(json.dumps({'elapsed_ms': elapsed, 'loaded': heavy}))\n"
+)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _child_env(work_dir: Path) -> dict[str, str]:
+    return {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{work_dir / 'startup.db'}",
+        "LOG_FILE": str(work_dir / "app.log"),
+        "LOG_LEVEL": "WARNING",
+        "CACHE_WARMUP_ENABLED": "false",
+        "SCHEDULER_ENABLED": "false",
+        "SNAPSHOT_DIR": str(work_dir / "snapshots"),
+    }
+
+
+def _measure_import() -> dict[str, Any]:
+    with tempfile.TemporaryDirectory(prefix="bench-startup-") as tmp:
+        output = subprocess.run(
+            [sys.executable, "-c", _IMPORT_SCRIPT],
+            cwd=_REPO_ROOT,
+            env=_child_env(Path(tmp)),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def _measure_first_200(timeout: float) -> float:
+    with tempfile.TemporaryDirectory(prefix="bench-startup-") as tmp:
+        port = _free_port()
+        overrides = {
+            "host": "127.0.0.1",
+            "port": port,
+            "workers": 1,
+            "log_level": "warning",
+        }
+        started = time.perf_counter()
+        process = subprocess.Popen(
+            [
+                sys.executable,
+                "-c",
+                "import json, sys, main; "
+                "main.run('app.main:app', 'production', **json.loads(sys.argv[1]))",
+                json.dumps(overrides),
+            ],
+            cwd=_REPO_ROOT,
+            env=_child_env(Path(tmp)),
+        )
+        try:
+            deadline = started + timeout
+            with httpx.Client(timeout=1.0) as client:
+                while time.perf_counter() < deadline:
+                    if process.poll() is not None:
+                        raise RuntimeError("服务进程提前退出")
+                    try:
+                        response = client.get(f"http://127.0.0.1:{port}/metrics")
+                        if response.status_code == 200:
+                            return (time.perf_counter() - started) * 1000
+                    except httpx.TransportError:
+                        pass
+                    time.sleep(0.01)
+            raise TimeoutError(f"{timeout}s 内服务未就绪")
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+def _summarize(case: str, timings: list[float]) -> dict[str, Any]:
+    return {
+        "case": case,
+        "mode": "cold",
+        "median_ms": round(statistics.median(timings), 3),
+        "min_ms": round(min(timings), 3),
+        "max_ms": round(max(timings), 3),
+    }
+
+
+def run_suite(repeat: int, timeout: float) -> tuple[list[dict], list[str]]:
+    import_timings: list[float] = []
+    loaded: set[str] = set()
+    for _ in range(repeat):
+        measured = _measure_import()
+        import_timings.append(measured["elapsed_ms"])
+        loaded.update(measured["loaded"])
+    first_200 = [_measure_first_200(timeout) for _ in range(repeat)]
+    results = [
+        _summarize("import_app", import_timings),
+        _summarize("first_200", first_200),
+    ]
+    for item in results:
+        print(f"{item['case']:<12} {item['median_ms']:>10.3f} ms", file=sys.stderr)
+    return results, sorted(loaded)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument("--threshold", type=float, default=1.3)
+    parser.add_argument("--update-baseline", type=Path)
+    args = parser.parse_args()
+
+    results, loaded = run_suite(args.repeat, args.timeout)
+    report: dict[str, Any] = {
+        "benchmark": "startup",
+        "repeat": args.repeat,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "heavy_modules_loaded_on_import": loaded,
+        "results": results,
+    }
+
+    regressions: list[dict] = []
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare_with_baseline(results, baseline, args.threshold)
+        report["threshold"] = args.threshold
+        report["regressions"] = regressions
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    print(output)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(output, encoding="utf-8")
+    if args.update_baseline:
+        args.update_baseline.write_text(output, encoding="utf-8")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,447 @@
+"""上游数据录制与回放。
+
+录制：调用真实的 akshare 与 NowAPI，将返回的 DataFrame 与 JSON 写入 fixtures 目录
+（`akshare.pkl` 与 `nowapi.json`）。无网络环境可用 `synthesize_fixtures` 生成同结构
+的合成数据。
+
+回放：`install_replay` 将服务层使用的 akshare、NowAPI 客户端与 Redis 替换为
+回放实现，可配置每次上游调用的模拟延迟，并支持按基准规模扩展基金列表与净值长度。
+
+用法：
+    python -m benchmarks.fixtures record 161725 000001 110022
+    python -m benchmarks.fixtures synthesize --funds 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import pickle
+import random
+import time
+import zlib
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qs, urlparse
+
+import httpx
+import numpy as np
+import pandas as pd
+
+DEFAULT_FIXTURE_DIR = Path(__file__).parent / "fixtures"
+AKSHARE_FIXTURE = "akshare.pkl"
+NOWAPI_FIXTURE = "nowapi.json"
+
+_NAV_INDICATOR = "单位净值走势"
+_MONEY_FUND_TYPE = "货币型"
+
+
+def _fixture_key(name: str, kwargs: dict[str, Any]) -> str:
+    return json.dumps([name, sorted((k, str(v)) for k, v in kwargs.items())])
+
+
+def record_fixtures(
+    fund_codes: list[str],
+    output_dir: Path = DEFAULT_FIXTURE_DIR,
+    years: tuple[int, ...] | None = None,
+) -> dict[str, int]:
+    """调用真实上游录制 fixtures。"""
+    import akshare as ak
+
+    from app.services.fund import fund_portfolio_service
+    from app.services.stock import stock_service
+
+    calls: dict[str, pd.DataFrame] = {}
+
+    def _call(name: str, **kwargs: Any) -> pd.DataFrame:
+        frame = getattr(ak, name)(**kwargs)
+        calls[_fixture_key(name, kwargs)] = frame
+        return frame
+
+    fund_list = _call("fund_name_em")
+    _call("tool_trade_date_hist_sina")
+    years = years or fund_portfolio_service.portfolio_years()
+    stock_codes: set[str] = set()
+    for code in fund_codes:
+        matched = fund_list[fund_list["基金代码"] == code]
+        if matched.empty:
+            raise ValueError(f"基金列表中不存在: {code}")
+        _call("fund_individual_basic_info_xq", symbol=code)
+        if _MONEY_FUND_TYPE in str(matched.iloc[0]["基金类型"]):
+            _call("fund_money_fund_info_em", symbol=code)
+            continue
+        _call("fund_open_fund_info_em", symbol=code, indicator=_NAV_INDICATOR)
+        for year in years:
+            holdings = _call("fund_portfolio_hold_em", symbol=code, date=str(year))
+            if not holdings.empty:
+                stock_codes.update(holdings["股票代码"].astype(str))
+
+    quotes: dict[str, Any] = {}
+    for code in sorted(stock_codes):
+        market = stock_service._resolve_market(code)
+        symbol = stock_service._build_nowapi_symbol(code, market)
+        payload = stock_service._request_nowapi(symbol)
+        lists = (payload.get("result") or {}).get("lists") or {}
+        quotes.update(lists)
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with (output_dir / AKSHARE_FIXTURE).open("wb") as handle:
+        pickle.dump(calls, handle)
+    (output_dir / NOWAPI_FIXTURE).write_text(
+        json.dumps(quotes, ensure_ascii=False, indent=2), encoding="utf-8"
+    )
+    return {"akshare_calls": len(calls), "nowapi_quotes": len(quotes)}
+
+
+def synthesize_fixtures(
+    output_dir: Path,
+    fund_count: int = 20,
+    nav_days: int = 2500,
+    seed: int = 7,
+) -> dict[str, int]:
+    """生成与 akshare/NowAPI 返回结构一致的合成 fixtures。"""
+    from app.services.fund import fund_portfolio_service
+
+    rng = np.random.default_rng(seed)
+    calls: dict[str, pd.DataFrame] = {}
+    fund_types = [
+        "股票型",
+        "混合型-偏股",
+        "指数型-股票",
+        "债券型-长债",
+        "货币型-普通货币",
+    ]
+    codes = [f"{100000 + i:06d}" for i in range(fund_count)]
+    calls[_fixture_key("fund_name_em", {})] = pd.DataFrame(
+        {
+            "基金代码": codes,
+            "拼音缩写": [f"JJ{i}" for i in range(fund_count)],
+            "基金简称": [f"合成基金{i}" for i in range(fund_count)],
+            "基金类型": [fund_types[i % len(fund_types)] for i in range(fund_count)],
+            "拼音全称": [f"HECHENGJIJIN{i}" for i in range(fund_count)],
+        }
+    )
+    today = datetime.date.today()
+    latest_year, latest_quarter = fund_portfolio_service.disclosed_quarter(today)
+    trade_dates = pd.bdate_range(end=today + datetime.timedelta(days=365), periods=4000)
+    calls[_fixture_key("tool_trade_date_hist_sina", {})] = pd.DataFrame(
+        {"trade_date": trade_dates.date}
+    )
+    nav_dates = pd.bdate_range(end=today, periods=nav_days).date
+    stock_codes = [f"{600000 + i:06d}" for i in range(60)] + [
+        f"{i:06d}" for i in range(1, 41)
+    ]
+    for index, code in enumerate(codes):
+        calls[_fixture_key("fund_individual_basic_info_xq", {"symbol": code})] = (
+            pd.DataFrame(
+                {
+                    "item": ["基金代码", "基金名称", "基金经理", "成立时间"],
+                    "value": [code, f"合成基金{index}", "合成经理", "2015-01-01"],
+                }
+            )
+        )
+        if _MONEY_FUND_TYPE in fund_types[index % len(fund_types)]:
+            calls[_fixture_key("fund_money_fund_info_em", {"symbol": code})] = (
+                pd.DataFrame(
+                    {
+                        "净值日期": nav_dates,
+                        "每万份收益": rng.uniform(0.3, 0.6, nav_days).round(4),
+                        "7日年化收益率": rng.uniform(1.2, 2.4, nav_days).round(3),
+                    }
+                )
+            )
+            continue
+        growth = rng.normal(0.0003, 0.012, nav_days)
+        navs = np.cumprod(1.0 + growth)
+        calls[
+            _fixture_key(
+                "fund_open_fund_info_em", {"symbol": code, "indicator": _NAV_INDICATOR}
+            )
+        ] = pd.DataFrame(
+            {
+                "净值日期": nav_dates,
+                "单位净值": navs.round(4),
+                "日增长率": (growth * 100).round(2),
+            }
+        )
+        picked = rng.choice(len(stock_codes), size=10, replace=False)
+        for year in (latest_year, latest_year - 1):
+            quarter = latest_quarter if year == latest_year else 4
+            calls[
+                _fixture_key(
+                    "fund_portfolio_hold_em", {"symbol": code, "date": str(year)}
+                )
+            ] = pd.DataFrame(
+                {
+                    "序号": range(1, 11),
+                    "股票代码": [stock_codes[i] for i in picked],
+                    "股票名称": [f"股票{stock_codes[i]}" for i in picked],
+                    "占净值比例": np.sort(rng.uniform(1.0, 9.0, 10))[::-1].round(2),
+                    "持股数": rng.integers(10, 1000, 10) * 100,
+                    "持仓市值": rng.uniform(1000, 90000, 10).round(2),
+                    "季度": [f"{year}年{quarter}季度股票投资明细"] * 10,
+                }
+            )
+
+    quotes = {
+        _nowapi_symbol(code): {
+            "symbol": _nowapi_symbol(code),
+            "last_price": f"{rng.uniform(5, 200):.2f}",
+            "rise_fall_per": f"{rng.normal(0, 1.5):.2f}",
+        }
+        for code in stock_codes
+    }
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with (output_dir / AKSHARE_FIXTURE).open("wb") as handle:
+        pickle.dump(calls, handle)
+    (output_dir / NOWAPI_FIXTURE).write_text(
+        json.dumps(quotes, ensure_ascii=False), encoding="utf-8"
+    )
+    return {"akshare_calls": len(calls), "nowapi_quotes": len(quotes)}
+
+
+def _nowapi_symbol(code: str) -> str:
+    return f"sh{code}" if code.startswith("6") else f"sz{code}"
+
+
+def _stable_index(value: str, size: int) -> int:
+    return zlib.crc32(value.encode()) % size
+
+
+class ReplayAkshare:
+    """按调用名与参数回放录制的 akshare DataFrame。
+
+    未录制的基金代码按稳定哈希映射到已录制的同类基金，便于扩展基准规模；
+    `fund_list_size` 与 `nav_rows` 分别用于扩展基金列表行数与截取/延长净值序列；
+    `error_rate` 为模拟上游失败的概率。
+    """
+
+    def __init__(
+        self,
+        fixture_dir: Path,
+        latency_ms: float = 0.0,
+        fund_list_size: int | None = None,
+        nav_rows: int | None = None,
+        error_rate: float = 0.0,
+    ) -> None:
+        with (fixture_dir / AKSHARE_FIXTURE).open("rb") as handle:
+            self._calls: dict[str, pd.DataFrame] = pickle.load(handle)
+        self.latency = latency_ms / 1000
+        self.error_rate = error_rate
+        self.calls = 0
+        self._nav_rows = nav_rows
+        recorded_list = self._calls[_fixture_key("fund_name_em", {})]
+        self._fund_list = _expand_fund_list(recorded_list, fund_list_size)
+        self._fund_types = dict(
+            zip(self._fund_list["基金代码"], self._fund_list["基金类型"])
+        )
+        self._templates: dict[tuple[str, bool], list[str]] = {}
+        for key in self._calls:
+            name, params = json.loads(key)
+            symbol = dict(params).get("symbol")
+            if symbol is None:
+                continue
+            money = _MONEY_FUND_TYPE in str(self._fund_types.get(symbol, ""))
+            bucket = self._templates.setdefault((name, money), [])
+            if symbol not in bucket:
+                bucket.append(symbol)
+
+    @property
+    def fund_codes(self) -> list[str]:
+        return self._fund_list["基金代码"].tolist()
+
+    def fund_type(self, code: str) -> str:
+        return str(self._fund_types.get(code, ""))
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        def _replay(**kwargs: Any) -> pd.DataFrame:
+            self.calls += 1
+            if self.latency:
+                time.sleep(self.latency)
+            if self.error_rate and random.random() < self.error_rate:
+                raise ConnectionError(f"模拟上游失败: {name}")
+            return self._lookup(name, kwargs)
+
+        return _replay
+
+    def _lookup(self, name: str, kwargs: dict[str, Any]) -> pd.DataFrame:
+        if name == "fund_name_em":
+            return self._fund_list.copy()
+        frame = self._calls.get(_fixture_key(name, kwargs))
+        if frame is None and "symbol" in kwargs:
+            symbol = str(kwargs["symbol"])
+            money = _MONEY_FUND_TYPE in self.fund_type(symbol)
+            templates = self._templates.get((name, money)) or self._templates.get(
+                (name, not money)
+            )
+            if templates:
+                template = templates[_stable_index(symbol, len(templates))]
+                frame = self._calls.get(
+                    _fixture_key(name, {**kwargs, "symbol": template})
+                )
+        if frame is None:
+            return pd.DataFrame()
+        if name in ("fund_open_fund_info_em", "fund_money_fund_info_em"):
+            return _resize_nav(frame, self._nav_rows)
+        return frame.copy()
+
+
+def _expand_fund_list(fund_list: pd.DataFrame, size: int | None) -> pd.DataFrame:
+    if size is None or size <= len(fund_list):
+        return fund_list.copy()
+    extra = size - len(fund_list)
+    template = fund_list.iloc[np.arange(extra) % len(fund_list)].reset_index(drop=True)
+    template["基金代码"] = [f"{900000 + i:06d}" for i in range(extra)]
+    template["基金简称"] = template["基金简称"] + "-扩展"
+    return pd.concat([fund_list, template], ignore_index=True)
+
+
+def _resize_nav(frame: pd.DataFrame, rows: int | None) -> pd.DataFrame:
+    if rows is None or frame.empty:
+        return frame.copy()
+    if rows <= len(frame):
+        return frame.iloc[-rows:].reset_index(drop=True)
+    repeats = -(-rows // len(frame))
+    values = pd.concat([frame] * repeats, ignore_index=True).iloc[-rows:]
+    values = values.reset_index(drop=True)
+    last_date = pd.Timestamp(frame["净值日期"].iloc[-1])
+    values["净值日期"] = pd.bdate_range(end=last_date, periods=rows).date
+    return values
+
+
+class DictRedis:
+    """进程内 Redis 替身，仅实现服务层用到的命令。"""
+
+    def __init__(self) -> None:
+        self._data: dict[str, tuple[str, float | None]] = {}
+
+    def get(self, key: str) -> str | None:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._data.pop(key, None)
+            return None
+        return value
+
+    def set(self, key: str, value: str, ex: int | None = None, **_: Any) -> bool:
+        expires_at = time.monotonic() + ex if ex else None
+        self._data[key] = (value, expires_at)
+        return True
+
+    def delete(self, *keys: str) -> int:
+        return sum(self._data.pop(key, None) is not None for key in keys)
+
+    def ping(self) -> bool:
+        return True
+
+    def flushall(self) -> None:
+        self._data.clear()
+
+    def close(self) -> None:
+        return None
+
+
+def load_nowapi_quotes(fixture_dir: Path) -> dict[str, dict[str, Any]]:
+    return json.loads((fixture_dir / NOWAPI_FIXTURE).read_text(encoding="utf-8"))
+
+
+def build_nowapi_payload(
+    quotes: dict[str, dict[str, Any]],
+    stock_symbols: str,
+) -> dict[str, Any]:
+    """按 `stoSym` 组装 NowAPI 响应；未录制的代码映射到已录制行情。"""
+    recorded = list(quotes.values())
+    lists = {}
+    for symbol in filter(None, stock_symbols.split(",")):
+        row = quotes.get(symbol)
+        if row is None and recorded:
+            row = recorded[_stable_index(symbol, len(recorded))]
+        if row is not None:
+            lists[symbol] = {**row, "symbol": symbol}
+    return {"success": "1", "result": {"dataline": len(lists), "lists": lists}}
+
+
+def nowapi_transport(
+    fixture_dir: Path,
+    latency_ms: float = 0.0,
+) -> httpx.MockTransport:
+    """进程内回放 NowAPI 行情。"""
+    quotes = load_nowapi_quotes(fixture_dir)
+    latency = latency_ms / 1000
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        if latency:
+            time.sleep(latency)
+        params = parse_qs(urlparse(str(request.url)).query)
+        return httpx.Response(
+            200, json=build_nowapi_payload(quotes, params.get("stoSym", [""])[0])
+        )
+
+    return httpx.MockTransport(_handler)
+
+
+def install_replay(
+    fixture_dir: Path,
+    latency_ms: float = 0.0,
+    fund_list_size: int | None = None,
+    nav_rows: int | None = None,
+    error_rate: float = 0.0,
+    fake_redis: bool = True,
+    replay_nowapi: bool = True,
+) -> tuple[ReplayAkshare, DictRedis | None]:
+    """将服务层的上游依赖替换为回放实现。
+
+    `fake_redis=False` 时保留 `REDIS_URL` 指向的真实 Redis；
+    `replay_nowapi=False` 时保留 NowAPI HTTP 客户端（可指向本地桩服务）。
+    """
+    from app.config import settings
+    from app.services import akshare_adapter, cache, trading_calendar
+    from app.services.stock import stock_service
+
+    replay = ReplayAkshare(
+        fixture_dir, latency_ms, fund_list_size, nav_rows, error_rate
+    )
+    settings.akshare_disk_cache_path = ""
+    settings.snapshot_dir = ""
+    akshare_adapter.set_backend(replay)
+    trading_calendar._trade_dates = None
+    redis_client = None
+    if fake_redis:
+        redis_client = DictRedis()
+        cache._redis_client = redis_client
+    settings.nowapi_appkey = settings.nowapi_appkey or "replay"
+    settings.nowapi_sign = settings.nowapi_sign or "replay"
+    if replay_nowapi:
+        stock_service.close_nowapi_client()
+        stock_service._nowapi_client = httpx.Client(
+            transport=nowapi_transport(fixture_dir, latency_ms)
+        )
+    return replay, redis_client
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--output", type=Path, default=DEFAULT_FIXTURE_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+    record_parser = commands.add_parser("record", help="调用真实上游录制")
+    record_parser.add_argument("fund_codes", nargs="+")
+    synth_parser = commands.add_parser("synthesize", help="生成合成数据")
+    synth_parser.add_argument("--funds", type=int, default=20)
+    synth_parser.add_argument("--nav-days", type=int, default=2500)
+    args = parser.parse_args()
+
+    if args.command == "record":
+        summary = record_fixtures(args.fund_codes, args.output)
+    else:
+        summary = synthesize_fixtures(args.output, args.funds, args.nav_days)
+    print(json.dumps({"output": str(args.output), **summary}, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,420 @@
+"""端到端压测：以本地替身启动应用并按业务场景混合施压。
+
+启动内容：
+- NowAPI 桩服务（`benchmarks.stub_nowapi`，可调延迟与错误率）；
+- uvicorn 运行 `benchmarks.loadtest_app:app`（akshare 回放，可调延迟与错误率）；
+- SQLite（默认临时文件）或 `--database-url` 指定的 MySQL；
+- `--redis-url` 指定的 Redis，未指定时每个 worker 使用进程内替身。
+
+场景（`--mix` 指定权重）：
+- positions：轮询账户详情与汇总；
+- browse：浏览基金快照、历史净值与实时估值；
+- trade：录入买入交易后刷新账户。
+
+输出按接口统计的吞吐量、延迟分位数与错误率（JSON）。
+
+用法：
+    python -m benchmarks.loadtest --workers 2 --threadpool-size 80 \\
+        --concurrency 50 --duration 30 --mix positions=6,browse=3,trade=1 \\
+        --ak-latency-ms 80 --nowapi-latency-ms 30
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import date
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+import httpx
+import numpy as np
+
+from benchmarks.fixtures import (
+    AKSHARE_FIXTURE,
+    DEFAULT_FIXTURE_DIR,
+    ReplayAkshare,
+    synthesize_fixtures,
+)
+from benchmarks.stub_nowapi import create_server, start_in_thread
+
+_WORK_DIR = Path(tempfile.mkdtemp(prefix="loadtest-"))
+_REPO_ROOT = Path(__file__).resolve().parent.parent
+_MONEY_FUND_TYPE = "货币型"
+_NAV_INDICATOR = "单位净值走势"
+
+
+class _Recorder:
+    def __init__(self) -> None:
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        self.statuses: dict[str, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def record(self, label: str, duration_ms: float, status: str, ok: bool) -> None:
+        self.latencies[label].append(duration_ms)
+        self.statuses[label][status] += 1
+        if not ok:
+            self.errors[label] += 1
+
+    def summary(self, elapsed: float) -> dict[str, Any]:
+        endpoints = {}
+        total = 0
+        total_errors = 0
+        for label, values in sorted(self.latencies.items()):
+            samples = np.array(values)
+            errors = self.errors.get(label, 0)
+            total += samples.size
+            total_errors += errors
+            p50, p90, p99 = np.percentile(samples, [50, 90, 99])
+            endpoints[label] = {
+                "requests": int(samples.size),
+                "requests_per_second": round(samples.size / elapsed, 2),
+                "error_rate": round(errors / samples.size, 4),
+                "p50_ms": round(float(p50), 2),
+                "p90_ms": round(float(p90), 2),
+                "p99_ms": round(float(p99), 2),
+                "max_ms": round(float(samples.max()), 2),
+                "statuses": dict(self.statuses[label]),
+            }
+        return {
+            "requests": total,
+            "requests_per_second": round(total / elapsed, 2) if elapsed else 0.0,
+            "error_rate": round(total_errors / total, 4) if total else 0.0,
+            "endpoints": endpoints,
+        }
+
+
+class _Scenarios:
+    """按场景发起请求；label 使用路由模板，便于按接口聚合。"""
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        recorder: _Recorder,
+        accounts: list[tuple[int, list[str]]],
+        fund_codes: list[str],
+        trade_date: date,
+    ) -> None:
+        self._client = client
+        self._recorder = recorder
+        self._accounts = accounts
+        self._fund_codes = fund_codes
+        self._trade_date = trade_date
+
+    async def _request(self, label: str, method: str, url: str, **kwargs: Any) -> None:
+        started = time.perf_counter()
+        try:
+            response = await self._client.request(method, url, **kwargs)
+            status = str(response.status_code)
+            ok = response.status_code < 400
+        except httpx.HTTPError as exc:
+            status = type(exc).__name__
+            ok = False
+        self._recorder.record(label, (time.perf_counter() - started) * 1000, status, ok)
+
+    async def positions(self) -> None:
+        account_id, _ = random.choice(self._accounts)
+        await self._request(
+            "GET /fund-accounts/{account_id}", "GET", f"/fund-accounts/{account_id}"
+        )
+        await self._request(
+            "GET /fund-accounts/{account_id}/summary",
+            "GET",
+            f"/fund-accounts/{account_id}/summary",
+        )
+
+    async def browse(self) -> None:
+        code = random.choice(self._fund_codes)
+        await self._request(
+            "GET /funds/{code}/snapshot", "GET", f"/funds/{code}/snapshot"
+        )
+        await self._request(
+            "GET /funds/{code}/nav-history",
+            "GET",
+            f"/funds/{code}/nav-history",
+            params={"period": random.choice(["one_month", "one_year"])},
+        )
+        await self._request(
+            "GET /funds/{code}/realtime-estimate",
+            "GET",
+            f"/funds/{code}/realtime-estimate",
+        )
+
+    async def trade(self) -> None:
+        account_id, codes = random.choice(self._accounts)
+        await self._request(
+            "POST /fund-holdings/transactions",
+            "POST",
+            "/fund-holdings/transactions",
+            json={
+                "account_id": account_id,
+                "fund_code": random.choice(codes),
+                "trade_type": "buy",
+                "amount": round(random.uniform(100, 5000), 2),
+                "trade_date": self._trade_date.isoformat(),
+            },
+        )
+        await self._request(
+            "GET /fund-accounts/{account_id}", "GET", f"/fund-accounts/{account_id}"
+        )
+
+
+def _parse_mix(value: str) -> dict[str, float]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    unknown = set(mix) - {"positions", "browse", "trade"}
+    if unknown:
+        raise SystemExit(f"未知场景: {', '.join(sorted(unknown))}")
+    return mix
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _seed_database(
+    replay: ReplayAkshare,
+    accounts: int,
+    holdings_per_account: int,
+) -> list[tuple[int, list[str]]]:
+    from app.db import SessionLocal, init_db
+    from app.models.db.models import FundAccount, FundHolding
+
+    init_db()
+    codes = [
+        code
+        for code in replay.fund_codes
+        if _MONEY_FUND_TYPE not in replay.fund_type(code)
+    ]
+    seeded = []
+    with SessionLocal() as db:
+        for index in range(accounts):
+            account = FundAccount(
+                name=f"loadtest-{index}", default_buy_fee_percent=0.15
+            )
+            db.add(account)
+            db.flush()
+            picked = random.sample(codes, min(holdings_per_account, len(codes)))
+            for code in picked:
+                db.add(
+                    FundHolding(
+                        account_id=account.id,
+                        fund_code=code,
+                        total_amount=10_000.0,
+                        total_shares=8_000.0,
+                    )
+                )
+            seeded.append((account.id, picked))
+        db.commit()
+    return seeded
+
+
+async def _wait_ready(base_url: str, process: subprocess.Popen, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise SystemExit(f"应用进程提前退出，退出码 {process.returncode}")
+            try:
+                if (await client.get("/metrics")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise SystemExit("应用启动超时")
+
+
+async def _drive(
+    base_url: str,
+    scenarios_factory: Callable[[httpx.AsyncClient, _Recorder], _Scenarios],
+    mix: dict[str, float],
+    concurrency: int,
+    duration: float,
+    warmup: float,
+) -> tuple[_Recorder, float]:
+    limits = httpx.Limits(
+        max_connections=concurrency, max_keepalive_connections=concurrency
+    )
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=60.0
+    ) as client:
+        names = list(mix)
+        weights = [mix[name] for name in names]
+
+        async def _run_for(recorder: _Recorder, seconds: float) -> float:
+            scenarios = scenarios_factory(client, recorder)
+            deadline = time.monotonic() + seconds
+
+            async def _user() -> None:
+                while time.monotonic() < deadline:
+                    name = random.choices(names, weights)[0]
+                    action: Callable[[], Awaitable[None]] = getattr(scenarios, name)
+                    await action()
+
+            started = time.perf_counter()
+            await asyncio.gather(*(_user() for _ in range(concurrency)))
+            return time.perf_counter() - started
+
+        if warmup > 0:
+            await _run_for(_Recorder(), warmup)
+        recorder = _Recorder()
+        elapsed = await _run_for(recorder, duration)
+        return recorder, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--fixtures", type=Path, default=DEFAULT_FIXTURE_DIR)
+    parser.add_argument(
+        "--server-mode",
+        choices=("development", "production"),
+        default="production",
+        help="按 main.py 对应模式启动 uvicorn（development 为单进程自动重载）",
+    )
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument(
+        "--threadpool-size", type=int, default=0, help="0 表示 anyio 默认值"
+    )
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--warmup", type=float, default=5.0)
+    parser.add_argument("--mix", default="positions=6,browse=3,trade=1")
+    parser.add_argument("--accounts", type=int, default=20)
+    parser.add_argument("--holdings-per-account", type=int, default=5)
+    parser.add_argument("--ak-latency-ms", type=float, default=50.0)
+    parser.add_argument("--ak-error-rate", type=float, default=0.0)
+    parser.add_argument("--nowapi-latency-ms", type=float, default=20.0)
+    parser.add_argument("--nowapi-error-rate", type=float, default=0.0)
+    parser.add_argument("--database-url", help="默认使用临时 SQLite 文件")
+    parser.add_argument("--redis-url", help="默认每个 worker 使用进程内 Redis 替身")
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+    mix = _parse_mix(args.mix)
+
+    fixture_dir = args.fixtures
+    fixture_source = "recorded"
+    if not (fixture_dir / AKSHARE_FIXTURE).exists():
+        fixture_dir = _WORK_DIR / "fixtures"
+        synthesize_fixtures(fixture_dir)
+        fixture_source = "synthetic"
+
+    nowapi_server = create_server(
+        fixture_dir,
+        latency_ms=args.nowapi_latency_ms,
+        error_rate=args.nowapi_error_rate,
+    )
+    start_in_thread(nowapi_server)
+    nowapi_url = f"http://127.0.0.1:{nowapi_server.server_address[1]}"
+
+    database_url = args.database_url or f"sqlite:///{_WORK_DIR / 'loadtest.db'}"
+    env = {
+        **os.environ,
+        "DATABASE_URL": database_url,
+        "NOWAPI_BASE_URL": nowapi_url,
+        "NOWAPI_APPKEY": "loadtest",
+        "NOWAPI_SIGN": "loadtest",
+        "CACHE_WARMUP_ENABLED": "false",
+        "SCHEDULER_ENABLED": "false",
+        "LOG_FILE": str(_WORK_DIR / "app.log"),
+        "LOG_LEVEL": "WARNING",
+        "LOADTEST_FIXTURES": str(fixture_dir),
+        "LOADTEST_AK_LATENCY_MS": str(args.ak_latency_ms),
+        "LOADTEST_AK_ERROR_RATE": str(args.ak_error_rate),
+        "LOADTEST_FAKE_REDIS": "0" if args.redis_url else "1",
+        "THREADPOOL_SIZE": str(args.threadpool_size),
+    }
+    if args.redis_url:
+        env["REDIS_URL"] = args.redis_url
+    os.environ.update({"DATABASE_URL": database_url, "LOG_FILE": env["LOG_FILE"]})
+
+    replay = ReplayAkshare(fixture_dir)
+    accounts = _seed_database(replay, args.accounts, args.holdings_per_account)
+    fund_codes = sorted({code for _, codes in accounts for code in codes})
+    nav_frame = replay.fund_open_fund_info_em(
+        symbol=fund_codes[0], indicator=_NAV_INDICATOR
+    )
+    trade_date = nav_frame["净值日期"].iloc[-1]
+
+    port = _free_port()
+    server_overrides = {"host": "127.0.0.1", "port": port, "log_level": "warning"}
+    if args.server_mode == "production":
+        server_overrides["workers"] = args.workers
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-c",
+            "import json, sys, main; "
+            "main.run('benchmarks.loadtest_app:app', sys.argv[1], "
+            "**json.loads(sys.argv[2]))",
+            args.server_mode,
+            json.dumps(server_overrides),
+        ],
+        cwd=_REPO_ROOT,
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        asyncio.run(_wait_ready(base_url, process, timeout=60.0))
+        recorder, elapsed = asyncio.run(
+            _drive(
+                base_url,
+                lambda client, rec: _Scenarios(
+                    client, rec, accounts, fund_codes, trade_date
+                ),
+                mix,
+                args.concurrency,
+                args.duration,
+                args.warmup,
+            )
+        )
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        nowapi_server.shutdown()
+
+    report = {
+        "benchmark": "loadtest",
+        "fixture_source": fixture_source,
+        "config": {
+            "server_mode": args.server_mode,
+            "workers": args.workers if args.server_mode == "production" else 1,
+            "threadpool_size": args.threadpool_size or "default",
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "mix": mix,
+            "ak_latency_ms": args.ak_latency_ms,
+            "ak_error_rate": args.ak_error_rate,
+            "nowapi_latency_ms": args.nowapi_latency_ms,
+            "nowapi_error_rate": args.nowapi_error_rate,
+            "database": database_url.split("://", 1)[0],
+            "redis": "external" if args.redis_url else "in-process",
+        },
+        **recorder.summary(elapsed),
+    }
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    print(output)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(output, encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""压测用应用入口：在 `app.main:app` 基础上安装 akshare 回放与可选的 Redis 替身。
+
+由 `benchmarks.loadtest` 通过 `main.run` 以 `benchmarks.loadtest_app:app` 启动，
+配置通过环境变量传入（每个 worker 进程各自安装）：
+
+- `LOADTEST_FIXTURES`：fixtures 目录
+- `LOADTEST_AK_LATENCY_MS` / `LOADTEST_AK_ERROR_RATE`：akshare 模拟延迟与错误率
+- `LOADTEST_FAKE_REDIS`：为 `1` 时使用进程内 Redis 替身
+
+同步接口线程池大小等应用配置直接使用 `THREADPOOL_SIZE` 等常规环境变量。
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from app.main import app
+from benchmarks.fixtures import install_replay
+
+install_replay(
+    Path(os.environ["LOADTEST_FIXTURES"]),
+    latency_ms=float(os.environ.get("LOADTEST_AK_LATENCY_MS", "0")),
+    error_rate=float(os.environ.get("LOADTEST_AK_ERROR_RATE", "0")),
+    fake_redis=os.environ.get("LOADTEST_FAKE_REDIS") == "1",
+    replay_nowapi=False,
+)
+
+__all__ = ["app"]
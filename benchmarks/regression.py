@@ -0,0 +1,31 @@
+"""基准结果与基线的比较。"""
+
+from __future__ import annotations
+
+from typing import Any
+
+
+def _result_key(item: dict[str, Any]) -> tuple:
+    return item["case"], item.get("size"), item.get("mode")
+
+
+def compare_with_baseline(
+    results: list[dict],
+    baseline: dict,
+    threshold: float,
+) -> list[dict]:
+    """与基线比较耗时中位数，返回超过阈值的回退项。"""
+    reference = {
+        _result_key(item): item["median_ms"] for item in baseline.get("results", [])
+    }
+    regressions = []
+    for item in results:
+        base = reference.get(_result_key(item))
+        if not base:
+            continue
+        ratio = item["median_ms"] / base
+        item["baseline_median_ms"] = base
+        item["ratio"] = round(ratio, 3)
+        if ratio > threshold:
+            regressions.append(item)
+    return regressions
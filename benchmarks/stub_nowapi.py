@@ -0,0 +1,92 @@
+"""本地 NowAPI 桩服务：按 fixtures 回放行情，可配置延迟与错误率。
+
+用法：python -m benchmarks.stub_nowapi --port 18080 --latency-ms 30 --error-rate 0.01
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.fixtures import (
+    DEFAULT_FIXTURE_DIR,
+    build_nowapi_payload,
+    load_nowapi_quotes,
+)
+
+
+def create_server(
+    fixture_dir: Path,
+    host: str = "127.0.0.1",
+    port: int = 0,
+    latency_ms: float = 0.0,
+    error_rate: float = 0.0,
+) -> ThreadingHTTPServer:
+    """创建桩服务；`port=0` 时由系统分配端口（见 `server.server_address`）。"""
+    quotes = load_nowapi_quotes(fixture_dir)
+    latency = latency_ms / 1000
+
+    class _Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:  # noqa: N802
+            if latency:
+                time.sleep(latency)
+            if error_rate and random.random() < error_rate:
+                self._send(503, {"success": "0", "msg": "stub unavailable"})
+                return
+            params = parse_qs(urlparse(self.path).query)
+            symbols = params.get("stoSym", [""])[0]
+            self._send(200, build_nowapi_payload(quotes, symbols))
+
+        def _send(self, status: int, payload: dict) -> None:
+            body = json.dumps(payload, ensure_ascii=False).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args) -> None:  # noqa: A002
+            return None
+
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    return server
+
+
+def start_in_thread(server: ThreadingHTTPServer) -> threading.Thread:
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return thread
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--fixtures", type=Path, default=DEFAULT_FIXTURE_DIR)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=18080)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = create_server(
+        args.fixtures, args.host, args.port, args.latency_ms, args.error_rate
+    )
+    print(f"NowAPI stub listening on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,81 @@
-"""统一入口：支持 `python main.py` 启动服务。"""
+"""统一入口：支持 `python main.py` 启动服务。
+
+- `APP_ENV=development`（默认）：单进程，监听代码变更自动重载；
+- `APP_ENV=production`：多 worker，参数由 `SERVER_*` 环境变量配置；启动前准备
+  Prometheus 多进程指标目录，使 `/metrics` 汇总全部 worker。
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+from pathlib import Path
+from typing import Any
 
 import uvicorn
 
+from app.config import settings
 
-def main() -> None:
+APP_PATH = "app.main:app"
+
+
+def build_server_options(mode: str) -> dict[str, Any]:
+    """按运行模式生成 uvicorn 参数。"""
+    options: dict[str, Any] = {
+        "host": settings.server_host,
+        "port": settings.server_port,
+    }
+    if mode != "production":
+        options["reload"] = True
+        return options
+    options.update(
+        workers=settings.server_workers or os.cpu_count() or 1,
+        loop=settings.server_loop,
+        http=settings.server_http,
+        backlog=settings.server_backlog,
+        timeout_keep_alive=settings.server_keepalive_seconds,
+        timeout_graceful_shutdown=settings.server_graceful_timeout_seconds,
+        proxy_headers=True,
+        # 请求日志由应用中间件输出
+        access_log=False,
+    )
+    return options
+
+
+def prepare_metrics_dir() -> Path:
+    """设置并清空 Prometheus 多进程指标目录（须在 worker 启动前执行）。
+
+    未设置 `PROMETHEUS_MULTIPROC_DIR` 时使用日志目录下的 `prometheus`；
+    目录中残留的上次运行指标文件会被删除，避免计入已退出的进程。
+    """
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    metrics_dir = Path(path) if path else Path(settings.log_file).parent / "prometheus"
+    metrics_dir.mkdir(parents=True, exist_ok=True)
+    for stale in metrics_dir.glob("*.db"):
+        stale.unlink()
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = str(metrics_dir)
+    return metrics_dir
+
+
+def run(app_path: str = APP_PATH, mode: str | None = None, **overrides: Any) -> None:
     """启动 FastAPI 应用。"""
-    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
+    mode = mode or settings.app_env
+    options = build_server_options(mode)
+    options.update(overrides)
+    if mode == "production":
+        prepare_metrics_dir()
+    uvicorn.run(app_path, **options)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="启动 Fund Snapshot API")
+    parser.add_argument(
+        "--mode",
+        choices=("development", "production"),
+        help="运行模式，默认取 APP_ENV",
+    )
+    args = parser.parse_args()
+    run(mode=args.mode)
 
 
 if __name__ == "__main__":
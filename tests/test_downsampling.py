@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+from app.utils.downsampling import minmax_downsample_indices
+
+
+def test_short_series_is_returned_unchanged():
+    indices = minmax_downsample_indices(np.array([3.0, 1.0, 2.0]), max_points=5)
+
+    assert indices.tolist() == [0, 1, 2]
+
+
+def test_result_is_bounded_sorted_and_keeps_endpoints():
+    values = np.sin(np.linspace(0, 20, 1000))
+
+    indices = minmax_downsample_indices(values, max_points=50)
+
+    assert len(indices) <= 50
+    assert indices[0] == 0
+    assert indices[-1] == 999
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_global_extremes_are_kept():
+    values = np.linspace(1.0, 2.0, 500)
+    values[137] = 10.0
+    values[311] = -5.0
+
+    indices = minmax_downsample_indices(values, max_points=20)
+
+    assert 137 in indices
+    assert 311 in indices
+
+
+def test_too_few_points_for_a_bucket_keeps_only_endpoints():
+    indices = minmax_downsample_indices(np.arange(10, dtype=float), max_points=3)
+
+    assert indices.tolist() == [0, 9]
+
+
+def test_nan_is_not_chosen_as_an_extreme():
+    values = np.array([1.0, math.nan, 5.0, 2.0, math.nan, 0.5, 3.0, 1.0])
+
+    indices = minmax_downsample_indices(values, max_points=4)
+
+    # 唯一的桶覆盖下标 1..6，极值为 5.0 与 0.5
+    assert indices.tolist() == [0, 2, 5, 7]
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import pytest
+
+from app.models.schemas import FundNavHistoryPeriod
+from app.services.fund import fund_service
+from app.services.fund.fund_compare_service import compare_funds, parse_fund_codes
+
+_TYPES = {"161725": "指数型-股票", "000198": "货币型-普通货币"}
+
+
+@pytest.fixture
+def nav_fetches(monkeypatch):
+    calls: list[str] = []
+    monkeypatch.setattr(
+        fund_service,
+        "_resolve_fund_by_code",
+        lambda code: {"code": code, "name": code, "type": _TYPES[code]},
+    )
+
+    def fetch(code, period):
+        calls.append(code)
+        raise AssertionError("净值不应被拉取")
+
+    monkeypatch.setattr(fund_service, "get_fund_nav_series", fetch)
+    return calls
+
+
+def test_parse_fund_codes_dedupes_in_order():
+    assert parse_fund_codes(" 161725,000198,161725, ") == ["161725", "000198"]
+
+
+def test_parse_fund_codes_requires_two():
+    with pytest.raises(ValueError):
+        parse_fund_codes("161725,161725")
+
+
+def test_money_fund_rejected_before_nav_fetch(nav_fetches):
+    with pytest.raises(ValueError, match="000198"):
+        compare_funds(["161725", "000198"], FundNavHistoryPeriod.one_year)
+    assert nav_fetches == []
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import datetime
+
+import pytest
+
+from app.models.db.models import FundAccount
+from app.models.enums import FundTradeStatus, FundTradeType
+from app.models.schemas import FundTransactionImportItem
+from app.services.fund import fund_holding_service
+from app.services.fund.fund_import_service import _prepare_record, parse_import_csv
+
+_HEADER = "fund_code,trade_type,amount,fee_percent,trade_date,is_after_cutoff,remark"
+
+
+@pytest.fixture(autouse=True)
+def _weekday_calendar(monkeypatch):
+    monkeypatch.setattr(
+        fund_holding_service, "is_trading_day", lambda day: day.weekday() < 5
+    )
+
+
+def _item(**overrides) -> FundTransactionImportItem:
+    data = {
+        "fund_code": "161725",
+        "trade_type": FundTradeType.buy,
+        "amount": 1000.0,
+        "trade_date": datetime.date(2025, 1, 2),
+    }
+    data.update(overrides)
+    return FundTransactionImportItem(**data)
+
+
+def test_parse_csv_strips_bom_whitespace_and_blank_optionals():
+    content = f"\ufeff{_HEADER}\n 161725 ,buy, 1000 ,,2025-01-02,,\n"
+
+    rows, errors = parse_import_csv(content)
+
+    assert errors == []
+    [(row_no, item)] = rows
+    assert row_no == 1
+    assert item.fund_code == "161725"
+    assert item.amount == 1000.0
+    assert item.fee_percent is None
+    assert item.is_after_cutoff is False
+    assert item.remark is None
+
+
+def test_parse_csv_reports_invalid_rows_with_row_number():
+    content = (
+        f"{_HEADER}\n"
+        "161725,buy,1000,0.15,2025-01-02,false,ok\n"
+        "110022,hold,abc,,2025-01-02,,\n"
+        ",sell,500,,not-a-date,,\n"
+    )
+
+    rows, errors = parse_import_csv(content)
+
+    assert [row_no for row_no, _ in rows] == [1]
+    assert [error.row for error in errors] == [2, 3]
+    assert errors[0].fund_code == "110022"
+    assert "trade_type" in errors[0].message
+    assert "amount" in errors[0].message
+    assert errors[1].fund_code is None
+    assert "trade_date" in errors[1].message
+
+
+def test_parse_csv_reports_missing_required_columns():
+    rows, errors = parse_import_csv("fund_code,amount\n161725,1000\n")
+
+    assert rows == []
+    assert "trade_type" in errors[0].message
+    assert "trade_date" in errors[0].message
+
+
+@pytest.mark.parametrize(
+    ("overrides", "message"),
+    [
+        ({"fund_code": "  "}, "基金代码不能为空"),
+        ({"amount": 0.0}, "交易金额必须大于 0"),
+        ({"fee_percent": 100.0}, "份额计算基础金额必须大于 0"),
+    ],
+)
+def test_prepare_record_rejects_invalid_rows(overrides, message):
+    account = FundAccount(name="a", default_buy_fee_percent=0.0)
+
+    assert _prepare_record(account, 1, _item(**overrides)) == ({}, message)
+
+
+def test_prepare_record_applies_default_fee_to_buys_only():
+    account = FundAccount(name="a", default_buy_fee_percent=0.15)
+
+    buy, _ = _prepare_record(account, 1, _item())
+    sell, _ = _prepare_record(account, 2, _item(trade_type=FundTradeType.sell))
+
+    assert buy["fee_percent"] == 0.15
+    assert buy["fee_amount"] == pytest.approx(1.5)
+    assert buy["share_base_amount"] == pytest.approx(998.5)
+    assert sell["fee_percent"] == 0.0
+
+
+def test_prepare_record_rolls_after_cutoff_trades_to_next_trading_day():
+    account = FundAccount(name="a", default_buy_fee_percent=0.0)
+    friday = datetime.date(2025, 1, 3)
+
+    record, message = _prepare_record(
+        account, 1, _item(trade_date=friday, is_after_cutoff=True)
+    )
+
+    assert message is None
+    assert record["confirmed_nav_date"] == datetime.date(2025, 1, 6)
+    assert record["status"] == FundTradeStatus.confirmed
+
+
+def test_prepare_record_marks_future_confirmations_pending():
+    account = FundAccount(name="a", default_buy_fee_percent=0.0)
+    future = datetime.date.today() + datetime.timedelta(days=30)
+
+    record, _ = _prepare_record(account, 1, _item(trade_date=future))
+
+    assert record["status"] == FundTradeStatus.pending
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import datetime
+
+import pytest
+
+from app.models.db.models import FundMetric
+from app.services import trading_calendar
+from app.services.fund.fund_metrics_service import _needs_check
+
+# 2025-01-08 为周三
+_TODAY = datetime.date(2025, 1, 8)
+
+
+@pytest.fixture(autouse=True)
+def _weekday_calendar(monkeypatch):
+    monkeypatch.setattr(
+        trading_calendar, "is_trading_day", lambda day: day.weekday() < 5
+    )
+
+
+def _metric(nav_date: datetime.date, checked_at: datetime.datetime) -> FundMetric:
+    return FundMetric(
+        fund_code="161725",
+        nav_date=nav_date,
+        computed_at=checked_at,
+        checked_at=checked_at,
+    )
+
+
+def _at(hour: int, minute: int = 40) -> datetime.datetime:
+    return datetime.datetime.combine(_TODAY, datetime.time(hour, minute))
+
+
+def test_up_to_date_fund_is_not_checked():
+    metric = _metric(_TODAY, _at(20))
+    assert not _needs_check(metric, _at(21), backoff=True)
+    assert not _needs_check(metric, _at(21))
+
+
+def test_fund_missing_today_is_checked_on_every_poll():
+    metric = _metric(_TODAY - datetime.timedelta(days=1), _at(17))
+    for hour in range(18, 24):
+        assert _needs_check(metric, _at(hour), backoff=True)
+
+
+def test_lagging_fund_backs_off_only_in_scheduler():
+    # 周一净值在周二晚上仍未发布，已错过一整晚
+    metric = _metric(_TODAY - datetime.timedelta(days=2), _at(17))
+    assert not _needs_check(metric, _at(18), backoff=True)
+    assert not _needs_check(metric, _at(19), backoff=True)
+    assert _needs_check(metric, _at(20, 39), backoff=True)
+    assert _needs_check(metric, _at(18))
+
+
+def test_monday_fund_is_not_lagging_over_weekend():
+    monday = datetime.date(2025, 1, 6)
+    metric = _metric(
+        datetime.date(2025, 1, 3),
+        datetime.datetime.combine(monday, datetime.time(17, 40)),
+    )
+    now = datetime.datetime.combine(monday, datetime.time(18, 40))
+    assert _needs_check(metric, now, backoff=True)
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import datetime
+
+from app.models.schemas import FundNavHistoryPeriod
+from app.services.fund.fund_service import (
+    NavHistoryColumns,
+    _downsample_nav_history,
+    _slice_nav_history,
+)
+
+_DATES = [
+    "2024-12-02",
+    "2024-12-31",
+    "2025-01-02",
+    "2025-01-03",
+    "2025-01-06",
+    "2025-01-31",
+]
+
+
+def _columns() -> NavHistoryColumns:
+    return NavHistoryColumns(
+        dates=list(_DATES),
+        nav=[1.0, 1.1, 1.2, 1.3, 1.4, 1.5],
+        daily_growth=[None, 10.0, 9.1, 8.3, 7.7, 7.1],
+        nav_7d=None,
+    )
+
+
+def _slice(**kwargs) -> list[str]:
+    period = kwargs.pop("period", FundNavHistoryPeriod.since_inception)
+    return _slice_nav_history(_columns(), period, **kwargs).dates
+
+
+def test_period_is_counted_back_from_latest_nav_date():
+    # 最新净值日 2025-01-31，近一月起点为 2025-01-01
+    assert _slice(period=FundNavHistoryPeriod.one_month) == _DATES[2:]
+
+
+def test_start_and_end_are_inclusive():
+    dates = _slice(start=datetime.date(2024, 12, 31), end=datetime.date(2025, 1, 3))
+
+    assert dates == ["2024-12-31", "2025-01-02", "2025-01-03"]
+
+
+def test_bounds_between_nav_dates_snap_inward():
+    dates = _slice(start=datetime.date(2025, 1, 1), end=datetime.date(2025, 1, 5))
+
+    assert dates == ["2025-01-02", "2025-01-03"]
+
+
+def test_since_is_exclusive():
+    assert _slice(since=datetime.date(2025, 1, 3)) == ["2025-01-06", "2025-01-31"]
+
+
+def test_period_and_start_use_the_later_bound():
+    dates = _slice(
+        period=FundNavHistoryPeriod.one_year, start=datetime.date(2025, 1, 6)
+    )
+
+    assert dates == ["2025-01-06", "2025-01-31"]
+
+
+def test_end_before_start_returns_empty_columns():
+    sliced = _slice_nav_history(
+        _columns(),
+        FundNavHistoryPeriod.since_inception,
+        start=datetime.date(2025, 1, 6),
+        end=datetime.date(2025, 1, 2),
+    )
+
+    assert sliced == NavHistoryColumns([], [], [], None)
+
+
+def test_slice_keeps_columns_aligned():
+    sliced = _slice_nav_history(
+        _columns(),
+        FundNavHistoryPeriod.since_inception,
+        since=datetime.date(2025, 1, 3),
+    )
+
+    assert sliced.nav == [1.4, 1.5]
+    assert sliced.daily_growth == [7.7, 7.1]
+    assert sliced.nav_7d is None
+
+
+def test_downsample_picks_the_same_points_in_every_column():
+    columns = _columns()
+
+    sampled = _downsample_nav_history(columns, max_points=4)
+
+    assert len(sampled.dates) <= 4
+    positions = [_DATES.index(date) for date in sampled.dates]
+    assert sampled.nav == [columns.nav[i] for i in positions]
+    assert sampled.daily_growth == [columns.daily_growth[i] for i in positions]
+    assert sampled.nav_7d is None
+
+
+def test_downsample_is_a_no_op_below_the_limit():
+    columns = _columns()
+
+    assert _downsample_nav_history(columns, max_points=10) is columns
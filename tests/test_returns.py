@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+import pytest
+
+from app.utils import returns
+from app.utils.returns import (
+    max_drawdown,
+    period_returns,
+    time_weighted_return,
+    xirr,
+)
+
+
+def _npv(rate: float, amounts: list[float], dates: list[str]) -> float:
+    day_values = np.array(dates, dtype="datetime64[D]")
+    years = (day_values - day_values.min()).astype(float) / 365.0
+    return float(np.dot(amounts, (1.0 + rate) ** -years))
+
+
+def test_xirr_single_period_matches_closed_form():
+    rate = xirr(np.array([-1000.0, 1100.0]), np.array(["2024-01-01", "2025-01-01"]))
+
+    # 2024 年为闰年，共 366 天
+    assert rate == pytest.approx(1.1 ** (365 / 366) - 1, abs=1e-9)
+
+
+def test_xirr_newton_solves_multiple_flows(monkeypatch):
+    monkeypatch.setattr(returns, "_xirr_bisect", pytest.fail)
+    amounts = [-1000.0, -500.0, 200.0, 1500.0]
+    dates = ["2024-01-01", "2024-04-15", "2024-09-30", "2025-03-31"]
+
+    rate = xirr(np.array(amounts), np.array(dates))
+
+    assert rate is not None
+    assert _npv(rate, amounts, dates) == pytest.approx(0.0, abs=1e-6)
+
+
+def test_xirr_falls_back_to_bisection_when_newton_fails():
+    amounts = [-1000.0, -500.0, 200.0, 1500.0]
+    dates = ["2024-01-01", "2024-04-15", "2024-09-30", "2025-03-31"]
+    expected = xirr(np.array(amounts), np.array(dates))
+
+    # 初始值使 1 + rate <= 0，牛顿法无法迭代，只能由二分法求解
+    rate = xirr(np.array(amounts), np.array(dates), guess=-1.5)
+
+    assert rate == pytest.approx(expected, abs=1e-6)
+    assert _npv(rate, amounts, dates) == pytest.approx(0.0, abs=1e-6)
+
+
+def test_xirr_bisection_handles_large_losses():
+    rate = xirr(
+        np.array([-1000.0, 10.0]),
+        np.array(["2024-01-01", "2025-01-01"]),
+        guess=-1.5,
+    )
+
+    assert rate == pytest.approx(0.01 ** (365 / 366) - 1, abs=1e-6)
+
+
+@pytest.mark.parametrize(
+    "amounts",
+    [[-1000.0], [-1000.0, -500.0], [1000.0, 500.0]],
+)
+def test_xirr_returns_none_without_sign_change(amounts):
+    dates = ["2024-01-01", "2024-06-01"][: len(amounts)]
+
+    assert xirr(np.array(amounts), np.array(dates)) is None
+
+
+def test_max_drawdown_measures_peak_to_trough():
+    # 指数：1.1 -> 0.55 -> 0.66，峰值 1.1 到谷底 0.55
+    assert max_drawdown(np.array([0.1, -0.5, 0.2])) == pytest.approx(0.5)
+
+
+def test_max_drawdown_counts_loss_from_initial_value():
+    assert max_drawdown(np.array([-0.2, 0.1])) == pytest.approx(0.2)
+
+
+def test_max_drawdown_is_zero_for_rising_series():
+    assert max_drawdown(np.array([0.01, 0.02, 0.0])) == 0.0
+
+
+def test_max_drawdown_treats_missing_returns_as_flat():
+    assert max_drawdown(np.array([0.1, math.nan, -0.1])) == pytest.approx(0.1)
+
+
+def test_max_drawdown_empty_series():
+    assert max_drawdown(np.array([])) is None
+
+
+def test_period_returns_exclude_external_flows():
+    values = np.array([100.0, 210.0, 0.0, 50.0])
+    flows = np.array([100.0, 100.0, -220.0, 50.0])
+
+    result = period_returns(values, flows)
+
+    # 第二期 (210 - 100) / 100 - 1；第三期全部卖出；第四期上期市值为 0
+    assert result[0] == pytest.approx(0.1)
+    assert result[1] == pytest.approx((0.0 + 220.0) / 210.0 - 1)
+    assert math.isnan(result[2])
+
+
+def test_time_weighted_return_chains_period_returns():
+    assert time_weighted_return(np.array([0.1, math.nan, -0.1])) == pytest.approx(
+        1.1 * 0.9 - 1
+    )
+
+
+def test_time_weighted_return_without_valid_periods():
+    assert time_weighted_return(np.array([math.nan])) is None
+    assert time_weighted_return(np.array([])) is None